@@ -1,38 +1,233 @@
+import re
 
-from django.contrib import admin
-from .models import UserProfile, CheckIn, Event, EventAttendance, WalletUser
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+from web3 import Web3
 
+from .models import UserProfile, CheckIn, Event, EventAttendance, WalletUser, CheckInVerification
+
+HEX_TERM = re.compile(r"0x[0-9a-fA-F]+")
+ADDRESS_LENGTH = 42
+TX_HASH_LENGTH = 66
+
+
+# ============================================
+# TABLAS GRANDES
+# ============================================
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador sin COUNT(*) completo sobre tablas grandes.
+
+    Sin filtros, el total se estima (reltuples en PostgreSQL, MAX(id) en
+    el resto) y sólo se cuenta de verdad si la estimación es chica. Con
+    filtros se cuenta hasta MAX_COUNT filas: las páginas más allá no se
+    ofrecen, pero el COUNT queda acotado.
+    """
+
+    EXACT_BELOW = 10_000
+    MAX_COUNT = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if queryset.query.where:
+            return queryset.order_by()[:self.MAX_COUNT].count()
+
+        estimate = self._estimate(queryset.model)
+        if estimate is None or estimate < self.EXACT_BELOW:
+            return queryset.count()
+        return estimate
+
+    @staticmethod
+    def _estimate(model) -> int:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [model._meta.db_table])
+                row = cursor.fetchone()
+            # -1: la tabla aún no tiene estadísticas (sin ANALYZE)
+            if row and row[0] >= 0:
+                return row[0]
+            return None
+        return model.objects.aggregate(last=Max("pk"))["last"] or 0
+
+
+def _lookup(model, path: str, condition: dict) -> Q:
+    """
+    Q sobre una columna propia o, si path cruza una FK, sobre
+    fk__in=(subconsulta): el filtro resuelve primero en el índice de la
+    tabla relacionada en lugar de un JOIN con OR que lo descarta.
+    """
+    relation, _, field = path.rpartition("__")
+    if not relation:
+        return Q(**{f"{field}__{lookup}": value for lookup, value in condition.items()})
+
+    related = model._meta.get_field(relation).related_model
+    subquery = related.objects.filter(_lookup(related, field, condition)).values("pk")
+    return Q(**{f"{relation}__in": subquery})
+
+
+def _prefix_range(prefix: str) -> dict:
+    """
+    LOWER(columna) LIKE 'prefijo%' como rango [prefijo, siguiente): el
+    siguiente se obtiene subiendo el último carácter, así el filtro usa el
+    índice funcional sobre LOWER(columna) también en SQLite.
+    """
+    return {"lower__gte": prefix, "lower__lt": prefix[:-1] + chr(ord(prefix[-1]) + 1)}
+
+
+def hex_search_filter(model, hash_fields: tuple, address_fields: tuple, term: str) -> Q:
+    """
+    Búsqueda en columnas hex indexadas (hashes y wallets).
+
+    Un hash o una dirección completos se buscan por igualdad, sólo en las
+    columnas de su tipo; un valor parcial, por prefijo en todas. El
+    prefijo se expresa como rango [prefijo, prefijo + "g"): todo hex que
+    empieza con el prefijo cae dentro ('g' ordena después de 0-9, A-F y
+    a-f), y a diferencia de LIKE 'prefijo%' usa el índice B-tree también
+    en SQLite. Las wallets se comparan en minúsculas (LOWER(columna),
+    con índice funcional) porque pueden estar guardadas con checksum.
+    """
+    variants = {term, term.lower()}
+    if len(term) == TX_HASH_LENGTH:
+        fields, condition = hash_fields, {"in": sorted(variants)}
+    elif len(term) == ADDRESS_LENGTH:
+        # Las wallets se guardan tal como llegan: con checksum EIP-55 o en minúsculas
+        variants.add(Web3.to_checksum_address(term.lower()))
+        fields, condition = address_fields, {"in": sorted(variants)}
+    else:
+        fields, condition = hash_fields + address_fields, None
+
+    query = Q()
+    for path in fields:
+        if condition:
+            query |= _lookup(model, path, condition)
+        elif path in address_fields:
+            prefix = term.lower()
+            query |= _lookup(model, path, {"lower__gte": prefix, "lower__lt": prefix + "g"})
+        else:
+            for variant in variants:
+                query |= _lookup(model, path, {"gte": variant, "lt": variant + "g"})
+    return query
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin para tablas que crecen con los check-ins.
+
+    hash_search_fields / address_search_fields: columnas indexadas donde
+    un término 0x... se busca por igualdad o prefijo. Para el resto de
+    los términos: prefix_search_fields (prefijo sin distinguir mayúsculas,
+    como rango sobre un índice LOWER(columna)) y text_search_fields
+    (icontains, sólo en tablas acotadas). Nunca se hace LIKE '%...%' sobre
+    hashes, wallets ni columnas de tablas grandes.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    hash_search_fields = ()
+    address_search_fields = ()
+    prefix_search_fields = ()
+    text_search_fields = ()
+
+    def get_search_fields(self, request):
+        return (
+            self.hash_search_fields + self.address_search_fields
+            + self.prefix_search_fields + self.text_search_fields
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        if HEX_TERM.fullmatch(term):
+            return queryset.filter(hex_search_filter(self.model, self.hash_search_fields, self.address_search_fields, term)), False
+
+        if not self.prefix_search_fields and not self.text_search_fields:
+            self.message_user(request, "Sólo se puede buscar por hash o wallet (0x...)", level=messages.WARNING)
+            return queryset.none(), False
+
+        condition = Q()
+        for path in self.prefix_search_fields:
+            condition |= _lookup(self.model, path, _prefix_range(term.lower()))
+        for path in self.text_search_fields:
+            condition |= _lookup(self.model, path, {"icontains": term})
+        # Sin JOINs (las relaciones van por subconsulta): no hay filas duplicadas
+        return queryset.filter(condition), False
+
+
+# ============================================
+# FILTROS
+# ============================================
+
+EVENT_STATUS_LABELS = {
+    'live': '🟢 En Curso',
+    'upcoming': '🟡 Próximo',
+    'past': '🔴 Finalizado',
+}
+
+
+class EventStatusFilter(admin.SimpleListFilter):
+    """
+    Filtro por estado: un rango sobre los índices de start_date/end_date.
+    """
+
+    title = 'Estado'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return tuple(EVENT_STATUS_LABELS.items())
+
+    def queryset(self, request, queryset):
+        if self.value() in EVENT_STATUS_LABELS:
+            return getattr(queryset, self.value())()
+        return queryset
+
+
+# ============================================
+# MODELOS
+# ============================================
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(LargeTableAdmin):
     list_display = ('wallet_address', 'username', 'created_at', 'total_checkins')
-    search_fields = ('wallet_address', 'username')
+    address_search_fields = ('wallet_address',)
+    prefix_search_fields = ('username',)
     list_filter = ('created_at',)
     ordering = ('-created_at',)
-    
+
     def total_checkins(self, obj):
-        return obj.checkins.count()
+        return obj.checkin_count
     total_checkins.short_description = 'Total Check-ins'
+    total_checkins.admin_order_field = 'checkin_count'
 
 
 @admin.register(CheckIn)
-class CheckInAdmin(admin.ModelAdmin):
+class CheckInAdmin(LargeTableAdmin):
     list_display = ('user', 'location', 'latitude', 'longitude', 'timestamp', 'tx_hash_short')
-    search_fields = ('user__wallet_address', 'location', 'tx_hash')
+    list_select_related = ('user',)
+    hash_search_fields = ('tx_hash',)
+    address_search_fields = ('user__wallet_address',)
+    prefix_search_fields = ('location',)
     list_filter = ('timestamp',)
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp', 'tx_hash')
-    
+    raw_id_fields = ('user',)
+
     def tx_hash_short(self, obj):
         return f"{obj.tx_hash[:10]}..." if len(obj.tx_hash) > 10 else obj.tx_hash
     tx_hash_short.short_description = 'TX Hash'
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(LargeTableAdmin):
     list_display = ('name', 'location', 'start_date', 'end_date', 'total_attendees', 'status')
-    search_fields = ('name', 'location', 'description')
-    list_filter = ('start_date', 'created_at')
+    text_search_fields = ('name', 'location', 'description')
+    list_filter = (EventStatusFilter, 'start_date', 'created_at')
     ordering = ('-start_date',)
     readonly_fields = ('created_at',)
     
@@ -49,28 +244,30 @@ class EventAdmin(admin.ModelAdmin):
     )
     
     def total_attendees(self, obj):
-        return obj.attendees.count()
+        return obj.attendee_count
     total_attendees.short_description = 'Asistentes'
+    total_attendees.admin_order_field = 'attendee_count'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_status()
+
     def status(self, obj):
-        from django.utils import timezone
-        now = timezone.now()
-        if obj.end_date < now:
-            return "🔴 Finalizado"
-        elif obj.start_date > now:
-            return "🟡 Próximo"
-        else:
-            return "🟢 En Curso"
+        return EVENT_STATUS_LABELS[obj.status]
     status.short_description = 'Estado'
+    status.admin_order_field = 'status'
 
 
 @admin.register(EventAttendance)
-class EventAttendanceAdmin(admin.ModelAdmin):
+class EventAttendanceAdmin(LargeTableAdmin):
     list_display = ('user', 'event', 'timestamp', 'tx_hash_short')
-    search_fields = ('user__wallet_address', 'event__name', 'tx_hash')
+    list_select_related = ('user', 'event')
+    hash_search_fields = ('tx_hash',)
+    address_search_fields = ('user__wallet_address',)
+    text_search_fields = ('event__name',)
     list_filter = ('timestamp', 'event')
     ordering = ('-timestamp',)
     readonly_fields = ('timestamp', 'tx_hash')
+    raw_id_fields = ('user', 'event')
     
     def tx_hash_short(self, obj):
         return f"{obj.tx_hash[:10]}..." if len(obj.tx_hash) > 10 else obj.tx_hash
@@ -78,9 +275,25 @@ class EventAttendanceAdmin(admin.ModelAdmin):
 
 
 @admin.register(WalletUser)
-class WalletUserAdmin(admin.ModelAdmin):
+class WalletUserAdmin(LargeTableAdmin):
     list_display = ('address', 'last_login')
-    search_fields = ('address',)
+    address_search_fields = ('address',)
     list_filter = ('last_login',)
     ordering = ('-last_login',)
-    readonly_fields = ('last_login',)
\ No newline at end of file
+    readonly_fields = ('last_login',)
+
+
+@admin.register(CheckInVerification)
+class CheckInVerificationAdmin(LargeTableAdmin):
+    list_display = ('tx_hash_short', 'user', 'event', 'status', 'attempts', 'created_at', 'updated_at')
+    list_select_related = ('user', 'event')
+    hash_search_fields = ('tx_hash',)
+    address_search_fields = ('user__wallet_address',)
+    list_filter = ('status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at', 'tx_hash', 'attendance')
+    raw_id_fields = ('user', 'event')
+
+    def tx_hash_short(self, obj):
+        return f"{obj.tx_hash[:10]}..." if len(obj.tx_hash) > 10 else obj.tx_hash
+    tx_hash_short.short_description = 'TX Hash'
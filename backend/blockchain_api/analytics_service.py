@@ -1,6 +1,8 @@
 from django.db.models import Count
 from .models import CheckIn
-from datetime import datetime, timedelta
+from .rollups import get_rollup_stats
+from datetime import timedelta
+from django.utils import timezone
 
 # 🧠 Servicio de analítica: obtiene la densidad de check-ins por ubicación
 def get_heatmap_data():
@@ -18,11 +20,18 @@ def get_heatmap_data():
 
 
 # 📈 Servicio de analítica: obtiene estadísticas generales
-def get_activity_stats(days=7):
+def get_activity_stats(days=7, exact=False):
     """
     Retorna estadísticas generales de actividad en los últimos X días.
+
+    Por defecto se responde desde los agregados diarios (rollups.py):
+    días calendario completos y usuarios únicos aproximados (HyperLogLog).
+    Con exact=True se recorren los check-ins de las últimas X×24 horas.
     """
-    since = datetime.now() - timedelta(days=days)
+    if not exact:
+        return {**get_rollup_stats(days), "approximate": True}
+
+    since = timezone.now() - timedelta(days=days)
     total_checkins = CheckIn.objects.filter(timestamp__gte=since).count()
 
     # Top 5 lugares más visitados
@@ -45,5 +54,6 @@ def get_activity_stats(days=7):
         "total_checkins": total_checkins,
         "unique_users": unique_users,
         "top_locations": list(top_locations),
-        "period_days": days
+        "period_days": days,
+        "approximate": False
     }
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BlockchainApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blockchain_api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .services.token_service import check_nonce_cache
+
+        check_nonce_cache()
@@ -0,0 +1,365 @@
+"""
+async_blockchain_service.py
+Versión asíncrona de las lecturas y verificaciones de blockchain_service.
+
+Usa AsyncWeb3 con un AsyncHTTPProvider por endpoint (RPC_URLS / RPC_URL),
+así un worker ASGI mantiene cientos de verificaciones en vuelo sin ocupar
+un thread por request. Comparte con el servicio síncrono la caché de
+cadena, la decodificación de logs y las reglas de validación.
+
+Las sesiones aiohttp pertenecen a un event loop: se crean en el primer uso
+del loop, con ASYNC_RPC_POOL_SIZE conexiones por endpoint, y se cierran
+si el cliente pasa a otro loop. Está pensado para ASGI, con un loop por
+worker; bajo WSGI cada request async corre en un loop nuevo y las
+sesiones se recrearían en cada uno. Los requests de lectura que fallan se
+reintentan en el siguiente endpoint.
+"""
+
+import asyncio
+import os
+import time
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+
+from .blockchain_service import (
+    RPC_URL,
+    chain_cache,
+    checkin_event_payload,
+    evaluate_checkin_receipt,
+    get_cache_stats,
+    get_contract_address,
+    validate_checkin_params,
+    _load_contract_data,
+    _count_verification,
+    _remember_head,
+    _tx_hash_format_error,
+)
+from .chain_cache import MISSING, is_final
+from .rpc_pool import TIMEOUT, get_rpc_urls, notify_request
+
+POOL_SIZE = int(os.getenv("ASYNC_RPC_POOL_SIZE", 200))
+
+
+# ============================================
+# CLIENTE
+# ============================================
+
+class AsyncChainClient:
+    """
+    AsyncWeb3 por endpoint y contrato, para un proceso.
+    """
+
+    def __init__(self, rpc_urls: list):
+        address, abi = _load_contract_data()
+        self.pid = os.getpid()
+        self.rpc_urls = rpc_urls
+        self.providers = [
+            AsyncHTTPProvider(url, exception_retry_configuration=None) for url in rpc_urls
+        ]
+        self.w3s = [AsyncWeb3(provider) for provider in self.providers]
+        self.contracts = [w3.eth.contract(address=address, abi=abi) for w3 in self.w3s]
+        self._loop = None
+        self._sessions = []
+        self._lock = None
+        self._lock_loop = None
+
+    def _creation_lock(self, loop) -> asyncio.Lock:
+        # Un asyncio.Lock queda atado al loop en que se usa: uno por loop
+        if self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def ensure_sessions(self):
+        """
+        Crea las sesiones HTTP del event loop actual (una vez por loop).
+
+        Las coroutines que llegan juntas al primer uso esperan el lock en
+        lugar de crear cada una sus sesiones. Las del loop anterior se
+        cierran antes de crear las nuevas.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        async with self._creation_lock(loop):
+            if self._loop is loop:
+                return
+            await self._close_sessions()
+
+            timeout = ClientTimeout(total=TIMEOUT)
+            for provider in self.providers:
+                session = ClientSession(connector=TCPConnector(limit=POOL_SIZE), timeout=timeout)
+                cached = await provider.cache_async_session(session)
+                if cached is not session:
+                    await session.close()
+                self._sessions.append(cached)
+            self._loop = loop
+
+    async def _close_sessions(self):
+        """
+        Cierra las sesiones del loop anterior y las saca de la caché de
+        sesiones de cada provider.
+        """
+        loop, sessions = self._loop, self._sessions
+        self._loop, self._sessions = None, []
+        if not sessions:
+            return
+
+        for provider in self.providers:
+            cache = provider._request_session_manager.session_cache
+            for key, session in cache.items():
+                if session in sessions:
+                    cache.pop(key)
+
+        if loop.is_running():
+            # Sigue corriendo en otro thread: se cierran en su propio loop
+            asyncio.run_coroutine_threadsafe(_close_all(sessions), loop)
+        else:
+            # Con el loop cerrado aiohttp sólo las marca como cerradas
+            try:
+                await _close_all(sessions)
+            except Exception as e:
+                print(f"⚠️ Error cerrando sesiones del loop anterior: {e}")
+
+    async def close(self):
+        for provider in self.providers:
+            await provider.disconnect()
+        self._loop, self._sessions = None, []
+
+
+async def _close_all(sessions: list):
+    for session in sessions:
+        await session.close()
+
+
+_client = None
+
+
+async def get_async_client() -> AsyncChainClient:
+    """
+    Devuelve el cliente del proceso actual, creándolo en el primer uso.
+    """
+    global _client
+    if _client is None or _client.pid != os.getpid():
+        rpc_urls = get_rpc_urls(RPC_URL)
+        print(f"🔗 Conectando a RPC (async): {', '.join(rpc_urls)}")
+        _client = AsyncChainClient(rpc_urls)
+
+    await _client.ensure_sessions()
+    return _client
+
+
+async def close_async_client():
+    """
+    Cierra las sesiones HTTP del cliente (al terminar el event loop).
+    """
+    if _client is not None and _client._loop is asyncio.get_running_loop():
+        await _client.close()
+
+
+async def _failover(call, method: str, calls: list = None):
+    """
+    Ejecuta call(client, provider_index) en cada endpoint hasta que uno responda.
+    """
+    client = await get_async_client()
+    last_error = None
+    for index in range(len(client.providers)):
+        start = time.perf_counter()
+        try:
+            return await call(client, index)
+        except Exception as e:
+            last_error = e
+        finally:
+            notify_request(method, calls or [method], time.perf_counter() - start)
+    raise last_error
+
+
+async def _rpc(method: str, params: list):
+    async def call(client, index):
+        return await client.providers[index].make_request(method, params)
+
+    response = await _failover(call, method)
+    if "error" in response:
+        raise ValueError(f"RPC error en {method}: {response['error']}")
+    return response.get("result")
+
+
+async def _rpc_batch(calls: list) -> list:
+    async def call(client, index):
+        return await client.providers[index].make_batch_request(calls)
+
+    responses = await _failover(call, "batch", [method for method, _ in calls])
+    if not isinstance(responses, list):
+        raise ValueError(f"RPC error en batch: {responses.get('error')}")
+
+    results = []
+    for (method, _), response in zip(calls, responses):
+        if "error" in response:
+            raise ValueError(f"RPC error en {method}: {response['error']}")
+        results.append(response.get("result"))
+    return results
+
+
+# ============================================
+# FUNCIONES DE LECTURA
+# ============================================
+
+async def _indexer():
+    try:
+        from . import indexer
+        return indexer if await indexer.aindex_available() else None
+    except Exception:
+        return None
+
+
+async def get_user_checkins_page(user_address: str, offset: int = 0, limit: int = None) -> tuple:
+    """
+    Versión asíncrona de blockchain_service.get_user_checkins_page.
+    """
+    try:
+        if not Web3.is_address(user_address):
+            print(f"⚠️ Dirección inválida: {user_address}")
+            return [], 0
+
+        indexer = await _indexer()
+        if indexer:
+            try:
+                return await indexer.aget_indexed_checkins(user_address, offset, limit)
+            except Exception as e:
+                print(f"⚠️ Error leyendo índice local, usando contrato: {e}")
+
+        async def call(client, index):
+            function = client.contracts[index].functions.getUserCheckIns(Web3.to_checksum_address(user_address))
+            return await function.call()
+
+        checkins = [
+            {
+                "user": checkin[0],
+                "location": checkin[1],
+                "timestamp": int(checkin[2]),
+                "eventId": int(checkin[3])
+            }
+            for checkin in await _failover(call, "eth_call")
+        ]
+        end = offset + limit if limit is not None else None
+        return checkins[offset:end], len(checkins)
+
+    except Exception as e:
+        print(f"⚠️ Error obteniendo check-ins: {e}")
+        return [], 0
+
+
+# ============================================
+# VERIFICACIÓN DE TRANSACCIONES
+# ============================================
+
+async def _fetch_receipt_and_tx(tx_hash: str) -> tuple:
+    key = tx_hash.lower()
+    receipt = chain_cache.get(("receipt", key))
+    tx = chain_cache.get(("tx", key))
+    if receipt is not MISSING and tx is not MISSING:
+        return receipt, tx
+
+    receipt, tx, head = await _rpc_batch([
+        ("eth_getTransactionReceipt", [tx_hash]),
+        ("eth_getTransactionByHash", [tx_hash]),
+        ("eth_blockNumber", []),
+    ])
+    head = int(head, 16)
+    _remember_head(head)
+
+    if receipt:
+        final = is_final(int(receipt["blockNumber"], 16), head)
+        chain_cache.set(("receipt", key), receipt, final)
+        chain_cache.set(("tx", key), tx, final)
+
+    return receipt, tx
+
+
+async def get_block_header(block_number: int) -> dict:
+    key = ("block", block_number)
+    block = chain_cache.get(key)
+    if block is not MISSING:
+        return block
+
+    block, head = await _rpc_batch([
+        ("eth_getBlockByNumber", [hex(block_number), False]),
+        ("eth_blockNumber", []),
+    ])
+    head = int(head, 16)
+    _remember_head(head)
+    chain_cache.set(key, block, is_final(block_number, head))
+    return block
+
+
+async def verify_checkin_single_pass(tx_hash: str, expected_wallet: str, expected_event_id: int = None) -> dict:
+    """
+    Versión asíncrona de blockchain_service.verify_checkin_single_pass.
+    """
+    error = _tx_hash_format_error(tx_hash)
+    if error:
+        return _count_verification({"valid": False, "error": error})
+
+    try:
+        try:
+            receipt, tx = await _fetch_receipt_and_tx(tx_hash)
+        except Exception:
+            return _count_verification({"valid": False, "error": "Transaction not found in blockchain", "pending": True})
+
+        result = evaluate_checkin_receipt(tx_hash, receipt, tx, expected_wallet, expected_event_id)
+
+        if result["valid"] and result["timestamp"] is None:
+            block = await get_block_header(result["block_number"])
+            result["timestamp"] = int(block["timestamp"], 16)
+
+        return _count_verification(result)
+
+    except Exception as e:
+        return _count_verification({"valid": False, "error": f"Verification error: {str(e)}"})
+
+
+async def verify_event_checkin_tx(tx_hash: str, wallet_address: str, event_id: int) -> dict:
+    """
+    Versión asíncrona de blockchain_service.verify_event_checkin_tx.
+    """
+    event_id = validate_checkin_params(wallet_address, event_id)
+    result = await verify_checkin_single_pass(tx_hash, wallet_address, event_id)
+    return checkin_event_payload(tx_hash, result)
+
+
+# ============================================
+# UTILIDADES
+# ============================================
+
+async def get_block_number() -> int:
+    try:
+        number = int(await _rpc("eth_blockNumber", []), 16)
+        _remember_head(number)
+        return number
+    except Exception as e:
+        print(f"⚠️ Error obteniendo block number: {e}")
+        return 0
+
+
+async def is_blockchain_connected() -> bool:
+    try:
+        await _rpc("web3_clientVersion", [])
+        return True
+    except Exception:
+        return False
+
+
+async def get_contract_info() -> dict:
+    """
+    Versión asíncrona de blockchain_service.get_contract_info.
+    """
+    connected, block_number = await asyncio.gather(is_blockchain_connected(), get_block_number())
+    client = await get_async_client()
+    return {
+        "address": get_contract_address(),
+        "rpc_url": RPC_URL,
+        "connected": connected,
+        "block_number": block_number,
+        "rpc_endpoints": client.rpc_urls
+    }
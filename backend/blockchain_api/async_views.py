@@ -0,0 +1,204 @@
+"""
+async_views.py
+Versiones asíncronas de los endpoints que esperan al nodo RPC.
+
+Requieren ASGI (core/asgi.py, por ejemplo con uvicorn): mientras una
+verificación espera la respuesta del nodo, el mismo worker atiende otros
+requests. Bajo WSGI Django corre cada vista async en un event loop propio
+(async_to_sync): funcionan, pero sin concurrencia y recreando las
+sesiones HTTP del cliente async en cada request. Usan async_blockchain_service (AsyncWeb3) y el ORM
+asíncrono de Django; sólo el registro del check-in, que necesita una
+transacción, corre en un thread (sync_to_async).
+
+Mismas respuestas que sus equivalentes en views.py, bajo /api/async/.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from web3 import Web3
+
+from .async_blockchain_service import (
+    get_cache_stats,
+    get_contract_info,
+    get_user_checkins_page,
+    is_blockchain_connected,
+    verify_event_checkin_tx
+)
+from .checkin_service import register_checkin
+from .event_cache import aenrich_checkins
+from .models import UserProfile, Event, EventAttendance
+from .response_cache import get_response_cache_stats
+from .serializers import EventSerializer
+
+
+# ============================================
+# BLOCKCHAIN INFO
+# ============================================
+
+@require_GET
+async def blockchain_info(request):
+    """
+    GET /api/async/blockchain/info/
+    """
+    return JsonResponse({
+        "status": "success",
+        "blockchain": await get_contract_info(),
+        "cache": get_cache_stats()
+    })
+
+
+# ============================================
+# USER ENDPOINTS
+# ============================================
+
+@require_GET
+async def get_user_checkins_view(request, address):
+    """
+    GET /api/async/checkins/<address>/?offset=0&limit=50
+    """
+
+    if not Web3.is_address(address):
+        return JsonResponse({"error": "Invalid wallet address format"}, status=400)
+
+    try:
+        offset = int(request.GET.get("offset", 0))
+        limit = request.GET.get("limit")
+        limit = int(limit) if limit is not None else None
+        if offset < 0 or (limit is not None and limit <= 0):
+            raise ValueError()
+    except ValueError:
+        return JsonResponse({"error": "Invalid offset or limit parameter"}, status=400)
+
+    try:
+        checkins, total = await get_user_checkins_page(address, offset=offset, limit=limit)
+        await aenrich_checkins(checkins)
+
+        return JsonResponse({
+            "status": "success",
+            "wallet_address": address,
+            "total_checkins": total,
+            "offset": offset,
+            "checkins": checkins
+        })
+
+    except Exception as e:
+        return JsonResponse({"error": f"Error fetching check-ins: {str(e)}"}, status=500)
+
+
+# ============================================
+# EVENT ENDPOINTS
+# ============================================
+
+@csrf_exempt
+@require_POST
+async def event_checkin(request):
+    """
+    POST /api/async/event_checkin/
+    Registra asistencia verificando TX en blockchain.
+    Body JSON: {"event_id", "wallet_address", "tx_hash"}
+    """
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    event_id = data.get("event_id")
+    wallet_address = data.get("wallet_address")
+    tx_hash = data.get("tx_hash")
+
+    if not all([event_id, wallet_address, tx_hash]):
+        return JsonResponse({"error": "Missing required parameters"}, status=400)
+
+    if not Web3.is_address(wallet_address):
+        return JsonResponse({"error": "Invalid wallet address format"}, status=400)
+
+    if not isinstance(tx_hash, str) or not tx_hash.startswith("0x") or len(tx_hash) != 66:
+        return JsonResponse({"error": "Invalid transaction hash format"}, status=400)
+
+    try:
+        event_id = int(event_id)
+        if event_id <= 0:
+            raise ValueError()
+    except (ValueError, TypeError):
+        return JsonResponse({"error": "Invalid event ID"}, status=400)
+
+    try:
+        event = await Event.objects.aget(id=event_id)
+    except Event.DoesNotExist:
+        return JsonResponse({"error": "Event not found"}, status=404)
+
+    user, created_user = await UserProfile.objects.aget_or_create(wallet_address=wallet_address)
+
+    if await EventAttendance.objects.filter(tx_hash=tx_hash).aexists():
+        return JsonResponse({"error": "This transaction has already been recorded"}, status=400)
+
+    if await EventAttendance.objects.filter(user=user, event=event).aexists():
+        return JsonResponse({"error": "User has already checked in to this event"}, status=400)
+
+    try:
+        blockchain_data = await verify_event_checkin_tx(
+            tx_hash=tx_hash,
+            wallet_address=wallet_address,
+            event_id=event_id
+        )
+    except Exception as e:
+        return JsonResponse({"error": f"Blockchain verification failed: {str(e)}"}, status=400)
+
+    try:
+        attendance = await sync_to_async(register_checkin)(user, event, tx_hash)
+    except IntegrityError:
+        # Un request concurrente registró la misma TX o asistencia
+        return JsonResponse({"error": "User has already checked in to this event"}, status=400)
+
+    # checkin_count se incrementó con F() en la base
+    await user.arefresh_from_db(fields=["checkin_count"])
+
+    return JsonResponse({
+        "status": "success",
+        "message": f"Check-in verified and registered for {event.name}",
+        "attendance_id": attendance.id,
+        "event": EventSerializer(event).data,
+        "blockchain": blockchain_data,
+        "user": {
+            "wallet_address": user.wallet_address,
+            "new_user": created_user,
+            "total_checkins": user.checkin_count
+        }
+    }, status=201)
+
+
+# ============================================
+# HEALTH CHECK
+# ============================================
+
+@require_GET
+async def health_check(request):
+    """
+    GET /api/async/health/
+    """
+
+    blockchain_status = "connected" if await is_blockchain_connected() else "disconnected"
+
+    try:
+        await Event.objects.acount()
+        db_status = "connected"
+    except Exception:
+        db_status = "disconnected"
+
+    overall_status = "healthy" if (
+        blockchain_status == "connected" and db_status == "connected"
+    ) else "degraded"
+
+    return JsonResponse({
+        "status": overall_status,
+        "blockchain": blockchain_status,
+        "database": db_status,
+        "contract_info": await get_contract_info(),
+        "response_cache": get_response_cache_stats()
+    })
@@ -0,0 +1,78 @@
+"""
+authentication.py
+Autenticación DRF con los tokens de sesión de login_wallet.
+"""
+
+from django.core import signing
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .services.token_service import verify_token
+
+
+class WalletUser:
+    """
+    Usuario autenticado por token: sólo la wallet, sin consultar UserProfile.
+
+    Expone los atributos de usuario que leen DRF y Django (pk para el
+    throttling, is_staff para IsAdminUser); nunca tiene permisos de admin.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    is_staff = False
+    is_superuser = False
+
+    def __init__(self, wallet_address: str):
+        self.wallet_address = wallet_address
+
+    @property
+    def pk(self) -> str:
+        return self.wallet_address
+
+    id = pk
+
+    def get_username(self) -> str:
+        return self.wallet_address
+
+    def has_perm(self, perm, obj=None) -> bool:
+        return False
+
+    def has_perms(self, perm_list, obj=None) -> bool:
+        return False
+
+    def has_module_perms(self, app_label) -> bool:
+        return False
+
+    def __str__(self) -> str:
+        return self.wallet_address
+
+
+class WalletTokenAuthentication(BaseAuthentication):
+    """
+    Authorization: Bearer <token>. Sin header se pasa al siguiente autenticador.
+    """
+
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword:
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header")
+
+        token = auth[1].decode("latin-1")
+        try:
+            wallet_address = verify_token(token)
+        except signing.SignatureExpired:
+            raise AuthenticationFailed("Token expired")
+        except signing.BadSignature:
+            raise AuthenticationFailed("Invalid token")
+
+        return WalletUser(wallet_address), token
+
+    def authenticate_header(self, request) -> str:
+        return 'Bearer realm="api"'
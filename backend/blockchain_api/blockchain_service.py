@@ -2,42 +2,202 @@
 blockchain_service.py
 Servicio para interactuar con el smart contract ProofOfPresence.
 Solo lectura y verificación de transacciones - NO firma transacciones.
+
+El cliente Web3 se crea en el primer uso de cada proceso (get_client) y se
+recrea tras un fork(), por lo que importar este módulo no abre conexiones.
 """
 
 from web3 import Web3
+from eth_abi import decode as abi_decode
+from hexbytes import HexBytes
+from functools import lru_cache
 import json
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from .chain_cache import ChainCache, MISSING, is_final
+from .metrics import VERIFICATIONS, register_collector
+from .rpc_pool import PooledHTTPProvider, RPCPool, get_rpc_urls
+
 load_dotenv()
 
 # Configuración de conexión
 RPC_URL = os.getenv("RPC_URL", "http://127.0.0.1:8545")
-print(f"🔗 Conectando a RPC_URL: {RPC_URL}")
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
 
-# Cargar el contrato
-contract_json_path = os.path.join(
+CONTRACT_JSON_PATH = os.path.join(
     os.path.dirname(__file__),
     "../../blockchain/deployed/ProofOfPresence.json"
 )
 
-print(f"📄 Cargando contrato desde: {contract_json_path}")
+# Caché de receipts, transacciones y bloques (ver chain_cache.py)
+chain_cache = ChainCache()
+register_collector(
+    "chain_cache_requests_total", "Lecturas de la caché de cadena", ("result",),
+    lambda: {
+        ("hit",): chain_cache.hits - chain_cache.shared_hits,
+        ("shared_hit",): chain_cache.shared_hits,
+        ("miss",): chain_cache.misses,
+    }
+)
+HEAD_TTL = 1.0
+# Transacciones por request HTTP en verify_checkins_batch (2 llamadas JSON-RPC cada una)
+RPC_BATCH_TXS = int(os.getenv("RPC_BATCH_TXS", 100))
+_head = {"number": None, "at": 0.0}
+
+# Topic 0 del evento EventCheckedIn(address indexed user, uint256 indexed eventId, string location, uint256 timestamp)
+EVENT_CHECKED_IN_TOPIC = Web3.to_hex(Web3.keccak(text="EventCheckedIn(address,uint256,string,uint256)"))
+
+
+# ============================================
+# CLIENTE
+# ============================================
+
+@lru_cache(maxsize=None)
+def _load_contract_data() -> tuple:
+    """
+    Lee ProofOfPresence.json una sola vez por proceso.
+
+    Returns:
+        (address, abi)
+    """
+    with open(CONTRACT_JSON_PATH, "r") as f:
+        contract_data = json.load(f)
+    return contract_data["address"], contract_data["abi"]
+
+
+def get_contract_address() -> str:
+    return _load_contract_data()[0]
+
+
+class ChainClient:
+    """
+    Conexión Web3 y contrato de un proceso.
+    Los requests pasan por un pool de endpoints (ver rpc_pool.py).
+    """
+
+    def __init__(self, rpc_urls: list):
+        address, abi = _load_contract_data()
+        self.pid = os.getpid()
+        self.rpc_urls = rpc_urls
+        self.pool = RPCPool(rpc_urls)
+        self.w3 = Web3(PooledHTTPProvider(self.pool))
+        self.contract = self.w3.eth.contract(address=address, abi=abi)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ChainClient:
+    """
+    Devuelve el cliente del proceso actual, creándolo en el primer uso.
+    Si el proceso es un fork, se crea uno nuevo (no se comparte la conexión del padre).
+    """
+    global _client
+    client = _client
+    if client is not None and client.pid == os.getpid():
+        return client
 
-with open(contract_json_path, "r") as f:
-    contract_data = json.load(f)
-    CONTRACT_ADDRESS = contract_data["address"]
-    CONTRACT_ABI = contract_data["abi"]
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid():
+            rpc_urls = get_rpc_urls(RPC_URL)
+            print(f"🔗 Conectando a RPC: {', '.join(rpc_urls)}")
+            _client = ChainClient(rpc_urls)
+        return _client
 
-print(f"✅ Contrato cargado: {CONTRACT_ADDRESS}")
 
-contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+def _reset_after_fork():
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+    chain_cache.reset_lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def __getattr__(name):
+    # Compatibilidad: w3, contract y CONTRACT_ADDRESS como atributos del módulo
+    if name == "w3":
+        return get_client().w3
+    if name == "contract":
+        return get_client().contract
+    if name == "CONTRACT_ADDRESS":
+        return get_contract_address()
+    if name == "CONTRACT_ABI":
+        return _load_contract_data()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============================================
 # FUNCIONES DE LECTURA
 # ============================================
 
+def _indexer():
+    """
+    Devuelve el módulo indexer si el índice local está al día, si no None.
+    Importación diferida: este módulo no depende de Django.
+    """
+    try:
+        from . import indexer
+        return indexer if indexer.index_available() else None
+    except Exception:
+        return None
+
+
+def _get_contract_checkins(user_address: str) -> list:
+    checkins_raw = get_client().contract.functions.getUserCheckIns(user_address).call()
+
+    # Convertir tuplas a diccionarios
+    checkins = []
+    for checkin in checkins_raw:
+        checkins.append({
+            "user": checkin[0],
+            "location": checkin[1],
+            "timestamp": int(checkin[2]),
+            "eventId": int(checkin[3])
+        })
+
+    return checkins
+
+
+def get_user_checkins_page(user_address: str, offset: int = 0, limit: int = None) -> tuple:
+    """
+    Obtiene una página de check-ins de un usuario.
+    Lee del índice local (indexer.py) y, si no está disponible, del contrato.
+
+    Args:
+        user_address: Dirección de wallet del usuario
+        offset: Check-ins a omitir
+        limit: Máximo de check-ins (None = todos)
+
+    Returns:
+        (checkins, total) con el formato de get_user_checkins
+    """
+    try:
+        if not Web3.is_address(user_address):
+            print(f"⚠️ Dirección inválida: {user_address}")
+            return [], 0
+
+        indexer = _indexer()
+        if indexer:
+            try:
+                return indexer.get_indexed_checkins(user_address, offset, limit)
+            except Exception as e:
+                print(f"⚠️ Error leyendo índice local, usando contrato: {e}")
+
+        checkins = _get_contract_checkins(user_address)
+        end = offset + limit if limit is not None else None
+        return checkins[offset:end], len(checkins)
+
+    except Exception as e:
+        print(f"⚠️ Error obteniendo check-ins: {e}")
+        return [], 0
+
+
 def get_user_checkins(user_address: str) -> list:
     """
     Obtiene todos los check-ins de un usuario desde blockchain.
@@ -56,28 +216,8 @@ def get_user_checkins(user_address: str) -> list:
             }
         ]
     """
-    try:
-        if not Web3.is_address(user_address):
-            print(f"⚠️ Dirección inválida: {user_address}")
-            return []
-        
-        checkins_raw = contract.functions.getUserCheckIns(user_address).call()
-        
-        # Convertir tuplas a diccionarios
-        checkins = []
-        for checkin in checkins_raw:
-            checkins.append({
-                "user": checkin[0],
-                "location": checkin[1],
-                "timestamp": int(checkin[2]),
-                "eventId": int(checkin[3])
-            })
-        
-        return checkins
-        
-    except Exception as e:
-        print(f"⚠️ Error obteniendo check-ins: {e}")
-        return []
+    checkins, _ = get_user_checkins_page(user_address)
+    return checkins
 
 
 def get_last_checkin(user_address: str) -> dict:
@@ -88,6 +228,10 @@ def get_last_checkin(user_address: str) -> dict:
         Dict con el último check-in o None si no hay check-ins
     """
     try:
+        indexer = _indexer()
+        if indexer:
+            return indexer.get_indexed_last_checkin(user_address)
+
         checkins = get_user_checkins(user_address)
         if checkins:
             return checkins[-1]
@@ -109,7 +253,11 @@ def has_user_checked_in(wallet_address: str, event_id: int) -> bool:
         True si ya hizo check-in, False en caso contrario
     """
     try:
-        return contract.functions.hasUserCheckedIn(wallet_address, event_id).call()
+        indexer = _indexer()
+        if indexer:
+            return indexer.indexed_has_checked_in(wallet_address, event_id)
+
+        return get_client().contract.functions.hasUserCheckedIn(wallet_address, event_id).call()
     except Exception as e:
         print(f"⚠️ Error verificando check-in: {e}")
         return False
@@ -127,7 +275,11 @@ def get_event_stats(event_id: int) -> dict:
         }
     """
     try:
-        stats = contract.functions.getEventStats(event_id).call()
+        indexer = _indexer()
+        if indexer:
+            return indexer.get_indexed_event_stats(event_id)
+
+        stats = get_client().contract.functions.getEventStats(event_id).call()
         return {
             "totalCheckIns": int(stats[0]),
             "uniqueUsers": int(stats[1]),
@@ -142,6 +294,409 @@ def get_event_stats(event_id: int) -> dict:
 # VERIFICACIÓN DE TRANSACCIONES
 # ============================================
 
+def _tx_hash_format_error(tx_hash: str) -> str:
+    """
+    Valida el formato del hash de transacción.
+
+    Returns:
+        Mensaje de error, o None si el formato es correcto
+    """
+    if not tx_hash or not isinstance(tx_hash, str):
+        return "Transaction hash is required"
+
+    if not tx_hash.startswith('0x'):
+        return "Transaction hash must start with 0x"
+
+    if len(tx_hash) != 66:
+        return "Transaction hash must be 66 characters"
+
+    # Verificar que sea hexadecimal
+    try:
+        int(tx_hash, 16)
+    except ValueError:
+        return "Transaction hash must be hexadecimal"
+
+    return None
+
+
+# Prefijo del mensaje de error → resultado en checkin_verifications_total
+VERIFICATION_OUTCOMES = (
+    ("Transaction hash", "invalid_hash"),
+    ("Transaction not found", "not_found"),
+    ("Transaction failed", "tx_failed"),
+    ("Transaction not sent to correct contract", "wrong_contract"),
+    ("Transaction data not found", "not_found"),
+    ("Transaction sender doesn't match", "wrong_sender"),
+    ("Error processing event logs", "invalid_logs"),
+    ("Transaction did not emit", "no_checkin_event"),
+    ("Transaction doesn't contain check-in", "wrong_event"),
+    ("Verification error", "error"),
+)
+
+
+def _count_verification(result: dict) -> dict:
+    """
+    Cuenta el resultado de una verificación por tipo de error y lo devuelve.
+    """
+    if result["valid"]:
+        outcome = "valid"
+    elif result.get("pending"):
+        outcome = "pending"
+    else:
+        outcome = next(
+            (outcome for prefix, outcome in VERIFICATION_OUTCOMES if result["error"].startswith(prefix)), "other"
+        )
+    VERIFICATIONS.inc(outcome)
+    return result
+
+
+def _rpc(method: str, params: list):
+    """
+    Llamada JSON-RPC directa, sin formateo de web3.
+
+    Returns:
+        Campo "result" de la respuesta
+    """
+    response = get_client().w3.provider.make_request(method, params)
+    if "error" in response:
+        raise ValueError(f"RPC error en {method}: {response['error']}")
+    return response.get("result")
+
+
+def _rpc_batch(calls: list) -> list:
+    """
+    Envía varias llamadas JSON-RPC en un único request HTTP (batch).
+
+    Args:
+        calls: Lista de tuplas (method, params)
+
+    Returns:
+        Lista con el campo "result" de cada respuesta, en el mismo orden
+    """
+    responses = get_client().w3.provider.make_batch_request(calls)
+    if not isinstance(responses, list):
+        raise ValueError(f"RPC error en batch: {responses.get('error')}")
+
+    results = []
+    for (method, _), response in zip(calls, responses):
+        if "error" in response:
+            raise ValueError(f"RPC error en {method}: {response['error']}")
+        results.append(response.get("result"))
+    return results
+
+
+def _remember_head(number: int):
+    _head["number"] = number
+    _head["at"] = time.monotonic()
+
+
+def _current_head() -> int:
+    """
+    Último bloque conocido, refrescado como máximo cada HEAD_TTL segundos.
+    """
+    if _head["number"] is None or time.monotonic() - _head["at"] > HEAD_TTL:
+        _remember_head(int(_rpc("eth_blockNumber", []), 16))
+    return _head["number"]
+
+
+def _fetch_receipt_and_tx(tx_hash: str) -> tuple:
+    """
+    Obtiene receipt y transacción en un solo round trip.
+    Usa la caché de cadena; el último bloque viaja en el mismo batch para
+    decidir si el resultado ya es final.
+
+    Returns:
+        (receipt, tx) en formato JSON-RPC crudo (hex); None si no existen
+    """
+    key = tx_hash.lower()
+    receipt = chain_cache.get(("receipt", key))
+    tx = chain_cache.get(("tx", key))
+    if receipt is not MISSING and tx is not MISSING:
+        return receipt, tx
+
+    receipt, tx, head = _rpc_batch([
+        ("eth_getTransactionReceipt", [tx_hash]),
+        ("eth_getTransactionByHash", [tx_hash]),
+        ("eth_blockNumber", []),
+    ])
+    _remember_head(int(head, 16))
+
+    # Sólo se cachean transacciones ya minadas
+    if receipt:
+        final = is_final(int(receipt["blockNumber"], 16), _head["number"])
+        chain_cache.set(("receipt", key), receipt, final)
+        chain_cache.set(("tx", key), tx, final)
+
+    return receipt, tx
+
+
+def get_block_header(block_number: int) -> dict:
+    """
+    Obtiene el header de un bloque (sin transacciones), usando la caché.
+
+    Returns:
+        Bloque en formato JSON-RPC crudo o None si no existe
+    """
+    key = ("block", block_number)
+    block = chain_cache.get(key)
+    if block is not MISSING:
+        return block
+
+    block = _rpc("eth_getBlockByNumber", [hex(block_number), False])
+    chain_cache.set(key, block, is_final(block_number, _current_head()))
+    return block
+
+
+def get_cache_stats() -> dict:
+    """
+    Contadores de hits/misses de la caché de cadena.
+    """
+    return chain_cache.stats()
+
+
+def decode_checkin_logs(raw_logs: list) -> list:
+    """
+    Decodifica los logs EventCheckedIn emitidos por el contrato.
+    Los logs se leen en formato JSON-RPC crudo y se decodifican una sola vez.
+
+    Returns:
+        Lista de check-ins con formato:
+        [
+            {
+                "user": "0x...",
+                "eventId": 1,
+                "location": "Santiago, Chile",
+                "timestamp": 1234567890,
+                "block_number": 10,
+                "log_index": 0,
+                "tx_hash": "0x..."
+            }
+        ]
+    """
+    contract_address = get_contract_address().lower()
+
+    checkins = []
+    for log in raw_logs or []:
+        if (log.get("address") or "").lower() != contract_address:
+            continue
+
+        topics = [Web3.to_hex(HexBytes(t)) for t in log.get("topics") or []]
+        if len(topics) != 3 or topics[0] != EVENT_CHECKED_IN_TOPIC:
+            continue
+
+        location, timestamp = abi_decode(["string", "uint256"], HexBytes(log["data"]))
+        checkins.append({
+            "user": Web3.to_checksum_address("0x" + topics[1][-40:]),
+            "eventId": int(topics[2], 16),
+            "location": location,
+            "timestamp": int(timestamp),
+            "block_number": int(log["blockNumber"], 16),
+            "log_index": int(log["logIndex"], 16),
+            "tx_hash": log["transactionHash"]
+        })
+    return checkins
+
+
+def get_checkin_logs(from_block: int, to_block: int) -> list:
+    """
+    Obtiene los logs EventCheckedIn de un rango de bloques (eth_getLogs).
+
+    Returns:
+        Lista de check-ins decodificados (ver decode_checkin_logs)
+    """
+    raw_logs = _rpc("eth_getLogs", [{
+        "address": get_contract_address(),
+        "topics": [EVENT_CHECKED_IN_TOPIC],
+        "fromBlock": hex(from_block),
+        "toBlock": hex(to_block)
+    }])
+    return decode_checkin_logs(raw_logs)
+
+
+def evaluate_checkin_receipt(tx_hash: str, receipt: dict, tx: dict, expected_wallet: str,
+                             expected_event_id: int = None) -> dict:
+    """
+    Valida receipt y transacción (JSON-RPC crudo) de un check-in, sin I/O.
+    Compartido por la verificación síncrona y la asíncrona.
+
+    Returns:
+        Resultado de verify_checkin_single_pass. Si la transacción no trae
+        el evento, "timestamp" es None y se debe leer del header del bloque.
+    """
+    # Sin receipt: la transacción aún no se mina (o no existe)
+    if not receipt:
+        return {"valid": False, "error": "Transaction not found in blockchain", "pending": True}
+
+    if int(receipt["status"], 16) != 1:
+        return {"valid": False, "error": "Transaction failed on blockchain (status != 1)"}
+
+    contract_address = get_contract_address()
+    receipt_to = Web3.to_checksum_address(receipt["to"]) if receipt.get("to") else None
+    if not receipt_to or receipt_to.lower() != contract_address.lower():
+        return {
+            "valid": False,
+            "error": f"Transaction not sent to correct contract. Expected: {contract_address}, Got: {receipt_to}"
+        }
+
+    if not tx:
+        return {"valid": False, "error": "Transaction data not found"}
+
+    sender = Web3.to_checksum_address(tx["from"])
+    if sender.lower() != expected_wallet.lower():
+        return {
+            "valid": False,
+            "error": f"Transaction sender doesn't match. Expected: {expected_wallet}, Got: {sender}"
+        }
+
+    try:
+        events = decode_checkin_logs(receipt.get("logs"))
+    except Exception as e:
+        return {"valid": False, "error": f"Error processing event logs: {str(e)}"}
+
+    if expected_event_id is not None:
+        if not events:
+            return {"valid": False, "error": "Transaction did not emit EventCheckedIn event"}
+
+        events = [e for e in events if e["eventId"] == expected_event_id]
+        if not events:
+            return {
+                "valid": False,
+                "error": f"Transaction doesn't contain check-in for event {expected_event_id}"
+            }
+
+    event = events[0] if events else None
+
+    return {
+        "valid": True,
+        "tx_hash": tx_hash,
+        "from": sender,
+        "to": receipt_to,
+        "block_number": int(receipt["blockNumber"], 16),
+        "gas_used": int(receipt["gasUsed"], 16),
+        "timestamp": event["timestamp"] if event else None,
+        "event": event
+    }
+
+
+def verify_checkin_single_pass(tx_hash: str, expected_wallet: str, expected_event_id: int = None) -> dict:
+    """
+    Motor de verificación en una sola pasada.
+
+    Receipt y transacción se piden en un único batch JSON-RPC y los logs
+    EventCheckedIn se decodifican una sola vez. El timestamp del bloque se
+    toma del propio evento (el contrato emite block.timestamp), por lo que
+    sólo se consulta el bloque cuando la transacción no trae el evento.
+
+    Returns:
+        Mismo formato que verify_transaction, más:
+        {
+            "event": dict del check-in decodificado (o None),
+            "pending": True si aún no hay receipt (se puede reintentar)
+        }
+    """
+    error = _tx_hash_format_error(tx_hash)
+    if error:
+        return _count_verification({"valid": False, "error": error})
+
+    try:
+        try:
+            receipt, tx = _fetch_receipt_and_tx(tx_hash)
+        except Exception:
+            return _count_verification({"valid": False, "error": "Transaction not found in blockchain", "pending": True})
+
+        result = evaluate_checkin_receipt(tx_hash, receipt, tx, expected_wallet, expected_event_id)
+
+        if result["valid"] and result["timestamp"] is None:
+            result["timestamp"] = int(get_block_header(result["block_number"])["timestamp"], 16)
+
+        return _count_verification(result)
+
+    except Exception as e:
+        return _count_verification({"valid": False, "error": f"Verification error: {str(e)}"})
+
+
+def _fetch_receipts_and_txs(tx_hashes: list) -> dict:
+    """
+    Receipt y transacción de varios hashes, en batches de RPC_BATCH_TXS.
+
+    Returns:
+        {tx_hash: (receipt, tx)}; si un batch falla, su valor es la excepción
+    """
+    found, missing = {}, []
+    for tx_hash in tx_hashes:
+        key = tx_hash.lower()
+        receipt, tx = chain_cache.get(("receipt", key)), chain_cache.get(("tx", key))
+        if receipt is not MISSING and tx is not MISSING:
+            found[tx_hash] = (receipt, tx)
+        else:
+            missing.append(tx_hash)
+
+    for start in range(0, len(missing), RPC_BATCH_TXS):
+        chunk = missing[start:start + RPC_BATCH_TXS]
+        calls = [("eth_blockNumber", [])]
+        for tx_hash in chunk:
+            calls += [("eth_getTransactionReceipt", [tx_hash]), ("eth_getTransactionByHash", [tx_hash])]
+
+        try:
+            results = _rpc_batch(calls)
+        except Exception as e:
+            found.update((tx_hash, e) for tx_hash in chunk)
+            continue
+
+        _remember_head(int(results[0], 16))
+        for i, tx_hash in enumerate(chunk):
+            receipt, tx = results[1 + 2 * i], results[2 + 2 * i]
+            if receipt:
+                final = is_final(int(receipt["blockNumber"], 16), _head["number"])
+                chain_cache.set(("receipt", tx_hash.lower()), receipt, final)
+                chain_cache.set(("tx", tx_hash.lower()), tx, final)
+            found[tx_hash] = (receipt, tx)
+
+    return found
+
+
+def verify_checkins_batch(checkins: list) -> list:
+    """
+    Verifica varios check-ins con pocos round trips: receipts y
+    transacciones viajan en batches JSON-RPC y se evalúan igual que en
+    verify_checkin_single_pass.
+
+    Args:
+        checkins: Lista de (tx_hash, expected_wallet, expected_event_id)
+
+    Returns:
+        Lista de resultados de verify_checkin_single_pass, en el mismo orden
+    """
+    results = [None] * len(checkins)
+    pending = {}
+
+    for i, (tx_hash, _, _) in enumerate(checkins):
+        error = _tx_hash_format_error(tx_hash)
+        if error:
+            results[i] = {"valid": False, "error": error}
+        else:
+            pending[i] = tx_hash
+
+    fetched = _fetch_receipts_and_txs(list(dict.fromkeys(pending.values())))
+
+    for i, tx_hash in pending.items():
+        _, expected_wallet, expected_event_id = checkins[i]
+        data = fetched[tx_hash]
+        if isinstance(data, Exception):
+            results[i] = {"valid": False, "error": "Transaction not found in blockchain", "pending": True}
+            continue
+        try:
+            results[i] = evaluate_checkin_receipt(tx_hash, *data, expected_wallet, expected_event_id)
+            if results[i]["valid"] and results[i]["timestamp"] is None:
+                results[i]["timestamp"] = int(get_block_header(results[i]["block_number"])["timestamp"], 16)
+        except Exception as e:
+            results[i] = {"valid": False, "error": f"Verification error: {str(e)}"}
+
+    for result in results:
+        _count_verification(result)
+    return results
+
+
 def verify_transaction(tx_hash: str, expected_wallet: str, expected_event_id: int = None) -> dict:
     """
     Verifica que una transacción sea válida y corresponda al check-in esperado.
@@ -170,107 +725,22 @@ def verify_transaction(tx_hash: str, expected_wallet: str, expected_event_id: in
             "timestamp": int
         }
     """
-    try:
-        # 1. Validar formato del hash
-        if not tx_hash or not isinstance(tx_hash, str):
-            return {"valid": False, "error": "Transaction hash is required"}
-        
-        if not tx_hash.startswith('0x'):
-            return {"valid": False, "error": "Transaction hash must start with 0x"}
-        
-        if len(tx_hash) != 66:
-            return {"valid": False, "error": "Transaction hash must be 66 characters"}
-        
-        # Verificar que sea hexadecimal
-        try:
-            int(tx_hash, 16)
-        except ValueError:
-            return {"valid": False, "error": "Transaction hash must be hexadecimal"}
-        
-        # 2. Obtener receipt de la transacción
-        try:
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-        except Exception:
-            return {"valid": False, "error": "Transaction not found in blockchain"}
-        
-        if not receipt:
-            return {"valid": False, "error": "Transaction receipt is null"}
-        
-        # 3. Verificar que fue exitosa
-        if receipt.status != 1:
-            return {"valid": False, "error": "Transaction failed on blockchain (status != 1)"}
-        
-        # 4. Verificar que se hizo al contrato correcto
-        if not receipt.to or receipt.to.lower() != CONTRACT_ADDRESS.lower():
-            return {
-                "valid": False,
-                "error": f"Transaction not sent to correct contract. Expected: {CONTRACT_ADDRESS}, Got: {receipt.to}"
-            }
-        
-        # 5. Obtener la transacción para verificar el sender
-        tx = w3.eth.get_transaction(tx_hash)
-        
-        if not tx:
-            return {"valid": False, "error": "Transaction data not found"}
-        
-        if tx['from'].lower() != expected_wallet.lower():
-            return {
-                "valid": False,
-                "error": f"Transaction sender doesn't match. Expected: {expected_wallet}, Got: {tx['from']}"
-            }
-        
-        # 6. (Opcional) Verificar el eventId en los logs
-        if expected_event_id is not None:
-            try:
-                logs = contract.events.EventCheckedIn().process_receipt(receipt)
-                
-                if not logs:
-                    return {"valid": False, "error": "Transaction did not emit EventCheckedIn event"}
-                
-                event_found = False
-                for log in logs:
-                    if log['args']['eventId'] == expected_event_id:
-                        event_found = True
-                        break
-                
-                if not event_found:
-                    return {
-                        "valid": False,
-                        "error": f"Transaction doesn't contain check-in for event {expected_event_id}"
-                    }
-            except Exception as e:
-                return {"valid": False, "error": f"Error processing event logs: {str(e)}"}
-        
-        # 7. Obtener timestamp del bloque
-        block = w3.eth.get_block(receipt.blockNumber)
-        
-        # ✅ Todo OK
-        return {
-            "valid": True,
-            "tx_hash": tx_hash,
-            "from": tx['from'],
-            "to": receipt.to,
-            "block_number": receipt.blockNumber,
-            "gas_used": receipt.gasUsed,
-            "timestamp": block.timestamp
-        }
-        
-    except Exception as e:
-        return {"valid": False, "error": f"Verification error: {str(e)}"}
+    result = verify_checkin_single_pass(tx_hash, expected_wallet, expected_event_id)
+    result.pop("event", None)
+    return result
 
 
-def verify_event_checkin_tx(tx_hash: str, wallet_address: str, event_id: int) -> dict:
+def validate_checkin_params(wallet_address: str, event_id) -> int:
     """
-    Función específica para verificar check-ins a eventos.
-    Wrapper de verify_transaction con validaciones adicionales.
-    
+    Valida wallet y event_id de un check-in.
+
     Returns:
-        Dict con datos del evento si es válido, raise Exception si no
+        event_id como entero; raise ValueError si algo es inválido
     """
     # Validar formato de wallet
     if not Web3.is_address(wallet_address):
         raise ValueError("Invalid wallet address format")
-    
+
     # Validar event_id
     try:
         event_id = int(event_id)
@@ -278,33 +748,41 @@ def verify_event_checkin_tx(tx_hash: str, wallet_address: str, event_id: int) ->
             raise ValueError("Event ID must be positive")
     except (ValueError, TypeError):
         raise ValueError("Invalid event ID")
-    
-    # Verificar la transacción
-    result = verify_transaction(tx_hash, wallet_address, event_id)
-    
+
+    return event_id
+
+
+def checkin_event_payload(tx_hash: str, result: dict) -> dict:
+    """
+    Datos del check-in verificado; raise ValueError si la verificación falló.
+    """
     if not result["valid"]:
         raise ValueError(result["error"])
+
+    event_data = result["event"]
+    return {
+        "user": event_data["user"],
+        "eventId": event_data["eventId"],
+        "location": event_data["location"],
+        "timestamp": event_data["timestamp"],
+        "block_number": result["block_number"],
+        "tx_hash": tx_hash
+    }
+
+
+def verify_event_checkin_tx(tx_hash: str, wallet_address: str, event_id: int) -> dict:
+    """
+    Función específica para verificar check-ins a eventos.
+    Usa el motor de una sola pasada: un único batch RPC por verificación.
     
-    # Obtener datos del evento desde los logs
-    try:
-        receipt = w3.eth.get_transaction_receipt(tx_hash)
-        logs = contract.events.EventCheckedIn().process_receipt(receipt)
-        
-        if logs:
-            event_data = logs[0]["args"]
-            return {
-                "user": event_data["user"],
-                "eventId": int(event_data["eventId"]),
-                "location": event_data["location"],
-                "timestamp": int(event_data["timestamp"]),
-                "block_number": result["block_number"],
-                "tx_hash": tx_hash
-            }
-        else:
-            raise ValueError("No event data found in transaction")
-            
-    except Exception as e:
-        raise ValueError(f"Error extracting event data: {str(e)}")
+    Returns:
+        Dict con datos del evento si es válido, raise Exception si no
+    """
+    event_id = validate_checkin_params(wallet_address, event_id)
+
+    # Verificar la transacción y extraer el evento en la misma pasada
+    result = verify_checkin_single_pass(tx_hash, wallet_address, event_id)
+    return checkin_event_payload(tx_hash, result)
 
 
 # ============================================
@@ -316,7 +794,7 @@ def is_blockchain_connected() -> bool:
     Verifica si hay conexión con el nodo de blockchain.
     """
     try:
-        return w3.is_connected()
+        return get_client().w3.is_connected()
     except Exception:
         return False
 
@@ -326,30 +804,28 @@ def get_block_number() -> int:
     Obtiene el número del último bloque.
     """
     try:
-        return w3.eth.block_number
+        return get_client().w3.eth.block_number
     except Exception as e:
         print(f"⚠️ Error obteniendo block number: {e}")
         return 0
 
 
+def fetch_block_number() -> int:
+    """
+    Último bloque; a diferencia de get_block_number, propaga el error del
+    nodo en lugar de devolver 0.
+    """
+    return int(_rpc("eth_blockNumber", []), 16)
+
+
 def get_contract_info() -> dict:
     """
     Retorna información del contrato.
     """
     return {
-        "address": CONTRACT_ADDRESS,
+        "address": get_contract_address(),
         "rpc_url": RPC_URL,
         "connected": is_blockchain_connected(),
-        "block_number": get_block_number()
+        "block_number": get_block_number(),
+        "rpc_pool": get_client().pool.stats()
     }
-
-
-# ============================================
-# INICIALIZACIÓN
-# ============================================
-
-# Verificar conexión al iniciar
-if is_blockchain_connected():
-    print(f"✅ Conectado a blockchain - Bloque: {get_block_number()}")
-else:
-    print("⚠️ No se pudo conectar a blockchain")
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+bulk_checkin.py
+Registro de check-ins por lotes (POST /api/event_checkin/bulk/).
+
+Mismas validaciones que POST /api/event_checkin/, pero con un número fijo
+de consultas por lote: eventos, usuarios y asistencias previas se leen con
+una consulta cada uno, las transacciones se verifican con batches JSON-RPC
+y las filas válidas se insertan con bulk_create.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from web3 import Web3
+
+from .blockchain_service import checkin_event_payload, verify_checkins_batch
+from .checkin_service import register_checkin, register_checkins_bulk
+from .models import Event, EventAttendance, UserProfile
+
+MAX_ITEMS = getattr(settings, "BULK_CHECKIN_MAX_ITEMS", 100)
+
+
+def _error(index: int, status_code: int, error: str) -> dict:
+    return {"index": index, "status": "error", "status_code": status_code, "error": error}
+
+
+def _parse_item(item) -> tuple:
+    """
+    Returns:
+        (event_id, wallet_address, tx_hash); raise ValueError con el mismo
+        mensaje que devuelve POST /api/event_checkin/
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Missing required parameters")
+
+    event_id = item.get("event_id")
+    wallet_address = item.get("wallet_address")
+    tx_hash = item.get("tx_hash")
+
+    if not all([event_id, wallet_address, tx_hash]):
+        raise ValueError("Missing required parameters")
+
+    if not isinstance(wallet_address, str) or not Web3.is_address(wallet_address):
+        raise ValueError("Invalid wallet address format")
+
+    if not isinstance(tx_hash, str) or not tx_hash.startswith("0x") or len(tx_hash) != 66:
+        raise ValueError("Invalid transaction hash format")
+
+    try:
+        event_id = int(event_id)
+        if event_id <= 0:
+            raise ValueError()
+    except (ValueError, TypeError):
+        raise ValueError("Invalid event ID")
+
+    return event_id, wallet_address, tx_hash
+
+
+def _get_users(wallets: set) -> tuple:
+    """
+    Obtiene o crea los UserProfile de un conjunto de wallets.
+
+    Returns:
+        ({wallet: UserProfile}, wallets creadas en este lote)
+    """
+    users = {user.wallet_address: user for user in UserProfile.objects.filter(wallet_address__in=wallets)}
+    missing = wallets - users.keys()
+
+    if missing:
+        UserProfile.objects.bulk_create(
+            [UserProfile(wallet_address=wallet) for wallet in missing], ignore_conflicts=True
+        )
+        users.update(
+            (user.wallet_address, user) for user in UserProfile.objects.filter(wallet_address__in=missing)
+        )
+
+    return users, missing
+
+
+def process_bulk_checkins(items: list) -> list:
+    """
+    Verifica y registra un lote de check-ins.
+
+    Args:
+        items: Lista de {"event_id", "wallet_address", "tx_hash"}
+
+    Returns:
+        Un resultado por item, en el mismo orden: "status" success | error
+        y "status_code" (el que habría devuelto POST /api/event_checkin/)
+    """
+    results = [None] * len(items)
+    parsed = {}
+    seen_tx = set()
+
+    for index, item in enumerate(items):
+        try:
+            event_id, wallet_address, tx_hash = _parse_item(item)
+        except ValueError as e:
+            results[index] = _error(index, 400, str(e))
+            continue
+
+        if tx_hash.lower() in seen_tx:
+            results[index] = _error(index, 400, "Duplicate transaction in request")
+            continue
+        seen_tx.add(tx_hash.lower())
+        parsed[index] = (event_id, wallet_address, tx_hash)
+
+    # Eventos y usuarios: una consulta cada uno
+    events = Event.objects.in_bulk({event_id for event_id, _, _ in parsed.values()})
+    for index, (event_id, _, _) in list(parsed.items()):
+        if event_id not in events:
+            results[index] = _error(index, 404, "Event not found")
+            del parsed[index]
+
+    users, created_wallets = _get_users({wallet for _, wallet, _ in parsed.values()})
+
+    # Asistencias ya registradas: una consulta para todo el lote
+    recorded = EventAttendance.objects.filter(
+        Q(tx_hash__in=[tx_hash for _, _, tx_hash in parsed.values()]) |
+        Q(user__in=[users[wallet] for _, wallet, _ in parsed.values()],
+          event_id__in=[event_id for event_id, _, _ in parsed.values()])
+    ).values_list("tx_hash", "user_id", "event_id")
+
+    recorded_tx, attended = set(), set()
+    for tx_hash, user_id, event_id in recorded:
+        recorded_tx.add(tx_hash)
+        attended.add((user_id, event_id))
+
+    for index, (event_id, wallet, tx_hash) in list(parsed.items()):
+        pair = (users[wallet].id, event_id)
+        if tx_hash in recorded_tx:
+            results[index] = _error(index, 400, "This transaction has already been recorded")
+        elif pair in attended:
+            results[index] = _error(index, 400, "User has already checked in to this event")
+        else:
+            attended.add(pair)
+            continue
+        del parsed[index]
+
+    # Verificación en batches JSON-RPC
+    indexes = list(parsed)
+    verifications = verify_checkins_batch([
+        (tx_hash, wallet, event_id) for event_id, wallet, tx_hash in parsed.values()
+    ])
+
+    verified = []
+    for index, verification in zip(indexes, verifications):
+        event_id, wallet, tx_hash = parsed[index]
+        try:
+            blockchain_data = checkin_event_payload(tx_hash, verification)
+        except ValueError as e:
+            results[index] = _error(index, 400, f"Blockchain verification failed: {str(e)}")
+            continue
+        verified.append((index, users[wallet], events[event_id], tx_hash, blockchain_data))
+
+    for (index, user, event, tx_hash, blockchain_data), attendance in zip(verified, _register(verified)):
+        if attendance is None:
+            results[index] = _error(index, 400, "User has already checked in to this event")
+            continue
+
+        results[index] = {
+            "index": index,
+            "status": "success",
+            "status_code": 201,
+            "attendance_id": attendance.id,
+            "event_id": event.id,
+            "tx_hash": tx_hash,
+            "blockchain": blockchain_data,
+            "user": {
+                "wallet_address": user.wallet_address,
+                "new_user": user.wallet_address in created_wallets
+            }
+        }
+
+    return results
+
+
+def _register(verified: list) -> list:
+    """
+    Inserta el lote completo; si un request concurrente registró alguna
+    de las filas, registra una a una y deja None en las que ya existían.
+    """
+    try:
+        return register_checkins_bulk([(user, event, tx_hash) for _, user, event, tx_hash, _ in verified])
+    except IntegrityError:
+        pass
+
+    attendances = []
+    for _, user, event, tx_hash, _ in verified:
+        try:
+            attendances.append(register_checkin(user, event, tx_hash))
+        except IntegrityError:
+            attendances.append(None)
+    return attendances
@@ -0,0 +1,147 @@
+"""
+chain_cache.py
+Caché LRU+TTL para datos de blockchain (receipts, transacciones, bloques).
+
+Los datos de bloques con más de FINALITY_CONFIRMATIONS confirmaciones son
+inmutables: se guardan sin expiración (hasta el límite de tamaño, LRU).
+Los datos recientes pueden cambiar por un reorg y se guardan sólo
+RECENT_TTL segundos.
+
+Opcionalmente, las entradas finalizadas se comparten entre workers mediante
+un backend de caché de Django (CHAIN_CACHE_SHARED_BACKEND = alias en CACHES).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("CHAIN_CACHE_SIZE", 10000))
+RECENT_TTL = float(os.getenv("CHAIN_CACHE_RECENT_TTL", 5))
+FINALITY_CONFIRMATIONS = int(os.getenv("CHAIN_FINALITY_CONFIRMATIONS", 12))
+SHARED_BACKEND = os.getenv("CHAIN_CACHE_SHARED_BACKEND")
+
+MISSING = object()
+
+
+class ChainCache:
+    """
+    Caché en memoria del proceso, thread-safe.
+
+    Args:
+        max_entries: Máximo de entradas (se descartan las menos usadas)
+        recent_ttl: Segundos de vida de entradas no finalizadas
+        shared_backend: Alias de caché Django para entradas finalizadas
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, recent_ttl: float = RECENT_TTL,
+                 shared_backend: str = SHARED_BACKEND):
+        self.max_entries = max_entries
+        self.recent_ttl = recent_ttl
+        self.shared_backend = shared_backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def _shared(self):
+        if not self.shared_backend:
+            return None
+        try:
+            from django.core.cache import caches
+            return caches[self.shared_backend]
+        except Exception:
+            return None
+
+    def get(self, key: tuple):
+        """
+        Returns:
+            Valor cacheado o MISSING
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        shared = self._shared()
+        if shared is not None:
+            value = shared.get(self._shared_key(key), MISSING)
+            if value is not MISSING:
+                self._store(key, value, None)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return MISSING
+
+    def set(self, key: tuple, value, final: bool):
+        """
+        Guarda un valor. Los finalizados no expiran; el resto dura recent_ttl.
+        """
+        if value is None:
+            return
+
+        expires_at = None if final else time.monotonic() + self.recent_ttl
+        self._store(key, value, expires_at)
+
+        if final:
+            shared = self._shared()
+            if shared is not None:
+                try:
+                    shared.set(self._shared_key(key), value, None)
+                except Exception as e:
+                    print(f"⚠️ Error escribiendo caché compartida: {e}")
+
+    def _store(self, key: tuple, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _shared_key(key: tuple) -> str:
+        return "chain:" + ":".join(str(part) for part in key)
+
+    def reset_lock(self):
+        """
+        Recrea el lock en el proceso hijo tras un fork().
+        """
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared_hits = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+def is_final(block_number: int, head: int, confirmations: int = FINALITY_CONFIRMATIONS) -> bool:
+    """
+    True si el bloque tiene suficientes confirmaciones para considerarse inmutable.
+    """
+    return block_number is not None and head is not None and head - block_number >= confirmations
@@ -0,0 +1,130 @@
+"""
+checkin_queue.py
+Cola de verificación asíncrona de check-ins.
+
+El endpoint persiste un CheckInVerification pendiente y delega la
+verificación a un pool acotado de threads. Cada worker consulta el receipt
+con backoff exponencial hasta que la transacción se mina (o se agota el
+tiempo) y luego registra EventAttendance/CheckIn.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from .blockchain_service import verify_checkin_single_pass
+from .checkin_service import register_checkin
+from .models import CheckInVerification, EventAttendance
+
+WORKERS = getattr(settings, "CHECKIN_ASYNC_WORKERS", 4)
+MAX_PENDING = getattr(settings, "CHECKIN_ASYNC_MAX_PENDING", 200)
+VERIFY_TIMEOUT = getattr(settings, "CHECKIN_ASYNC_TIMEOUT", 120)
+BACKOFF_INITIAL = getattr(settings, "CHECKIN_ASYNC_BACKOFF_INITIAL", 1.0)
+BACKOFF_MAX = getattr(settings, "CHECKIN_ASYNC_BACKOFF_MAX", 15.0)
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="checkin-verify")
+        return _executor
+
+
+def enqueue_verification(verification_id: int) -> bool:
+    """
+    Encola una verificación pendiente.
+
+    Returns:
+        False si la cola está llena (MAX_PENDING verificaciones en curso)
+    """
+    if not _slots.acquire(blocking=False):
+        return False
+
+    try:
+        _get_executor().submit(_run, verification_id)
+    except Exception:
+        _slots.release()
+        raise
+    return True
+
+
+def _run(verification_id: int):
+    close_old_connections()
+    try:
+        process_verification(verification_id)
+    except Exception as e:
+        print(f"⚠️ Error procesando verificación {verification_id}: {e}")
+        CheckInVerification.objects.filter(
+            id=verification_id, status=CheckInVerification.STATUS_PENDING
+        ).update(status=CheckInVerification.STATUS_FAILED, error=f"Verification error: {str(e)}")
+    finally:
+        _slots.release()
+        close_old_connections()
+
+
+def _mark_failed(verification: CheckInVerification, error: str):
+    verification.status = CheckInVerification.STATUS_FAILED
+    verification.error = error
+    verification.save(update_fields=["status", "error", "attempts", "updated_at"])
+
+
+def process_verification(verification_id: int, timeout: float = None) -> CheckInVerification:
+    """
+    Verifica la transacción de un check-in pendiente y finaliza los registros.
+    Reintenta con backoff mientras la transacción siga sin receipt.
+
+    Returns:
+        CheckInVerification con status final (verified / failed)
+    """
+    verification = CheckInVerification.objects.select_related("user", "event").get(id=verification_id)
+    if verification.status != CheckInVerification.STATUS_PENDING:
+        return verification
+
+    timeout = VERIFY_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    delay = BACKOFF_INITIAL
+
+    while True:
+        verification.attempts += 1
+        result = verify_checkin_single_pass(
+            verification.tx_hash,
+            verification.user.wallet_address,
+            verification.event_id
+        )
+
+        if result["valid"]:
+            break
+
+        if not result.get("pending") or time.monotonic() + delay > deadline:
+            _mark_failed(verification, result["error"])
+            return verification
+
+        verification.save(update_fields=["attempts", "updated_at"])
+        time.sleep(delay)
+        delay = min(delay * 2, BACKOFF_MAX)
+
+    with transaction.atomic():
+        duplicated = EventAttendance.objects.filter(tx_hash=verification.tx_hash).exists() or \
+            EventAttendance.objects.filter(user=verification.user, event=verification.event).exists()
+        if duplicated:
+            _mark_failed(verification, "User has already checked in to this event")
+            return verification
+
+        try:
+            verification.attendance = register_checkin(verification.user, verification.event, verification.tx_hash)
+        except IntegrityError:
+            _mark_failed(verification, "User has already checked in to this event")
+            return verification
+        verification.status = CheckInVerification.STATUS_VERIFIED
+        verification.error = None
+        verification.save()
+
+    return verification
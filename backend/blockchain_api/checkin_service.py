@@ -0,0 +1,86 @@
+"""
+checkin_service.py
+Registro de asistencias verificadas en la base de datos.
+Compartido por el endpoint síncrono y la cola de verificación asíncrona.
+"""
+
+from django.db import transaction
+
+from . import counters, heatmap, rollups
+from .models import CheckIn, EventAttendance
+from .table_versions import bump_version
+
+
+def register_checkin(user, event, tx_hash: str) -> EventAttendance:
+    """
+    Crea la asistencia y el check-in de un usuario en una sola transacción.
+
+    Args:
+        user: UserProfile que hizo check-in
+        event: Event al que asistió
+        tx_hash: Hash de la transacción ya verificada
+
+    Returns:
+        EventAttendance creado
+    """
+    with transaction.atomic():
+        attendance = EventAttendance.objects.create(
+            user=user,
+            event=event,
+            tx_hash=tx_hash
+        )
+
+        CheckIn.objects.create(
+            user=user,
+            location=event.location,
+            latitude=event.latitude,
+            longitude=event.longitude,
+            tx_hash=tx_hash
+        )
+
+    return attendance
+
+
+def register_checkins_bulk(checkins: list) -> list:
+    """
+    Versión por lotes de register_checkin: dos INSERT múltiples en una
+    transacción.
+
+    bulk_create no emite post_save, así que aquí se aplica lo que hacen
+    los receptores de signals.py (grilla de calor, agregados diarios,
+    contadores y versiones de tabla) una vez para todo el lote.
+
+    Args:
+        checkins: Lista de (user, event, tx_hash) ya verificados y sin duplicados
+
+    Returns:
+        EventAttendance creados, en el mismo orden
+    """
+    if not checkins:
+        return []
+
+    with transaction.atomic():
+        attendances = EventAttendance.objects.bulk_create([
+            EventAttendance(user=user, event=event, tx_hash=tx_hash)
+            for user, event, tx_hash in checkins
+        ])
+
+        rows = CheckIn.objects.bulk_create([
+            CheckIn(
+                user=user,
+                location=event.location,
+                latitude=event.latitude,
+                longitude=event.longitude,
+                tx_hash=tx_hash
+            )
+            for user, event, tx_hash in checkins
+        ])
+
+        heatmap.record_checkins([(row.latitude, row.longitude) for row in rows])
+        rollups.record_checkins([(row.timestamp, row.location, row.user_id) for row in rows])
+        counters.record_checkins([row.user_id for row in rows])
+        counters.record_attendances([attendance.event_id for attendance in attendances])
+        bump_version("checkin")
+        bump_version("attendance")
+
+    return attendances
@@ -0,0 +1,98 @@
+"""
+counters.py
+Contadores desnormalizados: UserProfile.checkin_count y Event.attendee_count.
+
+Reemplazan user.checkins.count() y event.attendees.count() en login,
+check-in y admin. Se actualizan con incrementos F() (un UPDATE atómico en
+la base, sin leer el valor) dentro de la transacción del check-in: desde
+signals.py al crear o borrar filas sueltas y desde
+checkin_service.register_checkins_bulk para los lotes. El comando
+reconcile_counters recalcula los valores si se desincronizan (borrados
+masivos, SQL manual).
+
+attendee_count cambia con cada check-in, así que no viaja en las
+respuestas cacheadas de eventos (EventSerializer lo excluye) ni incrementa
+la versión "event": invalidaría los ETags, la caché de respuestas y el
+snapshot de eventos en curso en cada check-in. Se sirve aparte, sin caché,
+en GET /api/events/attendees/.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import CheckIn, Event, EventAttendance, UserProfile
+
+
+def _apply(model, field: str, ids, delta: int):
+    """
+    Suma delta por cada aparición de un id: un UPDATE por monto distinto.
+    """
+    by_amount = defaultdict(list)
+    for pk, times in Counter(ids).items():
+        by_amount[times * delta].append(pk)
+
+    for amount, pks in by_amount.items():
+        queryset = model.objects.filter(pk__in=pks)
+        if amount < 0:
+            # Los contadores son positivos: un desfase se corrige con reconcile_counters
+            queryset = queryset.filter(**{f"{field}__gte": -amount})
+        queryset.update(**{field: F(field) + amount})
+
+
+def record_checkins(user_ids, delta: int = 1):
+    """
+    Suma (o resta con delta=-1) check-ins a UserProfile.checkin_count.
+
+    Args:
+        user_ids: Iterable de ids de usuario, uno por check-in
+    """
+    _apply(UserProfile, "checkin_count", user_ids, delta)
+
+
+def record_attendances(event_ids, delta: int = 1):
+    """
+    Suma (o resta con delta=-1) asistentes a Event.attendee_count.
+
+    Args:
+        event_ids: Iterable de ids de evento, uno por asistencia
+    """
+    _apply(Event, "attendee_count", event_ids, delta)
+
+
+# ============================================
+# RECONCILIACIÓN
+# ============================================
+
+def _reconcile(model, field: str, rows, chunk_size: int, dry_run: bool) -> int:
+    actual = Coalesce(
+        Subquery(rows.values("key").annotate(total=Count("pk")).values("total")[:1]),
+        Value(0)
+    )
+    drifted = list(
+        model.objects.annotate(actual=actual).exclude(**{field: F("actual")}).values_list("pk", flat=True)
+    )
+
+    if not dry_run:
+        for start in range(0, len(drifted), chunk_size):
+            # El conteo se recalcula en el mismo UPDATE: no pisa check-ins hechos entretanto
+            model.objects.filter(pk__in=drifted[start:start + chunk_size]).update(**{field: actual})
+
+    return len(drifted)
+
+
+def reconcile_counters(chunk_size: int = 1000, dry_run: bool = False) -> dict:
+    """
+    Recalcula los contadores que no coinciden con un COUNT real.
+
+    Returns:
+        {"users": filas corregidas, "events": filas corregidas}
+    """
+    checkins = CheckIn.objects.filter(user=OuterRef("pk")).annotate(key=F("user")).order_by()
+    attendances = EventAttendance.objects.filter(event=OuterRef("pk")).annotate(key=F("event")).order_by()
+
+    return {
+        "users": _reconcile(UserProfile, "checkin_count", checkins, chunk_size, dry_run),
+        "events": _reconcile(Event, "attendee_count", attendances, chunk_size, dry_run),
+    }
@@ -0,0 +1,138 @@
+"""
+event_cache.py
+Caché en memoria de metadatos de eventos (nombre, descripción, ubicación).
+
+Permite enriquecer listas de check-ins con una sola consulta bulk para los
+ids que no estén en caché. Se invalida desde signals.py cuando un Event se
+guarda o se elimina, pero sólo en el proceso que hizo la escritura: en los
+demás workers cada entrada vive a lo sumo EVENT_CACHE_TTL segundos. La
+caché guarda hasta EVENT_CACHE_SIZE eventos (se descartan los menos usados).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .metrics import EVENT_CACHE
+from .models import Event
+
+MAX_ENTRIES = getattr(settings, "EVENT_CACHE_SIZE", 5000)
+TTL = getattr(settings, "EVENT_CACHE_TTL", 60)
+
+# event_id -> (metadatos, expira_en)
+_metadata = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cached(event_ids: set) -> dict:
+    now = time.monotonic()
+    cached = {}
+    with _lock:
+        for event_id in event_ids:
+            entry = _metadata.get(event_id)
+            if entry is None:
+                continue
+            if entry[1] <= now:
+                del _metadata[event_id]
+                continue
+            _metadata.move_to_end(event_id)
+            cached[event_id] = entry[0]
+
+    if cached:
+        EVENT_CACHE.inc("hit", amount=len(cached))
+    if len(cached) < len(event_ids):
+        EVENT_CACHE.inc("miss", amount=len(event_ids) - len(cached))
+    return cached
+
+
+def _remember(missing: set, rows) -> dict:
+    fetched = {event_id: None for event_id in missing}
+    for row in rows:
+        fetched[row.pop("id")] = row
+
+    expires_at = time.monotonic() + TTL
+    with _lock:
+        for event_id, metadata in fetched.items():
+            _metadata[event_id] = (metadata, expires_at)
+            _metadata.move_to_end(event_id)
+        while len(_metadata) > MAX_ENTRIES:
+            _metadata.popitem(last=False)
+    return fetched
+
+
+def _metadata_query(event_ids: set):
+    return Event.objects.filter(id__in=event_ids).values("id", "name", "description", "location")
+
+
+def get_events_metadata(event_ids) -> dict:
+    """
+    Obtiene los metadatos de varios eventos.
+
+    Args:
+        event_ids: Iterable de ids de evento
+
+    Returns:
+        {event_id: {"name", "description", "location"} o None si no existe}
+    """
+    event_ids = set(event_ids)
+    result = _cached(event_ids)
+
+    missing = event_ids - result.keys()
+    if missing:
+        result.update(_remember(missing, _metadata_query(missing)))
+
+    return result
+
+
+async def aget_events_metadata(event_ids) -> dict:
+    """
+    Versión asíncrona de get_events_metadata (ORM async).
+    """
+    event_ids = set(event_ids)
+    result = _cached(event_ids)
+
+    missing = event_ids - result.keys()
+    if missing:
+        result.update(_remember(missing, [row async for row in _metadata_query(missing)]))
+
+    return result
+
+
+def _apply_metadata(checkins: list, metadata: dict) -> list:
+    for checkin in checkins:
+        event = metadata.get(checkin["eventId"])
+        if event:
+            checkin["event_name"] = event["name"]
+            checkin["event_description"] = event["description"]
+            checkin["event_location"] = event["location"]
+        else:
+            checkin["event_name"] = f"Event #{checkin['eventId']}"
+
+    return checkins
+
+
+def enrich_checkins(checkins: list) -> list:
+    """
+    Agrega event_name, event_description y event_location a cada check-in.
+    """
+    return _apply_metadata(checkins, get_events_metadata(checkin["eventId"] for checkin in checkins))
+
+
+async def aenrich_checkins(checkins: list) -> list:
+    """
+    Versión asíncrona de enrich_checkins.
+    """
+    return _apply_metadata(checkins, await aget_events_metadata(checkin["eventId"] for checkin in checkins))
+
+
+def invalidate_event(event_id: int = None):
+    """
+    Elimina un evento de la caché (o toda la caché si event_id es None).
+    """
+    with _lock:
+        if event_id is None:
+            _metadata.clear()
+        else:
+            _metadata.pop(event_id, None)
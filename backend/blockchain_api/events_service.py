@@ -0,0 +1,298 @@
+"""
+events_service.py
+Consultas de GET /api/events/: filtros por estado, paginación por cursor
+(keyset sobre start_date, id), el conjunto de eventos en curso cacheado,
+validadores HTTP (ETag / Last-Modified) y eventos cercanos
+(GET /api/events/nearby/).
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import geo
+from .models import Event
+from .table_versions import get_versions
+
+STATUSES = ("upcoming", "live", "past")
+STATUS_ALIASES = {"ongoing": "live"}
+DEFAULT_PAGE_SIZE = getattr(settings, "EVENTS_PAGE_SIZE", 20)
+MAX_PAGE_SIZE = getattr(settings, "EVENTS_MAX_PAGE_SIZE", 100)
+NEARBY_DEFAULT_RADIUS_KM = getattr(settings, "EVENTS_NEARBY_DEFAULT_RADIUS_KM", 10)
+NEARBY_MAX_RADIUS_KM = getattr(settings, "EVENTS_NEARBY_MAX_RADIUS_KM", 100)
+
+
+def normalize_status(status: str) -> str:
+    """
+    Valida un filtro de estado; "ongoing" es el nombre anterior de "live".
+
+    Returns:
+        upcoming | live | past, o None si no se pidió filtro
+    """
+    if not status:
+        return None
+    status = STATUS_ALIASES.get(status, status)
+    if status not in STATUSES:
+        raise ValueError(f"Invalid status: {status}")
+    return status
+
+
+def filter_by_status(queryset, status: str, now: datetime):
+    """
+    upcoming: aún no empieza · live: en curso · past: ya terminó
+    """
+    return getattr(queryset, normalize_status(status))(now)
+
+
+# ============================================
+# PAGINACIÓN
+# ============================================
+
+def encode_cursor(event: Event) -> str:
+    value = json.dumps([event.start_date.isoformat(), event.id])
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Returns:
+        (start_date, id) del último evento de la página anterior
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_date, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(start_date), int(event_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def get_events(status: str = None, cursor: str = None, limit: int = None, now: datetime = None) -> tuple:
+    """
+    Eventos ordenados por start_date descendente (desempate por id).
+
+    Args:
+        status: upcoming | live | past (None = todos)
+        cursor: Cursor devuelto por la página anterior
+        limit: Tamaño de página (None = sin paginar)
+
+    Returns:
+        (eventos, next_cursor); next_cursor es None en la última página
+    """
+    now = now or timezone.now()
+    if normalize_status(status) == "live" and not cursor and limit is None:
+        return list(get_live_events(now)), None
+
+    events = Event.objects.order_by("-start_date", "-id")
+    if status:
+        events = filter_by_status(events, status, now)
+
+    if cursor:
+        start_date, event_id = decode_cursor(cursor)
+        events = events.filter(Q(start_date__lt=start_date) | Q(start_date=start_date, id__lt=event_id))
+
+    if limit is None:
+        return list(events), None
+
+    page = list(events[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(page[-1])
+
+
+# ============================================
+# EVENTOS CERCANOS
+# ============================================
+
+def _in_cells(events, cells: list):
+    """
+    Prefijo como rango [celda, celda + "{"): "{" ordena justo después de
+    "z", el último carácter base32, y el rango usa el índice de geohash.
+    """
+    condition = Q()
+    for cell in cells:
+        condition |= Q(geohash__gte=cell, geohash__lt=cell + "{")
+    return events.filter(condition)
+
+
+def get_nearby_events(latitude: float, longitude: float, radius_km: float = NEARBY_DEFAULT_RADIUS_KM,
+                      limit: int = DEFAULT_PAGE_SIZE, status: str = None, now: datetime = None) -> list:
+    """
+    Eventos a menos de radius_km de un punto, del más cercano al más lejano.
+
+    Las celdas de geohash que cubren el círculo acotan los candidatos (una
+    consulta con rangos sobre el índice); la distancia exacta (haversine)
+    se calcula para todos los candidatos en una pasada de NumPy y sólo los
+    `limit` más cercanos se cargan completos.
+
+    Args:
+        status: upcoming | live | past (None = todos)
+
+    Returns:
+        [(event, distance_km), ...]
+    """
+    events = Event.objects.all()
+    if status:
+        events = filter_by_status(events, status, now or timezone.now())
+
+    cells = geo.cover_cells(latitude, longitude, radius_km)
+    if cells:
+        events = _in_cells(events, cells)
+
+    # Las celdas cubren más que el círculo: el rectángulo descarta en SQL lo que sobra
+    lat_min, lat_max, lng_min, lng_max = geo.bounding_box(latitude, longitude, radius_km)
+    events = events.filter(latitude__gte=lat_min, latitude__lte=lat_max)
+    if -180 <= lng_min and lng_max <= 180:
+        events = events.filter(longitude__gte=lng_min, longitude__lte=lng_max)
+
+    candidates = np.array(list(events.values_list("id", "latitude", "longitude")), dtype=np.float64)
+    if not len(candidates):
+        return []
+
+    distances = geo.haversine_km(latitude, longitude, candidates[:, 1], candidates[:, 2])
+    inside = np.flatnonzero(distances <= radius_km)
+    if len(inside) > limit:
+        inside = inside[np.argpartition(distances[inside], limit)[:limit]]
+    inside = inside[np.argsort(distances[inside], kind="stable")]
+
+    ids = candidates[inside, 0].astype(np.int64).tolist()
+    by_id = Event.objects.in_bulk(ids)
+    return [(by_id[event_id], float(distance)) for event_id, distance in zip(ids, distances[inside])]
+
+
+def rebuild_geohashes(chunk_size: int = 1000) -> int:
+    """
+    Recalcula Event.geohash (backfill, o tras un QuerySet.update de
+    coordenadas, que no pasa por save()).
+
+    Returns:
+        Eventos cuyo geohash cambió
+    """
+    changed, last_id = 0, 0
+    while True:
+        events = Event.objects.filter(id__gt=last_id).order_by("id").only("latitude", "longitude", "geohash")
+        chunk = list(events[:chunk_size])
+        if not chunk:
+            return changed
+
+        stale = []
+        for event in chunk:
+            geohash = geo.encode(event.latitude, event.longitude)
+            if event.geohash != geohash:
+                event.geohash = geohash
+                stale.append(event)
+        Event.objects.bulk_update(stale, ["geohash"])
+        changed += len(stale)
+        last_id = chunk[-1].id
+
+
+# ============================================
+# VALIDADORES HTTP
+# ============================================
+
+def _status_boundaries(now: datetime) -> dict:
+    """
+    Cambios de estado más cercanos a now: el resultado de un filtro por
+    estado sólo cambia con una escritura o cuando now cruza uno de ellos.
+    Cada valor es una búsqueda en el índice de start_date o end_date.
+    """
+    def first(queryset, field):
+        return queryset.order_by(field).values_list(field.lstrip("-"), flat=True).first()
+
+    return {
+        "last_start": first(Event.objects.filter(start_date__lte=now), "-start_date"),
+        "last_end": first(Event.objects.filter(end_date__lt=now), "-end_date"),
+        "next_start": first(Event.objects.filter(start_date__gt=now), "start_date"),
+        "next_end": first(Event.objects.filter(end_date__gte=now), "end_date"),
+    }
+
+
+# ============================================
+# EVENTOS EN CURSO
+# ============================================
+
+_snapshot = {}
+_snapshot_lock = threading.Lock()
+
+
+def _snapshot_valid(snapshot: dict, key: tuple, now: datetime) -> bool:
+    """
+    Sin escrituras (misma versión de la tabla) y sin cruzar un límite
+    desde que se calculó: ningún evento empezó ni terminó entretanto.
+    """
+    if not snapshot or snapshot["key"] != key or now < snapshot["computed_at"]:
+        return False
+    boundaries = snapshot["boundaries"]
+    if boundaries["next_start"] and now >= boundaries["next_start"]:
+        return False
+    if boundaries["next_end"] and now > boundaries["next_end"]:
+        return False
+    return True
+
+
+def _status_snapshot(now: datetime, version: tuple) -> dict:
+    """
+    Límites de estado y eventos en curso, recalculados sólo tras una
+    escritura en Event o cuando now cruza el próximo inicio o fin.
+    """
+    with _snapshot_lock:
+        snapshot = _snapshot.get("current")
+    if _snapshot_valid(snapshot, version, now):
+        return snapshot
+
+    snapshot = {
+        "key": version,
+        "computed_at": now,
+        "boundaries": _status_boundaries(now),
+        "live": tuple(Event.objects.live(now).order_by("-start_date", "-id")),
+    }
+    with _snapshot_lock:
+        _snapshot["current"] = snapshot
+    return snapshot
+
+
+def get_live_events(now: datetime = None) -> tuple:
+    """
+    Eventos en curso (start_date <= now <= end_date), más recientes primero.
+
+    Mientras no haya escrituras ni cambios de estado cuesta sólo la
+    consulta de versión de la tabla; al recalcular, la lista es un rango
+    sobre el índice (end_date, start_date).
+    """
+    return _status_snapshot(now or timezone.now(), get_versions("event")["event"])["live"]
+
+
+def clear_live_events():
+    with _snapshot_lock:
+        _snapshot.clear()
+
+
+def get_events_validators(variant: str, status: str = None, now: datetime = None) -> tuple:
+    """
+    ETag fuerte y Last-Modified de una respuesta de /api/events/.
+
+    Args:
+        variant: Todo lo que cambia la representación (query params, Accept)
+        status: Filtro de estado pedido
+
+    Returns:
+        (etag, last_modified)
+    """
+    version, last_modified = get_versions("event")["event"]
+    parts = [variant]
+
+    if status:
+        boundaries = _status_snapshot(now or timezone.now(), (version, last_modified))["boundaries"]
+        parts += [boundaries["next_start"], boundaries["next_end"]]
+        crossed = [value for value in (last_modified, boundaries["last_start"], boundaries["last_end"]) if value]
+        last_modified = max(crossed) if crossed else None
+
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"events-{version}-{digest}"', last_modified
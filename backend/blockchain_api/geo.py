@@ -0,0 +1,111 @@
+"""
+geo.py
+Geohash y distancias para la búsqueda de eventos cercanos.
+
+Un geohash codifica (lat, lng) en una cadena base32 en la que cada
+carácter subdivide la celda anterior: las coordenadas de una misma celda
+comparten prefijo. Event guarda el geohash de PRECISION caracteres en una
+columna indexada; una búsqueda por radio se traduce en unos pocos rangos
+de prefijo sobre las celdas que cubren el círculo (ver cover_cells).
+"""
+
+import math
+
+import numpy as np
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9
+MAX_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude: float, longitude: float, precision: int = PRECISION) -> str:
+    """
+    Geohash de una coordenada (bits de longitud y latitud intercalados).
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = value * 2 + 1
+            interval[0] = middle
+        else:
+            value *= 2
+            interval[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple:
+    """
+    Returns:
+        (alto, ancho) en grados de una celda de la precisión indicada
+    """
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """
+    Returns:
+        (lat_min, lat_max, lng_min, lng_max) que contiene el círculo; la
+        longitud puede salirse de [-180, 180] (cruce del antimeridiano)
+    """
+    d_lat = radius_km / KM_PER_DEGREE
+    lat_min, lat_max = max(-90.0, latitude - d_lat), min(90.0, latitude + d_lat)
+
+    # El círculo es más ancho en grados en su borde más cercano al polo
+    edge = max(abs(lat_min), abs(lat_max))
+    if edge >= 90.0 or d_lat / math.cos(math.radians(edge)) >= 180.0:
+        return lat_min, lat_max, -180.0, 180.0
+    d_lng = d_lat / math.cos(math.radians(edge))
+    return lat_min, lat_max, longitude - d_lng, longitude + d_lng
+
+
+def cover_cells(latitude: float, longitude: float, radius_km: float) -> list:
+    """
+    Celdas (prefijos de geohash) que cubren el círculo: las de la precisión
+    más fina que lo abarca con a lo sumo MAX_CELLS celdas.
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(latitude, longitude, radius_km)
+
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = range(int((lat_min + 90) // height), min(int((lat_max + 90) // height), int(180 / height) - 1) + 1)
+        columns = range(int((lng_min + 180) // width), int((lng_max + 180) // width) + 1)
+        if len(rows) * len(columns) > MAX_CELLS:
+            continue
+
+        cells = set()
+        for row in rows:
+            for column in columns:
+                # Centro de la celda; el módulo resuelve el antimeridiano
+                lng = ((column + 0.5) * width) % 360 - 180
+                cells.add(encode((row + 0.5) * height - 90, lng, precision))
+        return sorted(cells)
+
+    return []
+
+
+def haversine_km(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """
+    Distancia en km desde un punto a cada coordenada, en una sola pasada
+    vectorizada.
+    """
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lng2 = np.radians(np.asarray(longitudes, dtype=np.float64))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
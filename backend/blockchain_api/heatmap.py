@@ -0,0 +1,189 @@
+"""
+heatmap.py
+Grilla de calor precalculada en varios niveles de zoom.
+
+Cada nivel divide el mundo en celdas de 360 / 2^zoom grados. Al crear un
+CheckIn se incrementa su celda en todos los niveles (signals.py); el
+comando rebuild_heatmap reconstruye la grilla desde cero.
+
+Cada celda guarda además la suma de coordenadas para devolver el centroide
+real de sus check-ins en vez del centro geométrico.
+"""
+
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .models import CheckIn, HeatmapCell
+
+ZOOM_LEVELS = tuple(sorted(getattr(settings, "HEATMAP_ZOOM_LEVELS", (4, 7, 10, 13, 16))))
+MAX_CELLS = getattr(settings, "HEATMAP_MAX_CELLS", 5000)
+
+
+def cell_size(zoom: int) -> float:
+    """
+    Tamaño de celda en grados para un nivel de zoom.
+    """
+    return 360.0 / (2 ** zoom)
+
+
+def cell_for(latitude: float, longitude: float, zoom: int) -> tuple:
+    """
+    Returns:
+        (cell_x, cell_y) de la coordenada en el nivel indicado
+    """
+    size = cell_size(zoom)
+    return math.floor((longitude + 180) / size), math.floor((latitude + 90) / size)
+
+
+def snap_zoom(zoom: int) -> int:
+    """
+    Nivel precalculado más cercano por debajo del zoom pedido.
+    """
+    levels = [level for level in ZOOM_LEVELS if level <= zoom]
+    return levels[-1] if levels else ZOOM_LEVELS[0]
+
+
+# ============================================
+# ACTUALIZACIÓN
+# ============================================
+
+def _apply(zoom: int, cell_x: int, cell_y: int, count: int, latitude_sum: float, longitude_sum: float):
+    cell = HeatmapCell.objects.filter(zoom=zoom, cell_x=cell_x, cell_y=cell_y)
+    changes = {
+        "count": F("count") + count,
+        "latitude_sum": F("latitude_sum") + latitude_sum,
+        "longitude_sum": F("longitude_sum") + longitude_sum,
+    }
+
+    if cell.update(**changes) or count <= 0:
+        return
+
+    try:
+        with transaction.atomic():
+            HeatmapCell.objects.create(
+                zoom=zoom, cell_x=cell_x, cell_y=cell_y,
+                count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum
+            )
+    except IntegrityError:
+        # Otro request creó la celda en paralelo
+        cell.update(**changes)
+
+
+def record_checkins(points, delta: int = 1):
+    """
+    Suma (o resta con delta=-1) check-ins a la grilla en todos los niveles.
+
+    Args:
+        points: Iterable de (latitude, longitude)
+    """
+    totals = _aggregate(points, delta)
+    for (zoom, cell_x, cell_y), (count, latitude_sum, longitude_sum) in totals.items():
+        _apply(zoom, cell_x, cell_y, count, latitude_sum, longitude_sum)
+
+
+def _aggregate(points, delta: int = 1) -> dict:
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for latitude, longitude in points:
+        if latitude is None or longitude is None:
+            continue
+        for zoom in ZOOM_LEVELS:
+            cell_x, cell_y = cell_for(latitude, longitude, zoom)
+            total = totals[(zoom, cell_x, cell_y)]
+            total[0] += delta
+            total[1] += latitude * delta
+            total[2] += longitude * delta
+    return totals
+
+
+def rebuild_heatmap(chunk_size: int = 5000) -> int:
+    """
+    Reconstruye toda la grilla desde la tabla CheckIn.
+
+    Returns:
+        Cantidad de celdas creadas
+    """
+    points = (
+        CheckIn.objects
+        .filter(latitude__isnull=False, longitude__isnull=False)
+        .values_list("latitude", "longitude")
+        .iterator(chunk_size=chunk_size)
+    )
+    totals = _aggregate(points)
+
+    with transaction.atomic():
+        HeatmapCell.objects.all().delete()
+        HeatmapCell.objects.bulk_create(
+            (
+                HeatmapCell(
+                    zoom=zoom, cell_x=cell_x, cell_y=cell_y,
+                    count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum
+                )
+                for (zoom, cell_x, cell_y), (count, latitude_sum, longitude_sum) in totals.items()
+            ),
+            batch_size=chunk_size
+        )
+
+    return len(totals)
+
+
+# ============================================
+# CONSULTA
+# ============================================
+
+def cells_in_bbox(bbox: tuple, zoom: int):
+    """
+    Celdas con check-ins dentro de un bounding box.
+
+    Args:
+        bbox: (min_lng, min_lat, max_lng, max_lat); si min_lng > max_lng
+              el box cruza el antimeridiano
+        zoom: Zoom del mapa (se ajusta al nivel precalculado más cercano)
+
+    Returns:
+        QuerySet de (count, latitude_sum, longitude_sum)
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    zoom = snap_zoom(zoom)
+
+    _, min_y = cell_for(min_lat, -180, zoom)
+    _, max_y = cell_for(max_lat, -180, zoom)
+    min_x, _ = cell_for(0, min_lng, zoom)
+    max_x, _ = cell_for(0, max_lng, zoom)
+
+    if min_lng <= max_lng:
+        x_filter = Q(cell_x__range=(min_x, max_x))
+    else:
+        x_filter = Q(cell_x__gte=min_x) | Q(cell_x__lte=max_x)
+
+    return (
+        HeatmapCell.objects
+        .filter(x_filter, zoom=zoom, cell_y__range=(min_y, max_y), count__gt=0)
+        .values_list("count", "latitude_sum", "longitude_sum")
+    )
+
+
+def get_heatmap_cells(bbox: tuple, zoom: int) -> list:
+    """
+    Celdas con check-ins dentro de un bounding box (ver cells_in_bbox).
+
+    Returns:
+        [{"latitude": float, "longitude": float, "count": int}]; raise
+        ValueError si hay más de MAX_CELLS celdas (bbox demasiado grande
+        para el zoom)
+    """
+    cells = list(cells_in_bbox(bbox, zoom)[:MAX_CELLS + 1])
+    if len(cells) > MAX_CELLS:
+        raise ValueError(f"More than {MAX_CELLS} cells: narrow the bbox or lower the zoom")
+
+    return [
+        {
+            "latitude": latitude_sum / count,
+            "longitude": longitude_sum / count,
+            "count": count
+        }
+        for count, latitude_sum, longitude_sum in cells
+    ]
@@ -0,0 +1,87 @@
+"""
+hyperloglog.py
+HyperLogLog para contar usuarios únicos aproximados.
+
+Con precisión p se usan m = 2^p registros de un byte. El error estándar de
+la estimación es 1.04 / sqrt(m):
+
+    p = 12 → m = 4096 registros (4 KB) → error estándar ≈ 1.6 %
+
+Es decir, ~68 % de las estimaciones quedan dentro de ±1.6 % del valor real
+y ~95 % dentro de ±3.2 %. Para cardinalidades bajas (< 2.5 m) se usa
+linear counting, que es prácticamente exacto con pocos usuarios.
+
+Dos sketches se combinan (unión) tomando el máximo registro a registro,
+así los sketches diarios se suman para cualquier ventana de días.
+"""
+
+import hashlib
+import math
+
+PRECISION = 12
+
+
+def _hash64(value) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog serializable como bytes.
+    """
+
+    def __init__(self, registers: bytes = None, precision: int = PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError("Invalid HyperLogLog register size")
+
+    def position(self, value) -> tuple:
+        """
+        Returns:
+            (índice del registro, rango) que le corresponden a un elemento
+        """
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        return index, (64 - self.precision) - rest.bit_length() + 1
+
+    def add(self, value) -> bool:
+        """
+        Agrega un elemento.
+
+        Returns:
+            True si el sketch cambió (hay que persistirlo)
+        """
+        index, rank = self.position(value)
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog"):
+        self.merge_registers(other.registers)
+
+    def merge_registers(self, registers: bytes, offset: int = 0):
+        """
+        Combina los registros de otro sketch, o un tramo de ellos que empieza en offset.
+        """
+        end = offset + len(registers)
+        self.registers[offset:end] = bytearray(map(max, self.registers[offset:end], registers))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting para cardinalidades bajas
+            estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
@@ -0,0 +1,192 @@
+"""
+indexer.py
+Indexador local de logs EventCheckedIn.
+
+Ingiere los logs del contrato con eth_getLogs y los guarda en
+OnChainCheckIn, avanzando un cursor persistido (IndexerCursor). En cada
+ejecución retrocede `reorg_depth` bloques y los vuelve a ingerir, de modo
+que un reorg corto reemplaza los logs huérfanos.
+
+Las lecturas de check-ins (get_user_checkins y estadísticas) consultan esta
+tabla mientras el indexador esté al día; si no, blockchain_service vuelve a
+la llamada directa al contrato.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from web3 import Web3
+
+from . import blockchain_service
+from .models import IndexerCursor, OnChainCheckIn
+
+CURSOR_NAME = "event_checked_in"
+BATCH_SIZE = getattr(settings, "CHECKIN_INDEXER_BATCH_SIZE", 2000)
+REORG_DEPTH = getattr(settings, "CHECKIN_INDEXER_REORG_DEPTH", 12)
+MAX_LAG_SECONDS = getattr(settings, "CHECKIN_INDEXER_MAX_LAG", 300)
+
+
+# ============================================
+# INGESTA
+# ============================================
+
+def sync_checkins(batch_size: int = None, reorg_depth: int = None, from_block: int = None) -> dict:
+    """
+    Ingiere los logs EventCheckedIn nuevos hasta el último bloque.
+
+    Args:
+        batch_size: Bloques por llamada eth_getLogs
+        reorg_depth: Bloques a re-ingerir por detrás del cursor
+        from_block: Fuerza el bloque inicial (reindexado)
+
+    Returns:
+        {
+            "from_block": int,
+            "to_block": int,
+            "indexed": int
+        }
+    """
+    batch_size = batch_size or BATCH_SIZE
+    reorg_depth = REORG_DEPTH if reorg_depth is None else reorg_depth
+
+    # Si el nodo no responde se propaga el error: el cursor no se toca y
+    # index_available() deja de dar el índice por vigente
+    head = blockchain_service.fetch_block_number()
+    cursor, _ = IndexerCursor.objects.get_or_create(name=CURSOR_NAME)
+
+    if from_block is not None:
+        start = from_block
+    else:
+        start = max(0, cursor.block_number + 1 - reorg_depth)
+
+    indexed = 0
+    block = start
+    rewound = False
+
+    while block <= head:
+        end = min(block + batch_size - 1, head)
+        logs = blockchain_service.get_checkin_logs(block, end)
+
+        with transaction.atomic():
+            if not rewound:
+                # Los bloques re-ingeridos reemplazan lo indexado (reorg)
+                OnChainCheckIn.objects.filter(block_number__gte=start).delete()
+                rewound = True
+
+            OnChainCheckIn.objects.bulk_create(
+                [
+                    OnChainCheckIn(
+                        user_address=log["user"],
+                        event_id=log["eventId"],
+                        location=log["location"],
+                        timestamp=log["timestamp"],
+                        block_number=log["block_number"],
+                        tx_hash=log["tx_hash"],
+                        log_index=log["log_index"]
+                    )
+                    for log in logs
+                ],
+                ignore_conflicts=True
+            )
+
+            cursor.block_number = end
+            cursor.save(update_fields=["block_number", "updated_at"])
+
+        indexed += len(logs)
+        block = end + 1
+
+    if not rewound:
+        # Sin bloques nuevos (head leído del nodo): sólo marcar el cursor como al día
+        cursor.save(update_fields=["updated_at"])
+
+    return {"from_block": start, "to_block": head, "indexed": indexed}
+
+
+# ============================================
+# LECTURA
+# ============================================
+
+def index_available() -> bool:
+    """
+    True si el indexador corrió recientemente (cursor al día).
+    """
+    since = timezone.now() - timedelta(seconds=MAX_LAG_SECONDS)
+    return IndexerCursor.objects.filter(name=CURSOR_NAME, updated_at__gte=since).exists()
+
+
+async def aindex_available() -> bool:
+    """
+    Versión asíncrona de index_available (ORM async).
+    """
+    since = timezone.now() - timedelta(seconds=MAX_LAG_SECONDS)
+    return await IndexerCursor.objects.filter(name=CURSOR_NAME, updated_at__gte=since).aexists()
+
+
+def _to_dict(row: OnChainCheckIn) -> dict:
+    return {
+        "user": row.user_address,
+        "location": row.location,
+        "timestamp": row.timestamp,
+        "eventId": row.event_id
+    }
+
+
+def get_indexed_checkins(user_address: str, offset: int = 0, limit: int = None) -> tuple:
+    """
+    Página de check-ins de un usuario desde la tabla indexada.
+
+    Returns:
+        (checkins, total) en orden cronológico, mismo formato que get_user_checkins
+    """
+    queryset = OnChainCheckIn.objects.filter(
+        user_address=Web3.to_checksum_address(user_address)
+    ).order_by("block_number", "log_index")
+
+    total = queryset.count()
+    end = offset + limit if limit is not None else None
+    return [_to_dict(row) for row in queryset[offset:end]], total
+
+
+async def aget_indexed_checkins(user_address: str, offset: int = 0, limit: int = None) -> tuple:
+    """
+    Versión asíncrona de get_indexed_checkins (ORM async).
+    """
+    queryset = OnChainCheckIn.objects.filter(
+        user_address=Web3.to_checksum_address(user_address)
+    ).order_by("block_number", "log_index")
+
+    total = await queryset.acount()
+    end = offset + limit if limit is not None else None
+    return [_to_dict(row) async for row in queryset[offset:end]], total
+
+
+def get_indexed_last_checkin(user_address: str) -> dict:
+    row = (
+        OnChainCheckIn.objects
+        .filter(user_address=Web3.to_checksum_address(user_address))
+        .order_by("-block_number", "-log_index")
+        .first()
+    )
+    return _to_dict(row) if row else None
+
+
+def indexed_has_checked_in(user_address: str, event_id: int) -> bool:
+    return OnChainCheckIn.objects.filter(
+        user_address=Web3.to_checksum_address(user_address),
+        event_id=event_id
+    ).exists()
+
+
+def get_indexed_event_stats(event_id: int) -> dict:
+    stats = OnChainCheckIn.objects.filter(event_id=event_id).aggregate(
+        total=Count("id"),
+        unique_users=Count("user_address", distinct=True)
+    )
+    return {
+        "totalCheckIns": stats["total"],
+        "uniqueUsers": stats["unique_users"],
+        "exists": stats["total"] > 0
+    }
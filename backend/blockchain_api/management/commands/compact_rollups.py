@@ -0,0 +1,30 @@
+"""
+compact_rollups
+Recalcula los agregados diarios (DailyLocationStat, DailyUserSketch) desde
+la tabla CheckIn. Corrige los sketches tras borrados y sirve de backfill
+inicial.
+
+Uso:
+    python manage.py compact_rollups              # todo el historial
+    python manage.py compact_rollups --days 2     # sólo ayer y hoy
+"""
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.rollups import compact_rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcula los agregados diarios de check-ins"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        scope = f"últimos {options['days']} días" if options["days"] else "todo el historial"
+        self.stdout.write(f"📊 Compactando agregados diarios ({scope})...")
+        result = compact_rollups(days=options["days"], chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['days']} días, {result['locations']} filas por ubicación"
+        ))
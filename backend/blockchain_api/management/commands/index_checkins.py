@@ -0,0 +1,58 @@
+"""
+index_checkins
+Indexa los logs EventCheckedIn del contrato en la tabla OnChainCheckIn.
+
+Uso:
+    python manage.py index_checkins                 # una pasada
+    python manage.py index_checkins --loop          # proceso continuo
+    python manage.py index_checkins --from-block 0  # reindexar desde cero
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.indexer import sync_checkins
+
+
+class Command(BaseCommand):
+    help = "Indexa logs EventCheckedIn (eth_getLogs) con cursor de bloques"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Bloques por llamada eth_getLogs")
+        parser.add_argument("--reorg-depth", type=int, default=None,
+                            help="Bloques a re-ingerir por detrás del cursor")
+        parser.add_argument("--from-block", type=int, default=None,
+                            help="Bloque inicial (fuerza reindexado)")
+        parser.add_argument("--loop", action="store_true",
+                            help="Seguir indexando bloques nuevos")
+        parser.add_argument("--interval", type=float, default=5.0,
+                            help="Segundos entre pasadas con --loop")
+
+    def handle(self, *args, **options):
+        from_block = options["from_block"]
+
+        while True:
+            try:
+                result = sync_checkins(
+                    batch_size=options["batch_size"],
+                    reorg_depth=options["reorg_depth"],
+                    from_block=from_block
+                )
+                self.stdout.write(
+                    f"📦 Bloques {result['from_block']}-{result['to_block']}: "
+                    f"{result['indexed']} check-ins indexados"
+                )
+            except Exception as e:
+                if not options["loop"]:
+                    raise
+                self.stderr.write(f"⚠️ Error indexando check-ins: {e}")
+
+            if not options["loop"]:
+                break
+
+            from_block = None
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("✅ Indexación completada"))
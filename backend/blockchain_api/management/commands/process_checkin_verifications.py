@@ -0,0 +1,38 @@
+"""
+process_checkin_verifications
+Procesa las verificaciones de check-in que quedaron pendientes
+(por ejemplo tras reiniciar el servidor con la cola en memoria).
+
+Uso:
+    python manage.py process_checkin_verifications
+    python manage.py process_checkin_verifications --timeout 30
+"""
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.checkin_queue import process_verification
+from blockchain_api.models import CheckInVerification
+
+
+class Command(BaseCommand):
+    help = "Verifica en blockchain los check-ins asíncronos pendientes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=None,
+                            help="Segundos máximos de espera por transacción")
+
+    def handle(self, *args, **options):
+        pending_ids = list(
+            CheckInVerification.objects
+            .filter(status=CheckInVerification.STATUS_PENDING)
+            .order_by("created_at")
+            .values_list("id", flat=True)
+        )
+
+        self.stdout.write(f"🔎 {len(pending_ids)} verificaciones pendientes")
+
+        for verification_id in pending_ids:
+            verification = process_verification(verification_id, timeout=options["timeout"])
+            self.stdout.write(f"  • #{verification.id} {verification.tx_hash[:10]}... → {verification.status}")
+
+        self.stdout.write(self.style.SUCCESS("✅ Verificaciones procesadas"))
@@ -0,0 +1,25 @@
+"""
+rebuild_geohashes
+Recalcula Event.geohash desde latitude/longitude. Sirve de backfill al
+agregar la columna y tras cambios de coordenadas que no pasan por
+Event.save() (QuerySet.update, SQL manual).
+
+Uso:
+    python manage.py rebuild_geohashes
+"""
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.events_service import rebuild_geohashes
+
+
+class Command(BaseCommand):
+    help = "Recalcula el geohash de los eventos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write("🧭 Recalculando geohashes de eventos...")
+        changed = rebuild_geohashes(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {changed} eventos actualizados"))
@@ -0,0 +1,24 @@
+"""
+rebuild_heatmap
+Reconstruye la grilla de calor (HeatmapCell) desde la tabla CheckIn.
+Útil para el backfill inicial o si los contadores se desincronizan.
+
+Uso:
+    python manage.py rebuild_heatmap
+"""
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.heatmap import ZOOM_LEVELS, rebuild_heatmap
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la grilla de calor precalculada"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"🗺️ Reconstruyendo grilla en niveles {', '.join(map(str, ZOOM_LEVELS))}...")
+        cells = rebuild_heatmap(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {cells} celdas creadas"))
@@ -0,0 +1,30 @@
+"""
+reconcile_counters
+Corrige UserProfile.checkin_count y Event.attendee_count comparándolos con
+un COUNT real de CheckIn y EventAttendance. Sirve de backfill inicial y
+tras borrados masivos o cambios por SQL que no pasan por signals.py.
+
+Uso:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --dry-run   # sólo informa
+"""
+
+from django.core.management.base import BaseCommand
+
+from blockchain_api.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de check-ins y asistentes desincronizados"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔢 Comparando contadores con los conteos reales...")
+        result = reconcile_counters(chunk_size=options["chunk_size"], dry_run=options["dry_run"])
+        verb = "desincronizados" if options["dry_run"] else "corregidos"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['users']} usuarios y {result['events']} eventos {verb}"
+        ))
@@ -0,0 +1,130 @@
+"""
+map_stream.py
+Cuerpo JSON de GET /api/mapa/ generado por partes.
+
+Los eventos y check-ins se leen con iterator() (nunca se cargan todos en
+memoria) y el JSON se emite en bloques de CHUNK_ITEMS elementos. Con zoom,
+los clusters son las celdas precalculadas de la grilla de calor (ver
+heatmap.py) del nivel zoom + CLUSTER_ZOOM_OFFSET (~1/4 del ancho de un
+tile), ajustado al nivel disponible más cercano: no se recorre CheckIn ni
+se acumula nada en memoria.
+"""
+
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.utils.encoders import JSONEncoder
+
+from .heatmap import cells_in_bbox, snap_zoom
+from .models import CheckIn, Event
+from .serializers import EventSerializer
+
+CHUNK_ITEMS = getattr(settings, "MAP_STREAM_CHUNK_ITEMS", 1000)
+CLUSTER_ZOOM_OFFSET = getattr(settings, "MAP_CLUSTER_ZOOM_OFFSET", 2)
+WORLD = (-180, -90, 180, 90)
+
+
+def bbox_filter(bbox: tuple) -> Q:
+    """
+    Filtro por latitude/longitude dentro del bbox (soporta cruce del antimeridiano).
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    lat_filter = Q(latitude__range=(min_lat, max_lat))
+    if min_lng <= max_lng:
+        return lat_filter & Q(longitude__range=(min_lng, max_lng))
+    return lat_filter & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng))
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+
+
+def _json_array(items, totals: dict, key: str):
+    """
+    Emite los elementos como array JSON, en bloques, contándolos en totals[key].
+    """
+    yield "["
+    buffer = []
+    count = 0
+    for item in items:
+        buffer.append(_dumps(item))
+        count += 1
+        if len(buffer) >= CHUNK_ITEMS:
+            yield ("," if count > len(buffer) else "") + ",".join(buffer)
+            buffer = []
+    if buffer:
+        yield ("," if count > len(buffer) else "") + ",".join(buffer)
+    yield "]"
+    totals[key] = count
+
+
+def _events(bbox: tuple):
+    events = Event.objects.order_by("id")
+    if bbox is not None:
+        events = events.filter(bbox_filter(bbox))
+    for event in events.iterator(chunk_size=CHUNK_ITEMS):
+        yield EventSerializer(event).data
+
+
+def _checkin_rows(bbox: tuple):
+    checkins = CheckIn.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    if bbox is not None:
+        checkins = checkins.filter(bbox_filter(bbox))
+    return checkins.values_list("latitude", "longitude", "location").iterator(chunk_size=CHUNK_ITEMS)
+
+
+def _checkins(bbox: tuple, totals: dict):
+    count = 0
+    for latitude, longitude, location in _checkin_rows(bbox):
+        count += 1
+        yield {"latitude": latitude, "longitude": longitude, "count": 1, "location": location}
+    totals["total_checkins"] = count
+
+
+def _clusters(bbox: tuple, zoom: int, totals: dict):
+    level = snap_zoom(zoom + CLUSTER_ZOOM_OFFSET)
+    cells = cells_in_bbox(bbox or WORLD, level).iterator(chunk_size=CHUNK_ITEMS)
+    count = 0
+
+    for weight, latitude_sum, longitude_sum in cells:
+        count += weight
+        yield {
+            "latitude": latitude_sum / weight,
+            "longitude": longitude_sum / weight,
+            "count": weight,
+            "location": None
+        }
+
+    # Incluye los check-ins de las celdas del borde que quedan fuera del bbox
+    totals["total_checkins"] = count
+
+
+def stream_map(bbox: tuple = None, zoom: int = None):
+    """
+    Genera el JSON del mapa por partes.
+
+    Args:
+        bbox: (min_lng, min_lat, max_lng, max_lat) o None para todo el mundo
+        zoom: Zoom del mapa; si se indica, los check-ins se agrupan en clusters
+              (las celdas no guardan la ubicación: location es None)
+
+    Los totales van al final del objeto porque se conocen al terminar de leer.
+    """
+    totals = {}
+
+    yield '{"status":"success"'
+    if zoom is not None:
+        yield f',"zoom":{zoom}'
+
+    yield ',"eventos":'
+    yield from _json_array(_events(bbox), totals, "total_events")
+
+    yield ',"checkins":'
+    if zoom is None:
+        yield from _json_array(_checkins(bbox, totals), totals, "total_points")
+    else:
+        yield from _json_array(_clusters(bbox, zoom, totals), totals, "total_clusters")
+
+    totals.pop("total_points", None)
+    yield "," + _dumps(totals)[1:]
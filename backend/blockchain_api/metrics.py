@@ -0,0 +1,405 @@
+"""
+metrics.py
+Métricas en formato de texto de Prometheus (GET /api/metrics).
+
+Contadores e histogramas en memoria del proceso: registrar una muestra es
+un incremento bajo un lock, sin I/O. Con METRICS_DIR, un thread de fondo
+vuelca cada METRICS_FLUSH_INTERVAL segundos un snapshot del proceso a
+METRICS_DIR/<pid>.json y el endpoint suma los snapshots de todos los
+workers (gunicorn/uwsgi con prefork). Como los contadores son acumulados,
+el snapshot de un worker que ya terminó no se descarta: al recolectar se
+suma a METRICS_DIR/archived.json y se borra su archivo, así el directorio
+no crece con cada reinicio de workers y los totales no retroceden.
+
+Los contadores que ya llevan otros módulos (caché de cadena, caché de
+respuestas) se leen al tomar el snapshot con register_collector, sin
+agregar nada a su camino caliente.
+
+Configuración por entorno:
+    METRICS_DIR             Directorio compartido por los workers (sin definir = sólo este proceso)
+    METRICS_FLUSH_INTERVAL  Segundos entre snapshots (por defecto 5)
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sin prefork ni flock, no hay snapshots de workers muertos que podar
+    fcntl = None
+
+from .rpc_pool import add_request_hook
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_metrics = {}
+_lock = threading.Lock()
+_flusher = None
+
+
+class Counter:
+    """
+    Contador acumulado con etiquetas: inc(*valores_de_etiquetas).
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _metrics[name] = self
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+        if _flusher is None and METRICS_DIR:
+            _start_flusher()
+
+    def values(self) -> dict:
+        """
+        Returns:
+            {tupla de etiquetas: valor}
+        """
+        with _lock:
+            return dict(self._values)
+
+    def reset(self):
+        with _lock:
+            self._values.clear()
+
+
+class Histogram(Counter):
+    """
+    Histograma con buckets fijos: observe(valor, *valores_de_etiquetas).
+
+    Por etiqueta guarda [n por bucket..., n en +Inf, suma].
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+        if _flusher is None and METRICS_DIR:
+            _start_flusher()
+
+    def values(self) -> dict:
+        with _lock:
+            return {labels: list(counts) for labels, counts in self._values.items()}
+
+
+class CollectedCounter(Counter):
+    """
+    Contador cuyo valor lo entrega collect() al tomar el snapshot.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, collect):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def values(self) -> dict:
+        try:
+            return dict(self.collect())
+        except Exception as e:
+            print(f"⚠️ Error leyendo métrica {self.name}: {e}")
+            return {}
+
+
+def register_collector(name: str, documentation: str, labelnames: tuple, collect) -> CollectedCounter:
+    """
+    Expone contadores que ya mantiene otro módulo.
+
+    Args:
+        collect: Función que devuelve {tupla de etiquetas: valor}
+    """
+    return CollectedCounter(name, documentation, labelnames, collect)
+
+
+# ============================================
+# MÉTRICAS DE LA API
+# ============================================
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP por vista", ("view", "method")
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests HTTP por vista y código de respuesta", ("view", "method", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Consultas SQL por request", ("view",), QUERY_BUCKETS
+)
+RPC_LATENCY = Histogram(
+    "rpc_request_duration_seconds", "Latencia de los round trips JSON-RPC (method=batch para batches)", ("method",)
+)
+RPC_CALLS = Counter(
+    "rpc_calls_total", "Llamadas JSON-RPC por método, incluidas las que viajan en batches", ("method",)
+)
+VERIFICATIONS = Counter(
+    "checkin_verifications_total", "Verificaciones de check-in por resultado", ("result",)
+)
+EVENT_CACHE = Counter(
+    "event_metadata_cache_requests_total", "Lecturas de la caché de metadatos de eventos", ("result",)
+)
+SIGNATURE_CACHE = Counter(
+    "signature_cache_requests_total", "Lecturas de la caché de firmas de login verificadas", ("result",)
+)
+
+
+def _on_rpc_request(method: str, calls: list, duration: float):
+    RPC_LATENCY.observe(duration, method)
+    for call in calls:
+        RPC_CALLS.inc(call)
+
+
+add_request_hook(_on_rpc_request)
+
+
+# ============================================
+# SNAPSHOTS MULTIPROCESO
+# ============================================
+
+def snapshot() -> dict:
+    """
+    Valores de este proceso en formato serializable.
+
+    Returns:
+        {nombre: {"type", "help", "labels", "buckets", "values": [[etiquetas, valor]]}}
+    """
+    return {
+        name: {
+            "type": metric.kind,
+            "help": metric.documentation,
+            "labels": list(metric.labelnames),
+            "buckets": list(getattr(metric, "buckets", [])),
+            "values": [[list(labels), value] for labels, value in metric.values().items()],
+        }
+        for name, metric in list(_metrics.items())
+    }
+
+
+def _path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+
+def _write_json(path: str, data: dict):
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def flush():
+    """
+    Escribe el snapshot del proceso en METRICS_DIR (escritura atómica).
+    """
+    if not METRICS_DIR:
+        return
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _write_json(_path(os.getpid()), snapshot())
+    except OSError as e:
+        print(f"⚠️ Error guardando métricas en {METRICS_DIR}: {e}")
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def _start_flusher():
+    global _flusher
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+    _flusher.start()
+
+
+def _reset_after_fork():
+    # Los valores heredados son del proceso padre, que los publica con su pid
+    global _lock, _flusher
+    _lock = threading.Lock()
+    _flusher = None
+    for metric in _metrics.values():
+        if not isinstance(metric, CollectedCounter):
+            metric._values.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(flush)
+
+
+def _merge(total: dict, snap: dict):
+    for name, data in snap.items():
+        current = total.get(name)
+        if current is None:
+            total[name] = {**data, "values": {tuple(labels): value for labels, value in data["values"]}}
+            continue
+        if current["buckets"] != data["buckets"]:
+            # Snapshot de otra versión del código: buckets incompatibles
+            continue
+
+        values = current["values"]
+        for labels, value in data["values"]:
+            labels = tuple(labels)
+            if labels not in values:
+                values[labels] = value
+            elif data["type"] == "histogram":
+                values[labels] = [a + b for a, b in zip(values[labels], value)]
+            else:
+                values[labels] += value
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, pero de otro usuario
+        return True
+    return True
+
+
+def _dead_snapshots() -> list:
+    paths = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        name = os.path.basename(path)[:-len(".json")]
+        if name.isdigit() and int(name) != os.getpid() and not _alive(int(name)):
+            paths.append(path)
+    return paths
+
+
+def prune() -> int:
+    """
+    Suma los snapshots de workers terminados a archived.json y borra sus
+    archivos. Un flock sobre METRICS_DIR/.lock evita que dos workers
+    archiven el mismo snapshot.
+
+    Returns:
+        Cantidad de snapshots archivados
+    """
+    if not METRICS_DIR or fcntl is None or not _dead_snapshots():
+        return 0
+
+    archive = os.path.join(METRICS_DIR, "archived.json")
+    with open(os.path.join(METRICS_DIR, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        # Otro worker pudo haberlos archivado mientras se esperaba el lock
+        dead = _dead_snapshots()
+        if not dead:
+            return 0
+
+        total = {}
+        for path in [archive, *dead]:
+            try:
+                with open(path) as f:
+                    _merge(total, json.load(f))
+            except FileNotFoundError:
+                continue
+
+        _write_json(archive, {
+            name: {**data, "values": [[list(labels), value] for labels, value in data["values"].items()]}
+            for name, data in total.items()
+        })
+        for path in dead:
+            os.remove(path)
+
+    return len(dead)
+
+
+def collect() -> dict:
+    """
+    Suma este proceso (valores en vivo) y los snapshots del resto de workers.
+    """
+    total = {}
+    _merge(total, snapshot())
+
+    if METRICS_DIR:
+        try:
+            prune()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Error archivando snapshots de métricas: {e}")
+
+        own = _path(os.getpid())
+        for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    _merge(total, json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Snapshot de métricas ilegible {path}: {e}")
+
+    return total
+
+
+# ============================================
+# FORMATO DE TEXTO DE PROMETHEUS
+# ============================================
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in [*zip(names, values), *extra]]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(metrics: dict = None) -> str:
+    """
+    Métricas en el formato de exposición de texto de Prometheus (0.0.4).
+    """
+    metrics = collect() if metrics is None else metrics
+    lines = []
+
+    for name, data in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {_escape(data['help'])}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        names = data["labels"]
+
+        for labels, value in sorted(data["values"].items()):
+            if data["type"] != "histogram":
+                lines.append(f"{name}{_labels(names, labels)} {_number(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip([*data["buckets"], float("inf")], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(names, labels, (('le', _number(float(bound))),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(names, labels)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
@@ -1,11 +1,28 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from . import geo
+
+
+# campo__lower: búsquedas por prefijo sin distinguir mayúsculas (admin.py)
+models.CharField.register_lookup(Lower)
+
 
 class UserProfile(models.Model):
     wallet_address = models.CharField(max_length=100, unique=True)
     username = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Desnormalizado: CheckIn del usuario (ver counters.py)
+    checkin_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="userprofile_created_at_idx"),
+            models.Index(Lower("wallet_address"), name="userprofile_wallet_lower_idx"),
+            # Búsqueda por prefijo del admin (admin.py)
+            models.Index(Lower("username"), name="userprofile_username_lower_idx"),
+        ]
 
     def __str__(self):
         return self.username or self.wallet_address
@@ -19,19 +36,84 @@ class CheckIn(models.Model):
     tx_hash = models.CharField(max_length=100)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="checkin_timestamp_idx"),
+            models.Index(fields=["latitude", "longitude"], name="checkin_coords_idx"),
+            models.Index(fields=["tx_hash"], name="checkin_tx_hash_idx"),
+            # Búsqueda por prefijo del admin (admin.py)
+            models.Index(Lower("location"), name="checkin_location_lower_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.wallet_address} → {self.location}"
 
 
+class EventQuerySet(models.QuerySet):
+    """
+    Estado de los eventos calculado en SQL a partir de start_date/end_date.
+
+    upcoming: aún no empieza · live: en curso · past: ya terminó
+    """
+
+    def upcoming(self, now=None):
+        return self.filter(start_date__gt=now or timezone.now())
+
+    def live(self, now=None):
+        now = now or timezone.now()
+        # end_date >= now primero: el rango sólo recorre eventos sin terminar (índice end_date, start_date)
+        return self.filter(end_date__gte=now, start_date__lte=now)
+
+    def past(self, now=None):
+        return self.filter(end_date__lt=now or timezone.now())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create no llama a save(): el geohash se completa acá
+        objs = list(objs)
+        for event in objs:
+            event.geohash = geo.encode(event.latitude, event.longitude)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def with_status(self, now=None):
+        now = now or timezone.now()
+        return self.annotate(status=models.Case(
+            models.When(start_date__gt=now, then=models.Value("upcoming")),
+            models.When(end_date__lt=now, then=models.Value("past")),
+            default=models.Value("live"),
+            output_field=models.CharField(),
+        ))
+
+
 class Event(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     location = models.CharField(max_length=255)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    # Derivado de latitude/longitude en save() (ver geo.py)
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     created_at = models.DateTimeField(default=timezone.now)
+    # Desnormalizado: EventAttendance del evento (ver counters.py)
+    attendee_count = models.PositiveIntegerField(default=0)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start_date", "id"], name="event_start_date_idx"),
+            models.Index(fields=["end_date", "start_date"], name="event_end_date_idx"),
+            models.Index(fields=["latitude", "longitude"], name="event_coords_idx"),
+            models.Index(fields=["geohash"], name="event_geohash_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.geohash = geo.encode(self.latitude, self.longitude)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.start_date.date()} - {self.end_date.date()})"
@@ -42,6 +124,15 @@ class EventAttendance(models.Model):
     tx_hash = models.CharField(max_length=255)
     timestamp = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tx_hash"], name="unique_attendance_tx_hash"),
+            models.UniqueConstraint(fields=["user", "event"], name="unique_attendance_user_event"),
+        ]
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="attendance_timestamp_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.wallet_address} asistió a {self.event.name}"
 
@@ -52,5 +143,151 @@ class WalletUser(models.Model):
     address = models.CharField(max_length=255, unique=True)
     last_login = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(Lower("address"), name="walletuser_address_lower_idx"),
+        ]
+
     def __str__(self):
         return self.address
+
+
+class CheckInVerification(models.Model):
+    """
+    Check-in pendiente de verificación en blockchain (modo asíncrono).
+    Al verificarse se crean los registros EventAttendance y CheckIn.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_VERIFIED = "verified"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendiente"),
+        (STATUS_VERIFIED, "Verificado"),
+        (STATUS_FAILED, "Fallido"),
+    ]
+
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="verifications")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="verifications")
+    tx_hash = models.CharField(max_length=255, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    attendance = models.OneToOneField(
+        EventAttendance, on_delete=models.SET_NULL, null=True, blank=True, related_name="verification"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="verification_created_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tx_hash[:10]}... ({self.status})"
+
+
+class OnChainCheckIn(models.Model):
+    """
+    Log EventCheckedIn indexado desde blockchain (ver indexer.py).
+    Reemplaza la lectura de getUserCheckIns() en cada request.
+    """
+    user_address = models.CharField(max_length=42)
+    event_id = models.PositiveBigIntegerField(db_index=True)
+    location = models.CharField(max_length=255)
+    timestamp = models.BigIntegerField()
+    block_number = models.BigIntegerField(db_index=True)
+    tx_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tx_hash", "log_index"], name="unique_onchain_checkin_log"),
+        ]
+        indexes = [
+            models.Index(fields=["user_address", "block_number", "log_index"], name="onchain_checkin_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_address} → evento {self.event_id} (bloque {self.block_number})"
+
+
+class IndexerCursor(models.Model):
+    """
+    Último bloque procesado por un indexador de logs.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    block_number = models.BigIntegerField(default=-1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.block_number}"
+
+
+class HeatmapCell(models.Model):
+    """
+    Conteo de check-ins en una celda de la grilla lat/lng de un nivel de zoom.
+    Mantenido incrementalmente por heatmap.py.
+    """
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    count = models.IntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["zoom", "cell_x", "cell_y"], name="unique_heatmap_cell"),
+        ]
+
+    def __str__(self):
+        return f"z{self.zoom} ({self.cell_x}, {self.cell_y}): {self.count}"
+
+
+class DailyLocationStat(models.Model):
+    """
+    Check-ins por ubicación y día (UTC). Mantenido por rollups.py.
+    """
+    day = models.DateField()
+    location = models.CharField(max_length=100)
+    checkins = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "location"], name="unique_daily_location"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.location}: {self.checkins}"
+
+
+class DailyUserSketch(models.Model):
+    """
+    Tramo (shard) del sketch HyperLogLog de los usuarios distintos con
+    check-in en un día (UTC): los registros [shard * n, (shard + 1) * n).
+    """
+    day = models.DateField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    registers = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "shard"], name="unique_daily_user_sketch"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} #{self.shard}"
+
+
+class TableVersion(models.Model):
+    """
+    Versión de una tabla, incrementada en cada escritura (signals.py).
+    Permite validar respuestas cacheadas sin consultar la tabla.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
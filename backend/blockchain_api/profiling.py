@@ -0,0 +1,287 @@
+"""
+profiling.py
+Perfilado por request: cuánto tiempo se fue en SQL, RPC y render.
+
+ProfilingMiddleware (activo con PROFILING_ENABLED) agrega a cada respuesta
+un header Server-Timing, visible en las DevTools del navegador:
+
+    Server-Timing: db;dur=3.1;desc="12 queries", rpc;dur=41.0;desc="1 requests, 3 calls",
+                   render;dur=0.8, app;dur=5.2, total;dur=50.1
+
+    • db: consultas SQL (execute_wrapper en todas las conexiones)
+    • rpc: round trips JSON-RPC (hook de rpc_pool, también el cliente async)
+    • render: render de la respuesta DRF (serialización a JSON); en las
+      vistas con cached_view el render ocurre dentro de la vista (app)
+    • app: el resto (vista, serializers, middleware)
+
+Los requests que superan PROFILING_SLOW_MS se imprimen con sus consultas.
+Una fracción PROFILING_SAMPLE_RATE de los requests síncronos se perfila
+con cProfile y se guarda en PROFILING_DIR (abrir con snakeviz o pstats).
+
+MetricsMiddleware (activo salvo METRICS_ENABLED=False) sólo cuenta: latencia,
+código de respuesta y consultas SQL por vista, para GET /api/metrics.
+"""
+
+import contextvars
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import REQUEST_LATENCY, REQUEST_QUERIES, REQUESTS
+from .rpc_pool import add_request_hook
+
+MAX_QUERIES = 200
+
+_current = contextvars.ContextVar("request_profile", default=None)
+_query_count = contextvars.ContextVar("request_query_count", default=None)
+_wrappers = []
+# cProfile admite un solo perfilador activo a la vez por proceso
+_profiler_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Contadores y duraciones de un request.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.rpc_count = 0
+        self.rpc_calls = 0
+        self.rpc_time = 0.0
+        self.render_time = 0.0
+        self.queries = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total: float) -> str:
+        app = max(0.0, total - self.db_time - self.rpc_time - self.render_time)
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+            f'rpc;dur={self.rpc_time * 1000:.1f};desc="{self.rpc_count} requests, {self.rpc_calls} calls"',
+            f"render;dur={self.render_time * 1000:.1f}",
+            f"app;dur={app * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+
+# ============================================
+# INSTRUMENTACIÓN
+# ============================================
+
+def _execute(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        profile.db_count += 1
+        profile.db_time += duration
+        if len(profile.queries) < MAX_QUERIES:
+            profile.queries.append((sql, duration))
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _attach(connection):
+    for wrapper in _wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _attach(connection)
+
+
+def _instrument(wrapper):
+    """
+    Agrega un execute_wrapper a todas las conexiones, actuales y futuras.
+    """
+    if wrapper not in _wrappers:
+        _wrappers.append(wrapper)
+    # Las conexiones de otros threads (ORM async) se instrumentan al crearse
+    connection_created.connect(_on_connection_created, dispatch_uid="profiling")
+    for connection in connections.all(initialized_only=True):
+        _attach(connection)
+
+
+def _on_rpc_request(method: str, calls: list, duration: float):
+    profile = _current.get()
+    if profile is not None:
+        profile.rpc_count += 1
+        profile.rpc_calls += len(calls)
+        profile.rpc_time += duration
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class ProfilingMiddleware:
+    """
+    Server-Timing, log de requests lentos y cProfile muestreado.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "PROFILING_SLOW_MS", 500)
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.profile_dir = getattr(settings, "PROFILING_DIR", "profiles")
+
+        _instrument(_execute)
+        add_request_hook(_on_rpc_request)
+
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        profile = RequestProfile()
+        request.profiling = profile
+        token = _current.set(profile)
+        sampled = random.random() < self.sample_rate and _profiler_lock.acquire(blocking=False)
+
+        try:
+            if sampled:
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+                self._save_profile(request, profiler)
+            else:
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+            if sampled:
+                _profiler_lock.release()
+
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        request.profiling = profile
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile)
+
+    def process_template_response(self, request, response):
+        # Se llama justo antes de response.render()
+        profile = getattr(request, "profiling", None)
+        if profile is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                profile.render_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, profile: RequestProfile):
+        total = profile.elapsed()
+        response["Server-Timing"] = profile.server_timing(total)
+
+        if total * 1000 >= self.slow_ms:
+            self._log_slow(request, response, profile, total)
+        return response
+
+    def _log_slow(self, request, response, profile: RequestProfile, total: float):
+        print(
+            f"🐢 Request lento: {request.method} {request.get_full_path()} → {response.status_code} "
+            f"en {total * 1000:.0f} ms | db {profile.db_count} consultas {profile.db_time * 1000:.0f} ms | "
+            f"rpc {profile.rpc_count} requests {profile.rpc_time * 1000:.0f} ms | "
+            f"render {profile.render_time * 1000:.0f} ms"
+        )
+        for sql, duration in profile.queries:
+            print(f"   {duration * 1000:8.2f} ms  {sql[:300]}")
+        if profile.db_count > len(profile.queries):
+            print(f"   ... {profile.db_count - len(profile.queries)} consultas más")
+
+    def _save_profile(self, request, profiler: cProfile.Profile):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{slug}.prof")
+        profiler.dump_stats(path)
+        print(f"📊 Perfil guardado en {path}")
+
+
+class MetricsMiddleware:
+    """
+    Latencia, código de respuesta y consultas SQL por vista (ver metrics.py).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        _instrument(_count_query)
+
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        counter = [0]
+        token = _query_count.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        self._record(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        counter = [0]
+        token = _query_count.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        self._record(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    def _record(self, request, response, duration: float, queries: int):
+        # Sólo rutas resueltas: las URLs arbitrarias no crean etiquetas nuevas
+        view = request.resolver_match.view_name if request.resolver_match else "unmatched"
+        REQUEST_LATENCY.observe(duration, view, request.method)
+        REQUESTS.inc(view, request.method, str(response.status_code))
+        REQUEST_QUERIES.observe(queries, view)
@@ -0,0 +1,224 @@
+"""
+response_cache.py
+Caché de respuestas GET para vistas que sólo cambian con escrituras.
+
+La clave incluye la versión de las tablas de las que depende la vista
+(table_versions.py, incrementadas por signals.py), así que una escritura
+invalida todas las respuestas afectadas sin borrar nada: las entradas
+viejas simplemente dejan de consultarse y expiran.
+
+Protección contra estampida: ante un miss, sólo el request que obtiene el
+lock (cache.add) recalcula. El resto recibe la última respuesta conocida
+(X-Cache: STALE) o, si no hay ninguna, espera a que el primero termine.
+
+Backend: alias RESPONSE_CACHE_ALIAS de CACHES, separado del resto de la
+caché (memoria local acotada por defecto, Redis con REDIS_URL). Las
+respuestas de más de MAX_BYTES no se guardan.
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .metrics import register_collector
+from .table_versions import get_versions
+
+ALIAS = getattr(settings, "RESPONSE_CACHE_ALIAS", "responses")
+TIMEOUT = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 600)
+STALE_TIMEOUT = getattr(settings, "RESPONSE_CACHE_STALE_TIMEOUT", 3600)
+MAX_BYTES = getattr(settings, "RESPONSE_CACHE_MAX_BYTES", 256 * 1024)
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.05
+
+_stats = defaultdict(lambda: {"hits": 0, "stale": 0, "misses": 0, "bypass": 0})
+_stats_lock = threading.Lock()
+
+
+def _count(view: str, outcome: str):
+    with _stats_lock:
+        _stats[view][outcome] += 1
+
+
+def get_response_cache_stats() -> dict:
+    """
+    Hits, respuestas stale y misses por vista (contadores del proceso).
+    """
+    with _stats_lock:
+        stats = {}
+        for view, counts in _stats.items():
+            served = counts["hits"] + counts["stale"] + counts["misses"]
+            stats[view] = {
+                **counts,
+                "hit_rate": round((counts["hits"] + counts["stale"]) / served, 4) if served else 0.0
+            }
+        return stats
+
+
+def reset_response_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+_METRIC_RESULTS = {"hits": "hit", "stale": "stale", "misses": "miss", "bypass": "bypass"}
+
+
+def _collect_stats() -> dict:
+    with _stats_lock:
+        return {
+            (view, _METRIC_RESULTS[outcome]): count
+            for view, counts in _stats.items()
+            for outcome, count in counts.items()
+        }
+
+
+register_collector(
+    "response_cache_requests_total", "Respuestas de la caché de respuestas por vista y resultado",
+    ("view", "result"), _collect_stats
+)
+
+
+# ============================================
+# ENTRADAS
+# ============================================
+
+def _to_entry(response, content: bytes) -> dict:
+    return {
+        "status": response.status_code,
+        "content": content,
+        "content_type": response["Content-Type"],
+        "headers": {header: response[header] for header in ("Vary", "Allow") if response.has_header(header)},
+    }
+
+
+def _from_entry(entry: dict, outcome: str) -> HttpResponse:
+    response = HttpResponse(entry["content"], status=entry["status"], content_type=entry["content_type"])
+    for header, value in entry["headers"].items():
+        response[header] = value
+    response["X-Cache"] = outcome
+    return response
+
+
+def _store(cache, keys: tuple, entry: dict):
+    key, stale_key, _ = keys
+    cache.set(key, entry, TIMEOUT)
+    cache.set(stale_key, entry, STALE_TIMEOUT)
+
+
+def _stream_and_store(response, content, cache, keys: tuple, release: bool):
+    """
+    Reenvía un StreamingHttpResponse y lo guarda al terminar si no supera MAX_BYTES.
+    """
+    chunks, size = [], 0
+    try:
+        for chunk in content:
+            if chunks is not None:
+                size += len(chunk)
+                if size <= MAX_BYTES:
+                    chunks.append(chunk)
+                else:
+                    chunks = None
+            yield chunk
+        if chunks is not None:
+            _store(cache, keys, _to_entry(response, b"".join(chunks)))
+    finally:
+        if release:
+            cache.delete(keys[2])
+
+
+# ============================================
+# DECORADOR
+# ============================================
+
+def cached_view(*tables, vary=None, bypass=None, key=None):
+    """
+    Cachea las respuestas GET 200 de una vista.
+
+    Args:
+        tables: Tablas de las que depende la respuesta ("checkin", "event", ...)
+        vary: Función request → str con otras dependencias de la clave
+              (por ejemplo, la fecha actual)
+        bypass: Función request → bool; True para no usar la caché
+        key: Función request → str que reemplaza a la ruta completa en la
+             clave (por ejemplo, con el bbox ya ajustado a la grilla)
+
+    Se aplica por fuera de @api_view para cachear la respuesta ya renderizada.
+    Las respuestas llevan X-Cache: HIT | STALE | MISS.
+    """
+    def decorator(view):
+        # @api_view devuelve una función "view"; el nombre real está en view_class
+        name = getattr(view, "view_class", view).__name__
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or (bypass and bypass(request)):
+                if request.method in ("GET", "HEAD"):
+                    _count(name, "bypass")
+                return view(request, *args, **kwargs)
+
+            cache = caches[ALIAS]
+            variant = hashlib.sha1(repr((
+                key(request) if key else request.get_full_path(),
+                request.META.get("HTTP_ACCEPT", ""),
+                vary(request) if vary else None,
+            )).encode()).hexdigest()
+            versions = ".".join(str(version) for version, _ in get_versions(*tables).values())
+            keys = (
+                f"resp:{name}:{versions}:{variant}",
+                f"resp-stale:{name}:{variant}",
+                f"resp-lock:{name}:{variant}",
+            )
+
+            entry = cache.get(keys[0])
+            if entry is not None:
+                _count(name, "hits")
+                return _from_entry(entry, "HIT")
+
+            locked = cache.add(keys[2], 1, LOCK_TIMEOUT)
+            if not locked:
+                # Otro request está recalculando
+                entry = cache.get(keys[1])
+                if entry is not None:
+                    _count(name, "stale")
+                    return _from_entry(entry, "STALE")
+
+                deadline = time.monotonic() + LOCK_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(LOCK_POLL)
+                    entry = cache.get(keys[0])
+                    if entry is not None:
+                        _count(name, "hits")
+                        return _from_entry(entry, "HIT")
+
+            _count(name, "misses")
+            release = locked
+            try:
+                response = view(request, *args, **kwargs)
+
+                if response.status_code == 200 and response.streaming:
+                    response.streaming_content = _stream_and_store(
+                        response, response.streaming_content, cache, keys, locked
+                    )
+                    # El lock se libera al terminar de enviar el cuerpo
+                    release = False
+                elif response.status_code == 200:
+                    if hasattr(response, "render"):
+                        response.render()
+                    if len(response.content) <= MAX_BYTES:
+                        _store(cache, keys, _to_entry(response, response.content))
+            finally:
+                if release:
+                    cache.delete(keys[2])
+
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,282 @@
+"""
+rpc_pool.py
+Pool de endpoints JSON-RPC con sesiones keep-alive, health scoring y failover.
+
+Cada endpoint mantiene una sesión HTTP persistente y métricas de salud
+(latencia EWMA, tasa de error EWMA, fallos consecutivos). Los requests van
+al endpoint con mejor puntaje; las lecturas que tardan más de `hedge_after`
+se duplican a un segundo endpoint y gana la primera respuesta (salvo las
+caras, HEAVY_METHODS, que sólo se reintentan si fallan). Un endpoint con
+`eject_after` fallos seguidos queda fuera del pool `eject_seconds`.
+
+Configuración por entorno:
+    RPC_URLS            Lista separada por comas (por defecto RPC_URL)
+    RPC_POOL_SIZE       Conexiones keep-alive por endpoint
+    RPC_TIMEOUT         Timeout por request (s)
+    RPC_HEDGE_AFTER_MS  Latencia tras la cual se duplica una lectura (0 = sin hedging)
+    RPC_EJECT_AFTER     Fallos consecutivos para expulsar un endpoint
+    RPC_EJECT_SECONDS   Duración de la expulsión (s)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers.base import JSONBaseProvider
+
+POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", 10))
+TIMEOUT = float(os.getenv("RPC_TIMEOUT", 10))
+HEDGE_AFTER = float(os.getenv("RPC_HEDGE_AFTER_MS", 300)) / 1000
+EJECT_AFTER = int(os.getenv("RPC_EJECT_AFTER", 3))
+EJECT_SECONDS = float(os.getenv("RPC_EJECT_SECONDS", 30))
+
+# Peso de la última muestra en las medias móviles
+EWMA_ALPHA = 0.2
+
+# Métodos sin efectos: se pueden reintentar y duplicar (hedging)
+READ_METHODS = {
+    "web3_clientVersion",
+    "net_version",
+    "eth_chainId",
+    "eth_blockNumber",
+    "eth_call",
+    "eth_getBlockByNumber",
+    "eth_getBlockByHash",
+    "eth_getLogs",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+}
+
+# Lecturas caras (rangos de bloques): duplicarlas dobla la carga sobre los
+# nodos justo cuando están lentos, así que no se hace hedging
+HEAVY_METHODS = {
+    "eth_getLogs",
+}
+
+HEADERS = {"Content-Type": "application/json"}
+
+# Observadores de requests RPC: hook(method, calls, duration_s), con calls la
+# lista de métodos del request (ver profiling.py y metrics.py)
+_request_hooks = []
+
+
+def add_request_hook(hook):
+    if hook not in _request_hooks:
+        _request_hooks.append(hook)
+
+
+def notify_request(method: str, calls: list, duration: float):
+    """
+    Informa un round trip JSON-RPC a los observadores registrados.
+    """
+    for hook in _request_hooks:
+        hook(method, calls, duration)
+
+
+class RPCEndpoint:
+    """
+    Endpoint JSON-RPC con su sesión HTTP y métricas de salud.
+    """
+
+    def __init__(self, url: str, pool_size: int = POOL_SIZE):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.requests += 1
+            self.latency = latency if self.latency is None else \
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+            self.error_rate *= (1 - EWMA_ALPHA)
+            self.consecutive_failures = 0
+
+    def record_failure(self, eject_after: int, eject_seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= eject_after:
+                self.ejected_until = time.monotonic() + eject_seconds
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def score(self) -> float:
+        """
+        Menor es mejor: latencia penalizada por la tasa de error.
+        Un endpoint sin muestras se prueba con una latencia optimista.
+        """
+        latency = self.latency if self.latency is not None else 0.0
+        return latency * (1 + 10 * self.error_rate) + self.error_rate
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "url": self.url,
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejected": not self.available(now),
+        }
+
+
+class RPCPool:
+    """
+    Conjunto de endpoints con enrutamiento por salud, hedging y failover.
+    """
+
+    def __init__(self, urls: list, pool_size: int = POOL_SIZE, timeout: float = TIMEOUT,
+                 hedge_after: float = HEDGE_AFTER, eject_after: int = EJECT_AFTER,
+                 eject_seconds: float = EJECT_SECONDS):
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+
+        self.endpoints = [RPCEndpoint(url, pool_size) for url in urls]
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.hedged_requests = 0
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="rpc-hedge") \
+            if len(self.endpoints) > 1 and hedge_after else None
+
+    def ranked(self) -> list:
+        """
+        Endpoints disponibles ordenados por puntaje. Si todos están
+        expulsados, se devuelven por orden de reingreso.
+        """
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.available(now)]
+        if healthy:
+            return sorted(healthy, key=lambda e: e.score())
+        return sorted(self.endpoints, key=lambda e: e.ejected_until)
+
+    def _send(self, endpoint: RPCEndpoint, payload: bytes) -> bytes:
+        start = time.perf_counter()
+        try:
+            response = endpoint.session.post(endpoint.url, data=payload, headers=HEADERS, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception:
+            endpoint.record_failure(self.eject_after, self.eject_seconds)
+            raise
+        endpoint.record_success(time.perf_counter() - start)
+        return response.content
+
+    def post(self, payload: bytes, read_only: bool = False, hedge: bool = True) -> bytes:
+        """
+        Envía un payload JSON-RPC (simple o batch) y devuelve la respuesta cruda.
+
+        Args:
+            payload: Request JSON-RPC codificado
+            read_only: Si es lectura, se puede duplicar y reintentar en otro endpoint
+            hedge: False para lecturas caras: se reintentan pero no se duplican
+        """
+        candidates = self.ranked()
+
+        if not read_only:
+            return self._send(candidates[0], payload)
+
+        if hedge and self._executor is not None and len(candidates) > 1:
+            return self._post_hedged(payload, candidates)
+
+        return self._post_failover(payload, candidates)
+
+    def _post_failover(self, payload: bytes, candidates: list) -> bytes:
+        last_error = None
+        for endpoint in candidates:
+            try:
+                return self._send(endpoint, payload)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def _post_hedged(self, payload: bytes, candidates: list) -> bytes:
+        pending = {self._executor.submit(self._send, candidates[0], payload)}
+        used = 1
+
+        done, _ = wait(pending, timeout=self.hedge_after)
+        if not done:
+            # El primario está lento: duplicar al segundo mejor
+            self.hedged_requests += 1
+            pending.add(self._executor.submit(self._send, candidates[1], payload))
+            used = 2
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+
+        # Todos los intentos fallaron: probar el resto del pool
+        if used < len(candidates):
+            return self._post_failover(payload, candidates[used:])
+        raise future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "hedged_requests": self.hedged_requests,
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints]
+        }
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """
+    Provider de web3 que envía los requests a través de un RPCPool.
+    """
+
+    def __init__(self, pool: RPCPool, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def __str__(self) -> str:
+        return f"RPC pool: {[endpoint.url for endpoint in self.pool.endpoints]}"
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        start = time.perf_counter()
+        try:
+            raw_response = self.pool.post(
+                request_data, read_only=method in READ_METHODS, hedge=method not in HEAVY_METHODS
+            )
+        finally:
+            notify_request(method, [method], time.perf_counter() - start)
+        return self.decode_rpc_response(raw_response)
+
+    def make_batch_request(self, batch_requests):
+        request_data = self.encode_batch_rpc_request(batch_requests)
+        read_only = all(method in READ_METHODS for method, _ in batch_requests)
+        hedge = not any(method in HEAVY_METHODS for method, _ in batch_requests)
+        start = time.perf_counter()
+        try:
+            raw_response = self.pool.post(request_data, read_only=read_only, hedge=hedge)
+        finally:
+            notify_request("batch", [method for method, _ in batch_requests], time.perf_counter() - start)
+        response = self.decode_rpc_response(raw_response)
+        if not isinstance(response, list):
+            # Los errores RPC del batch vienen en una única respuesta
+            return response
+        return sorted(response, key=lambda r: r.get("id") or 0)
+
+
+def get_rpc_urls(default_url: str) -> list:
+    """
+    Endpoints configurados en RPC_URLS, o el RPC_URL por defecto.
+    """
+    urls = [url.strip() for url in os.getenv("RPC_URLS", "").split(",") if url.strip()]
+    return urls or [default_url]
@@ -1,7 +1,23 @@
 from rest_framework import serializers
-from .models import Event
+from .models import Event, CheckInVerification
 
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
-        fields = "__all__"
+        # attendee_count cambia con cada check-in: va aparte, sin caché (ver counters.py)
+        exclude = ("attendee_count",)
+        # Derivado en Event.save
+        read_only_fields = ("geohash",)
+
+
+class CheckInVerificationSerializer(serializers.ModelSerializer):
+    verification_id = serializers.IntegerField(source="id", read_only=True)
+    wallet_address = serializers.CharField(source="user.wallet_address", read_only=True)
+    attendance_id = serializers.IntegerField(source="attendance.id", read_only=True, default=None)
+
+    class Meta:
+        model = CheckInVerification
+        fields = (
+            "verification_id", "status", "tx_hash", "event", "wallet_address",
+            "attempts", "error", "attendance_id", "created_at", "updated_at",
+        )
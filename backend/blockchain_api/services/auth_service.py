@@ -1,14 +1,196 @@
+"""
+auth_service.py
+Verificación de firmas de MetaMask (personal_sign) para login_wallet.
+
+La recuperación ECDSA de eth_keys es Python puro (~7 ms por firma) y
+retiene el GIL. Con AUTH_SIGNATURE_WORKERS > 0 se ejecuta en un pool de
+procesos: en una avalancha de logins los threads del servidor siguen
+atendiendo I/O y las firmas se verifican en paralelo. Por defecto es 0
+(en el thread del request): cada worker del servidor tendría su propio
+pool, y con N workers x cpu_count procesos se sobresuscribe la máquina.
+Conviene habilitarlo con pocos workers de servidor y un valor chico (2-4).
+
+Las verificaciones exitosas (address, nonce, firma) se recuerdan
+AUTH_SIGNATURE_CACHE_TTL segundos: reintentos y doble envío no repiten la
+recuperación. La recuperación es determinista, así que la caché no acepta
+nada que la verificación completa rechazaría.
+
+Configuración por entorno:
+    AUTH_SIGNATURE_WORKERS    Procesos del pool por worker (default 0 = en el thread del request)
+    AUTH_SIGNATURE_TIMEOUT    Espera máxima por una firma (s)
+    AUTH_SIGNATURE_CACHE_TTL  Segundos que se recuerda una firma válida
+    AUTH_SIGNATURE_CACHE_SIZE Máximo de firmas recordadas
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from eth_account import Account
 from eth_account.messages import encode_defunct
-from web3 import Web3
 
-def verify_signature(address: str, signature: str, nonce: str) -> bool:
+from ..metrics import SIGNATURE_CACHE
+
+WORKERS = int(os.getenv("AUTH_SIGNATURE_WORKERS", 0))
+TIMEOUT = float(os.getenv("AUTH_SIGNATURE_TIMEOUT", 10))
+CACHE_TTL = float(os.getenv("AUTH_SIGNATURE_CACHE_TTL", 60))
+CACHE_SIZE = int(os.getenv("AUTH_SIGNATURE_CACHE_SIZE", 10000))
+
+_pool = None
+_pool_lock = threading.Lock()
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def _recover(nonce: str, signature: str) -> str:
     """
-    Verifica si la firma de MetaMask corresponde al address indicado.
+    Dirección que firmó el nonce (se ejecuta en el pool).
+    """
+    return Account.recover_message(encode_defunct(text=nonce), signature=signature)
+
+
+# ============================================
+# POOL DE PROCESOS
+# ============================================
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los workers no heredan threads ni conexiones del servidor
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """
+    Detiene el pool de firmas. Necesario antes de terminar un proceso de
+    multiprocessing: sus workers no son daemon y el proceso esperaría por ellos.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _reset_after_fork():
+    # El pool del proceso padre no es utilizable en el hijo
+    global _pool, _pool_lock, _verified_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+    _verified_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def recover_signer(nonce: str, signature: str) -> str:
+    """
+    Recupera la dirección firmante, en el pool si está habilitado.
+    Si el pool se rompe (worker muerto), se recrea y la firma se verifica
+    en el thread actual.
     """
+    if WORKERS <= 0:
+        return _recover(nonce, signature)
+
+    pool = _get_pool()
+    try:
+        future = pool.submit(_recover, nonce, signature)
+    except RuntimeError:
+        # Otro thread cerró este pool tras un fallo
+        return _recover(nonce, signature)
+
+    try:
+        return future.result(timeout=TIMEOUT)
+    except BrokenProcessPool:
+        print("⚠️ Pool de firmas caído, recreando")
+        _discard_pool(pool)
+        return _recover(nonce, signature)
+
+
+# ============================================
+# CACHÉ DE FIRMAS VERIFICADAS
+# ============================================
+
+def _cache_key(address: str, signature: str, nonce: str) -> tuple:
+    return address.lower(), nonce, signature.lower().removeprefix("0x")
+
+
+def _is_cached(key: tuple) -> bool:
+    with _verified_lock:
+        expires_at = _verified.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del _verified[key]
+            return False
+        return True
+
+
+def _remember(key: tuple):
+    with _verified_lock:
+        _verified[key] = time.monotonic() + CACHE_TTL
+        _verified.move_to_end(key)
+        while len(_verified) > CACHE_SIZE:
+            _verified.popitem(last=False)
+
+
+def clear_signature_cache():
+    with _verified_lock:
+        _verified.clear()
+
+
+# ============================================
+# VERIFICACIÓN
+# ============================================
+
+def check_signature(address: str, signature: str, nonce: str) -> tuple:
+    """
+    Verifica que `signature` sea la firma personal_sign de `nonce` hecha por `address`.
+
+    Returns:
+        (True, None) si la firma es válida; (False, mensaje de error) si no
+    """
+    key = _cache_key(address, signature, nonce)
+    if CACHE_TTL > 0 and _is_cached(key):
+        SIGNATURE_CACHE.inc("hit")
+        return True, None
+    SIGNATURE_CACHE.inc("miss")
+
     try:
-        message = encode_defunct(text=nonce)
-        recovered_address = Web3().eth.account.recover_message(message, signature=signature)
-        return recovered_address.lower() == address.lower()
+        recovered = recover_signer(nonce, signature)
+    except TimeoutError:
+        raise
     except Exception as e:
-        print("❌ Error verificando firma:", e)
-        return False
+        return False, f"Invalid signature: {str(e)}"
+
+    if recovered.lower() != address.lower():
+        return False, "Signature verification failed"
+
+    if CACHE_TTL > 0:
+        _remember(key)
+    return True, None
+
+
+def verify_signature(address: str, signature: str, nonce: str) -> bool:
+    """
+    Verifica si la firma de MetaMask corresponde al address indicado.
+    """
+    verified, error = check_signature(address, signature, nonce)
+    if error:
+        print("❌ Error verificando firma:", error)
+    return verified
@@ -0,0 +1,129 @@
+"""
+token_service.py
+Nonces de login y tokens de sesión firmados con HMAC (django.core.signing).
+
+Los dos llevan su propio timestamp y se validan con HMAC-SHA256 sobre
+SECRET_KEY y una comparación en tiempo constante, sin base de datos. Un
+token no se puede revocar antes de expirar, por eso su vida es corta
+(AUTH_TOKEN_TTL). Un nonce está atado a la wallet que lo pidió y sirve
+para un solo login: al usarse se marca en la caché AUTH_NONCE_CACHE_ALIAS
+(cache.add, atómico) hasta que expira. Esa caché es sólo para las marcas:
+si compartiera espacio con las respuestas cacheadas, éstas podrían
+desalojar una marca y el nonce volvería a servir. Con varios workers
+(WEB_CONCURRENCY > 1) debe ser compartida (REDIS_URL); si no, el
+arranque falla (check_nonce_cache).
+
+Flujo:
+    1. GET /api/auth/nonce/?address=0x...  → nonce firmado por el servidor
+    2. El cliente firma el nonce con MetaMask (personal_sign)
+    3. POST /api/login_wallet/            → token de sesión
+    4. Authorization: Bearer <token>      → WalletTokenAuthentication
+"""
+
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from web3 import Web3
+
+NONCE_TTL = getattr(settings, "AUTH_NONCE_TTL", 300)
+TOKEN_TTL = getattr(settings, "AUTH_TOKEN_TTL", 3600)
+REQUIRE_SERVER_NONCE = getattr(settings, "AUTH_REQUIRE_SERVER_NONCE", False)
+NONCE_CACHE_ALIAS = getattr(settings, "AUTH_NONCE_CACHE_ALIAS", "auth_nonces")
+
+# Backends que guardan en el proceso: cada worker vería sólo sus propias marcas
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+NONCE_SALT = "blockchain_api.login-nonce"
+TOKEN_SALT = "blockchain_api.session-token"
+
+
+# ============================================
+# NONCES DE LOGIN
+# ============================================
+
+def issue_nonce(address: str) -> str:
+    """
+    Nonce aleatorio firmado, atado a una wallet.
+    """
+    return signing.dumps({"r": secrets.token_hex(16), "a": address.lower()}, salt=NONCE_SALT)
+
+
+def check_nonce(nonce: str, address: str) -> str:
+    """
+    Valida un nonce antes de verificar la firma del login.
+
+    Los nonces que no emitió el servidor se aceptan mientras
+    AUTH_REQUIRE_SERVER_NONCE sea False (clientes anteriores).
+
+    Returns:
+        Mensaje de error, o None si el nonce es aceptable
+    """
+    try:
+        data = signing.loads(nonce, salt=NONCE_SALT, max_age=NONCE_TTL)
+    except signing.SignatureExpired:
+        return "Nonce expired"
+    except signing.BadSignature:
+        return "Invalid nonce" if REQUIRE_SERVER_NONCE else None
+
+    if data.get("a") != address.lower():
+        return "Nonce was issued for another wallet"
+    if caches[NONCE_CACHE_ALIAS].get(_used_key(nonce)) is not None:
+        return "Nonce already used"
+    return None
+
+
+def consume_nonce(nonce: str) -> bool:
+    """
+    Marca el nonce como usado, tras verificar la firma del login.
+
+    Returns:
+        False si otro login ya lo usó
+    """
+    return caches[NONCE_CACHE_ALIAS].add(_used_key(nonce), 1, NONCE_TTL)
+
+
+def _used_key(nonce: str) -> str:
+    return "auth:nonce:" + hashlib.sha256(nonce.encode()).hexdigest()
+
+
+def check_nonce_cache():
+    """
+    Se llama al arrancar (apps.py): con varios workers y una caché de
+    nonces local a cada proceso, un nonce usado en un worker seguiría
+    sirviendo en los demás. Falla en lugar de arrancar así.
+    """
+    backend = settings.CACHES.get(NONCE_CACHE_ALIAS, {}).get("BACKEND")
+    if backend is None:
+        raise ImproperlyConfigured(f"Falta la caché '{NONCE_CACHE_ALIAS}' para los nonces de login")
+    workers = getattr(settings, "WEB_CONCURRENCY", 1)
+    if workers > 1 and backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"WEB_CONCURRENCY={workers} con la caché de nonces en memoria del proceso: "
+            f"definir REDIS_URL (o una caché '{NONCE_CACHE_ALIAS}' compartida)"
+        )
+
+
+# ============================================
+# TOKENS DE SESIÓN
+# ============================================
+
+def issue_token(address: str) -> str:
+    """
+    Token de sesión para una wallet autenticada.
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(Web3.to_checksum_address(address))
+
+
+def verify_token(token: str) -> str:
+    """
+    Returns:
+        Wallet del token; raise signing.BadSignature (o SignatureExpired)
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=TOKEN_TTL)
@@ -0,0 +1,76 @@
+"""
+signals.py
+Receptores de señales de modelos de blockchain_api.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .event_cache import invalidate_event
+from .heatmap import record_checkins
+from . import counters, rollups
+from .models import CheckIn, Event, EventAttendance
+from .table_versions import bump_version
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_metadata(sender, instance, **kwargs):
+    invalidate_event(instance.id)
+    bump_version("event")
+
+
+@receiver(post_save, sender=CheckIn)
+def add_checkin_to_heatmap(sender, instance, created, **kwargs):
+    if created:
+        record_checkins([(instance.latitude, instance.longitude)])
+
+
+@receiver(post_delete, sender=CheckIn)
+def remove_checkin_from_heatmap(sender, instance, **kwargs):
+    record_checkins([(instance.latitude, instance.longitude)], delta=-1)
+
+
+@receiver(post_save, sender=CheckIn)
+def add_checkin_to_rollups(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_checkins([(instance.timestamp, instance.location, instance.user_id)])
+
+
+@receiver(post_delete, sender=CheckIn)
+def remove_checkin_from_rollups(sender, instance, **kwargs):
+    rollups.record_checkins([(instance.timestamp, instance.location, instance.user_id)], delta=-1)
+
+
+@receiver(post_save, sender=CheckIn)
+def add_checkin_to_user_count(sender, instance, created, **kwargs):
+    if created:
+        counters.record_checkins([instance.user_id])
+
+
+@receiver(post_delete, sender=CheckIn)
+def remove_checkin_from_user_count(sender, instance, **kwargs):
+    counters.record_checkins([instance.user_id], delta=-1)
+
+
+@receiver(post_save, sender=EventAttendance)
+def add_attendance_to_event_count(sender, instance, created, **kwargs):
+    if created:
+        counters.record_attendances([instance.event_id])
+
+
+@receiver(post_delete, sender=EventAttendance)
+def remove_attendance_from_event_count(sender, instance, **kwargs):
+    counters.record_attendances([instance.event_id], delta=-1)
+
+
+@receiver(post_save, sender=CheckIn)
+@receiver(post_delete, sender=CheckIn)
+def bump_checkin_version(sender, **kwargs):
+    bump_version("checkin")
+
+
+@receiver(post_save, sender=EventAttendance)
+@receiver(post_delete, sender=EventAttendance)
+def bump_attendance_version(sender, **kwargs):
+    bump_version("attendance")
@@ -0,0 +1,58 @@
+"""
+table_versions.py
+Versiones por tabla para ETags, Last-Modified y claves de caché.
+
+signals.py llama a bump_version() en cada post_save/post_delete. Las
+escrituras que no disparan señales (bulk_create, QuerySet.update) deben
+llamar a bump_version() explícitamente.
+
+Dentro de una transacción el incremento se difiere a transaction.on_commit:
+las filas de TableVersion son compartidas por todas las escrituras y un
+UPDATE dentro de la transacción de un check-in las bloquearía hasta el
+COMMIT, serializando los check-ins concurrentes. Además así la versión
+nueva sólo se publica cuando los datos ya son visibles (si la transacción
+se revierte no hay incremento).
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TableVersion
+
+
+def bump_version(name: str):
+    """
+    Incrementa la versión de una tabla al confirmarse la transacción en
+    curso (de inmediato fuera de una transacción).
+    """
+    transaction.on_commit(lambda: _bump(name))
+
+
+def _bump(name: str):
+    now = timezone.now()
+    row = TableVersion.objects.filter(name=name)
+
+    if row.update(version=F("version") + 1, updated_at=now):
+        return
+
+    try:
+        with transaction.atomic():
+            TableVersion.objects.create(name=name, version=1, updated_at=now)
+    except IntegrityError:
+        # Otro request creó la fila en paralelo
+        row.update(version=F("version") + 1, updated_at=now)
+
+
+def get_versions(*names) -> dict:
+    """
+    Returns:
+        {name: (version, updated_at)}; las tablas sin escrituras registradas
+        tienen versión 0 y updated_at None
+    """
+    versions = {name: (0, None) for name in names}
+    for name, version, updated_at in TableVersion.objects.filter(name__in=names).values_list(
+        "name", "version", "updated_at"
+    ):
+        versions[name] = (version, updated_at)
+    return versions
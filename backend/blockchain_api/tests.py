@@ -1,3 +1,1509 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from types import SimpleNamespace
+from datetime import timedelta
+from unittest import skipIf
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from eth_abi import encode as abi_encode
+from eth_account import Account
+from eth_account.messages import encode_defunct
+import requests
+from web3 import AsyncHTTPProvider
+
+from . import async_blockchain_service, blockchain_service, event_cache, geo, metrics, rollups
+from .authentication import WalletTokenAuthentication, WalletUser
+from .analytics_service import get_activity_stats
+from .blockchain_service import verify_checkins_batch
+from .chain_cache import MISSING, ChainCache, is_final
+from .checkin_queue import BACKOFF_INITIAL, process_verification
+from .checkin_service import register_checkin
+from .event_cache import invalidate_event
+from .events_service import clear_live_events, get_live_events
+from .profiling import ProfilingMiddleware
+from .indexer import CURSOR_NAME, index_available, sync_checkins
+from .models import (
+    CheckIn, CheckInVerification, DailyUserSketch, Event, EventAttendance, HeatmapCell, IndexerCursor, OnChainCheckIn, UserProfile
+)
+from .rollups import compact_rollups
+from .rpc_pool import PooledHTTPProvider, RPCPool
+from .table_versions import get_versions
+from .services import auth_service, token_service
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def clear_caches():
+    # Respuestas, nonces y default viven en alias separados
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+class UserCheckinsEnrichmentTests(TestCase):
+    """
+    El enriquecimiento de GET /api/checkins/<address>/ usa una sola consulta
+    de eventos, sin importar cuántos check-ins tenga el usuario.
+    """
+
+    def setUp(self):
+        invalidate_event()
+        now = timezone.now()
+        self.events = [
+            Event.objects.create(
+                name=f"Evento {i}",
+                description="Fiesta",
+                location="Santiago",
+                latitude=-33.45,
+                longitude=-70.66,
+                start_date=now,
+                end_date=now + timedelta(hours=5),
+            )
+            for i in range(10)
+        ]
+
+    def _checkins(self, n):
+        return [
+            {"user": WALLET, "location": "Santiago", "timestamp": i, "eventId": self.events[i % 10].id}
+            for i in range(n)
+        ]
+
+    def _get(self, checkins):
+        with patch("blockchain_api.views.get_user_checkins_page", return_value=(checkins, len(checkins))):
+            return self.client.get(f"/api/checkins/{WALLET}/")
+
+    def test_enrichment_queries_do_not_grow_with_history(self):
+        for n in (5, 500):
+            invalidate_event()
+            with self.assertNumQueries(1):
+                response = self._get(self._checkins(n))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()["checkins"]), n)
+
+    def test_cached_metadata_needs_no_queries(self):
+        self._get(self._checkins(20))
+
+        with self.assertNumQueries(0):
+            response = self._get(self._checkins(20))
+
+        self.assertEqual(response.json()["checkins"][0]["event_name"], "Evento 0")
+
+    def test_unknown_event_uses_placeholder_name(self):
+        checkins = [{"user": WALLET, "location": "Santiago", "timestamp": 1, "eventId": 999}]
+
+        response = self._get(checkins)
+
+        self.assertEqual(response.json()["checkins"][0]["event_name"], "Event #999")
+
+    def test_event_save_invalidates_cache(self):
+        self._get(self._checkins(1))
+
+        event = self.events[0]
+        event.name = "Evento renombrado"
+        event.save()
+
+        with self.assertNumQueries(1):
+            response = self._get(self._checkins(1))
+
+        self.assertEqual(response.json()["checkins"][0]["event_name"], "Evento renombrado")
+
+    def test_entries_expire_after_ttl(self):
+        clock = SimpleNamespace(now=1000.0)
+        fake_time = SimpleNamespace(monotonic=lambda: clock.now)
+
+        with patch("blockchain_api.event_cache.time", fake_time):
+            self._get(self._checkins(1))
+            # Otro worker renombra el evento: esta caché no recibe la señal
+            Event.objects.filter(pk=self.events[0].pk).update(name="Evento renombrado")
+
+            with self.assertNumQueries(0):
+                self.assertEqual(self._get(self._checkins(1)).json()["checkins"][0]["event_name"], "Evento 0")
+
+            clock.now += event_cache.TTL
+            with self.assertNumQueries(1):
+                response = self._get(self._checkins(1))
+
+        self.assertEqual(response.json()["checkins"][0]["event_name"], "Evento renombrado")
+
+    def test_size_is_bounded(self):
+        with patch("blockchain_api.event_cache.MAX_ENTRIES", 4):
+            self._get(self._checkins(10))
+            self.assertEqual(len(event_cache._metadata), 4)
+
+            # Los descartados se vuelven a consultar
+            with self.assertNumQueries(1):
+                self._get(self._checkins(10))
+            self.assertEqual(len(event_cache._metadata), 4)
+
+
+class IndexerTests(TestCase):
+    """
+    sync_checkins: ingesta por lotes, rebobinado ante reorgs y nodo caído.
+    """
+
+    def setUp(self):
+        self.chain = {}
+
+    def _log(self, block: int, tx: str, event_id: int = 1) -> dict:
+        return {
+            "user": WALLET, "eventId": event_id, "location": "Santiago", "timestamp": block,
+            "block_number": block, "tx_hash": "0x" + tx * 64, "log_index": 0,
+        }
+
+    def _sync(self, head: int, **kwargs) -> dict:
+        def get_logs(from_block, to_block):
+            return [log for block, log in self.chain.items() if from_block <= block <= to_block]
+
+        with patch("blockchain_api.blockchain_service.fetch_block_number", return_value=head), \
+                patch("blockchain_api.blockchain_service.get_checkin_logs", side_effect=get_logs) as get_logs_mock:
+            result = sync_checkins(**kwargs)
+        result["calls"] = get_logs_mock.call_count
+        return result
+
+    def _indexed(self) -> list:
+        return list(OnChainCheckIn.objects.order_by("block_number").values_list("block_number", "tx_hash"))
+
+    def test_ingests_logs_in_batches(self):
+        self.chain = {10: self._log(10, "a"), 150: self._log(150, "b"), 250: self._log(250, "c")}
+
+        result = self._sync(250, batch_size=100)
+
+        self.assertEqual((result["indexed"], result["calls"]), (3, 3))
+        self.assertEqual([block for block, _ in self._indexed()], [10, 150, 250])
+        self.assertEqual(IndexerCursor.objects.get(name=CURSOR_NAME).block_number, 250)
+        self.assertTrue(index_available())
+
+        # Segunda pasada: sólo re-ingiere la ventana de reorg, sin duplicar
+        self.assertEqual(self._sync(250, reorg_depth=12)["from_block"], 239)
+        self.assertEqual(len(self._indexed()), 3)
+
+    def test_reorg_replaces_orphaned_logs(self):
+        self.chain = {100: self._log(100, "a"), 245: self._log(245, "b")}
+        self._sync(250)
+
+        # El bloque 245 quedó huérfano; la cadena canónica trae otro log en 247
+        self.chain = {100: self._log(100, "a"), 247: self._log(247, "d")}
+        self._sync(252, reorg_depth=12)
+
+        self.assertEqual(self._indexed(), [(100, "0x" + "a" * 64), (247, "0x" + "d" * 64)])
+
+    def test_node_down_does_not_refresh_cursor(self):
+        self._sync(50)
+        stale = timezone.now() - timedelta(hours=1)
+        IndexerCursor.objects.filter(name=CURSOR_NAME).update(updated_at=stale)
+
+        with patch("blockchain_api.blockchain_service._rpc", side_effect=ConnectionError("node down")):
+            with self.assertRaises(ConnectionError):
+                sync_checkins()
+
+        self.assertEqual(IndexerCursor.objects.get(name=CURSOR_NAME).updated_at, stale)
+        self.assertFalse(index_available())
+
+
+class CheckinReceiptTests(TestCase):
+    """
+    evaluate_checkin_receipt y _fetch_receipt_and_tx con receipts JSON-RPC
+    crudos: remitente, contrato, status y log EventCheckedIn.
+    """
+
+    TX_HASH = "0x" + "ef" * 32
+    OTHER = "0x" + "12" * 20
+
+    def setUp(self):
+        self.contract = blockchain_service.get_contract_address()
+
+    def _log(self, event_id: int = 7, address: str = None) -> dict:
+        return {
+            "address": address or self.contract,
+            "topics": [
+                blockchain_service.EVENT_CHECKED_IN_TOPIC,
+                "0x" + WALLET[2:].lower().rjust(64, "0"),
+                "0x" + f"{event_id:064x}",
+            ],
+            "data": "0x" + abi_encode(["string", "uint256"], ["Santiago", 1700000000]).hex(),
+            "blockNumber": "0x10",
+            "logIndex": "0x0",
+            "transactionHash": self.TX_HASH,
+        }
+
+    def _receipt(self, **changes) -> dict:
+        receipt = {"status": "0x1", "to": self.contract, "blockNumber": "0x10", "gasUsed": "0x5208", "logs": [self._log()]}
+        return {**receipt, **changes}
+
+    def _evaluate(self, receipt: dict, sender: str = WALLET, event_id: int = 7) -> dict:
+        return blockchain_service.evaluate_checkin_receipt(self.TX_HASH, receipt, {"from": sender}, WALLET, event_id)
+
+    def test_valid_checkin(self):
+        result = self._evaluate(self._receipt())
+
+        self.assertTrue(result["valid"])
+        self.assertEqual((result["block_number"], result["gas_used"], result["timestamp"]), (16, 21000, 1700000000))
+        self.assertEqual(result["event"]["eventId"], 7)
+        self.assertEqual(result["event"]["location"], "Santiago")
+        self.assertEqual(result["event"]["user"], WALLET)
+
+    def test_rejections(self):
+        cases = (
+            ("Transaction failed on blockchain", self._receipt(status="0x0"), WALLET),
+            ("Transaction not sent to correct contract", self._receipt(to=self.OTHER), WALLET),
+            ("Transaction sender doesn't match", self._receipt(), self.OTHER),
+            ("Transaction did not emit EventCheckedIn event", self._receipt(logs=[]), WALLET),
+            # Un log idéntico emitido por otro contrato no cuenta
+            ("Transaction did not emit EventCheckedIn event", self._receipt(logs=[self._log(address=self.OTHER)]), WALLET),
+            ("Transaction doesn't contain check-in for event 7", self._receipt(logs=[self._log(event_id=8)]), WALLET),
+        )
+        for error, receipt, sender in cases:
+            with self.subTest(error=error):
+                result = self._evaluate(receipt, sender)
+                self.assertFalse(result["valid"])
+                self.assertTrue(result["error"].startswith(error), result["error"])
+                self.assertNotIn("pending", result)
+
+    def test_missing_receipt_is_pending(self):
+        result = self._evaluate(None)
+        self.assertFalse(result["valid"])
+        self.assertTrue(result["pending"])
+
+    def test_single_pass_fetches_receipt_and_tx_in_one_batch(self):
+        tx = {"from": WALLET.lower(), "blockNumber": "0x10"}
+        batch = patch("blockchain_api.blockchain_service._rpc_batch", return_value=[self._receipt(), tx, "0x20"])
+
+        with patch.object(blockchain_service, "chain_cache", ChainCache(shared_backend=None)), \
+                patch.dict(blockchain_service._head), batch as batch_mock:
+            self.assertEqual(blockchain_service._fetch_receipt_and_tx(self.TX_HASH), (self._receipt(), tx))
+            result = blockchain_service.verify_checkin_single_pass(self.TX_HASH, WALLET, 7)
+
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["from"], WALLET)
+        self.assertEqual(batch_mock.call_count, 1)
+        self.assertEqual(
+            [method for method, _ in batch_mock.call_args[0][0]],
+            ["eth_getTransactionReceipt", "eth_getTransactionByHash", "eth_blockNumber"]
+        )
+
+
+class ChainCacheTests(TestCase):
+    """
+    Caché de cadena: TTL de datos recientes, regla de finalidad, LRU y
+    transacciones pendientes fuera de la caché.
+    """
+
+    TX_HASH = "0x" + "cd" * 32
+
+    def setUp(self):
+        clear_caches()
+        self.clock = SimpleNamespace(now=1000.0)
+        clock_patch = patch("blockchain_api.chain_cache.time", SimpleNamespace(monotonic=lambda: self.clock.now))
+        clock_patch.start()
+        self.addCleanup(clock_patch.stop)
+        head_patch = patch.dict(blockchain_service._head)
+        head_patch.start()
+        self.addCleanup(head_patch.stop)
+
+    def test_recent_entries_expire(self):
+        chain = ChainCache(max_entries=10, recent_ttl=5, shared_backend=None)
+        chain.set(("block", 1), {"number": "0x1"}, final=False)
+        chain.set(("block", 2), {"number": "0x2"}, final=True)
+
+        self.clock.now += 4.9
+        self.assertEqual(chain.get(("block", 1)), {"number": "0x1"})
+
+        self.clock.now += 0.2
+        self.assertIs(chain.get(("block", 1)), MISSING)
+        self.clock.now += 10 ** 6
+        self.assertEqual(chain.get(("block", 2)), {"number": "0x2"})
+        self.assertEqual(chain.stats()["entries"], 1)
+
+    def test_finality_rule(self):
+        self.assertTrue(is_final(100, 112, confirmations=12))
+        self.assertFalse(is_final(100, 111, confirmations=12))
+        self.assertFalse(is_final(None, 112))
+        self.assertFalse(is_final(100, None))
+
+    def test_lru_eviction(self):
+        chain = ChainCache(max_entries=2, recent_ttl=5, shared_backend=None)
+        chain.set(("tx", "a"), "A", final=True)
+        chain.set(("tx", "b"), "B", final=True)
+        chain.get(("tx", "a"))
+        chain.set(("tx", "c"), "C", final=True)
+
+        self.assertEqual(chain.get(("tx", "a")), "A")
+        self.assertIs(chain.get(("tx", "b")), MISSING)
+        self.assertEqual(chain.get(("tx", "c")), "C")
+
+    def test_final_entries_are_shared_between_workers(self):
+        ChainCache(shared_backend="default").set(("block", 1), {"number": "0x1"}, final=True)
+        ChainCache(shared_backend="default").set(("block", 2), {"number": "0x2"}, final=False)
+
+        other = ChainCache(shared_backend="default")
+        self.assertEqual(other.get(("block", 1)), {"number": "0x1"})
+        self.assertIs(other.get(("block", 2)), MISSING)
+        self.assertEqual(other.stats()["shared_hits"], 1)
+
+    def _fetch(self, receipt, head: int, calls: int):
+        tx = {"hash": self.TX_HASH, "blockNumber": receipt["blockNumber"] if receipt else None}
+        with patch("blockchain_api.blockchain_service._rpc_batch", return_value=[receipt, tx, hex(head)]) as batch:
+            for _ in range(2):
+                self.assertEqual(blockchain_service._fetch_receipt_and_tx(self.TX_HASH), (receipt, tx))
+        self.assertEqual(batch.call_count, calls)
+
+    def test_pending_transactions_are_not_cached(self):
+        with patch.object(blockchain_service, "chain_cache", ChainCache(shared_backend=None)):
+            self._fetch(None, head=100, calls=2)
+
+    def test_mined_transactions_are_cached_until_final(self):
+        chain = ChainCache(recent_ttl=5, shared_backend=None)
+        with patch.object(blockchain_service, "chain_cache", chain):
+            receipt = {"blockNumber": hex(95), "status": "0x1"}
+            self._fetch(receipt, head=100, calls=1)
+
+            # Reciente: expira y se vuelve a pedir
+            self.clock.now += 6
+            self._fetch(receipt, head=120, calls=1)
+
+            # Final: ya no expira
+            self.clock.now += 10 ** 6
+            self._fetch(receipt, head=130, calls=0)
+
+
+class FakeRPCSession:
+    """
+    Sesión HTTP falsa de un endpoint: falla, responde o espera a release.
+    """
+
+    def __init__(self, result: str, fail: bool = False, blocked: bool = False):
+        self.result = result
+        self.fail = fail
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.calls = 0
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise requests.ConnectionError(f"{url} caído")
+        body = json.dumps({"jsonrpc": "2.0", "id": 0, "result": self.result}).encode()
+        return SimpleNamespace(content=body, raise_for_status=lambda: None)
+
+
+class RPCPoolTests(TestCase):
+    """
+    Pool de endpoints RPC contra sesiones falsas: failover, expulsión y hedging.
+    """
+
+    PAYLOAD = b'{"jsonrpc":"2.0","id":0,"method":"eth_blockNumber","params":[]}'
+
+    def _pool(self, *sessions, **kwargs):
+        pool = RPCPool([f"http://nodo-{i}" for i in range(len(sessions))], **kwargs)
+        for endpoint, session in zip(pool.endpoints, sessions):
+            endpoint.session = session
+            self.addCleanup(session.release.set)
+        return pool
+
+    def _result(self, raw: bytes) -> str:
+        return json.loads(raw)["result"]
+
+    def test_reads_fail_over_writes_do_not(self):
+        down, up = FakeRPCSession("0x1", fail=True), FakeRPCSession("0x2")
+        pool = self._pool(down, up, hedge_after=0)
+
+        self.assertEqual(self._result(pool.post(self.PAYLOAD, read_only=True)), "0x2")
+        self.assertEqual((down.calls, up.calls), (1, 1))
+
+        # El caído quedó con peor puntaje: la escritura va al sano y no se reintenta
+        self.assertEqual(self._result(pool.post(self.PAYLOAD)), "0x2")
+        down.fail, up.fail = False, True
+        with self.assertRaises(requests.ConnectionError):
+            pool.post(self.PAYLOAD)
+        self.assertEqual((down.calls, up.calls), (1, 3))
+
+    def test_failing_endpoint_is_ejected_and_readmitted(self):
+        clock = SimpleNamespace(now=1000.0)
+        fake_time = SimpleNamespace(monotonic=lambda: clock.now, perf_counter=time.perf_counter)
+        down, up = FakeRPCSession("0x1", fail=True), FakeRPCSession("0x2")
+        pool = self._pool(down, up, hedge_after=0, eject_after=2, eject_seconds=30)
+
+        with patch("blockchain_api.rpc_pool.time", fake_time):
+            for _ in range(2):
+                pool._post_failover(self.PAYLOAD, pool.endpoints)
+            self.assertEqual(pool.ranked(), [pool.endpoints[1]])
+            self.assertTrue(pool.stats()["endpoints"][0]["ejected"])
+
+            pool.post(self.PAYLOAD, read_only=True)
+            self.assertEqual(down.calls, 2)
+
+            clock.now += 30
+            self.assertIn(pool.endpoints[0], pool.ranked())
+
+    def test_slow_read_is_hedged(self):
+        slow, fast = FakeRPCSession("0x1", blocked=True), FakeRPCSession("0x2")
+        pool = self._pool(slow, fast, hedge_after=0.02)
+
+        self.assertEqual(self._result(pool.post(self.PAYLOAD, read_only=True)), "0x2")
+        self.assertEqual(pool.hedged_requests, 1)
+        self.assertEqual((slow.calls, fast.calls), (1, 1))
+
+    def test_heavy_reads_are_not_hedged(self):
+        slow, fast = FakeRPCSession("0x1"), FakeRPCSession("0x2")
+        pool = self._pool(slow, fast, hedge_after=0.02)
+        slow.release.clear()
+        threading.Timer(0.1, slow.release.set).start()
+
+        provider = PooledHTTPProvider(pool)
+        response = provider.make_request("eth_getLogs", [{"fromBlock": "0x0", "toBlock": "0x10"}])
+        self.assertEqual(response["result"], "0x1")
+        self.assertEqual(pool.hedged_requests, 0)
+        self.assertEqual(fast.calls, 0)
+
+        # Un batch con eth_getLogs tampoco se duplica (va a un solo endpoint)
+        pool.endpoints[1].latency = 1.0
+        slow.release.clear()
+        threading.Timer(0.1, slow.release.set).start()
+        batch = provider.make_batch_request([("eth_blockNumber", []), ("eth_getLogs", [{}])])
+        self.assertEqual(batch["result"], "0x1")
+        self.assertEqual(pool.hedged_requests, 0)
+        self.assertEqual(fast.calls, 0)
+
+
+class AsyncEventCheckinTests(TestCase):
+    """
+    POST /api/async/event_checkin/ valida y registra igual que la vista síncrona.
+    """
+
+    TX_HASH = "0x" + "ab" * 32
+
+    def setUp(self):
+        now = timezone.now()
+        self.event = Event.objects.create(
+            name="Evento", location="Santiago", latitude=-33.45, longitude=-70.66,
+            start_date=now, end_date=now + timedelta(hours=5),
+        )
+
+    def _post(self, **data):
+        body = {"event_id": self.event.id, "wallet_address": WALLET, "tx_hash": self.TX_HASH, **data}
+        verify = AsyncMock(return_value={"eventId": self.event.id, "tx_hash": self.TX_HASH})
+        with patch("blockchain_api.async_views.verify_event_checkin_tx", verify):
+            return self.client.post("/api/async/event_checkin/", body, content_type="application/json")
+
+    def test_registers_checkin(self):
+        response = self._post()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["user"]["total_checkins"], 1)
+        self.assertTrue(EventAttendance.objects.filter(tx_hash=self.TX_HASH).exists())
+
+    def test_rejects_duplicates_and_unknown_events(self):
+        self._post()
+
+        self.assertEqual(self._post().json()["error"], "This transaction has already been recorded")
+        self.assertEqual(self._post(event_id=999).status_code, 404)
+        self.assertEqual(self._post(tx_hash="0x12").status_code, 400)
+
+    def test_rejects_non_string_tx_hash(self):
+        for tx_hash in (12345, ["0x" + "ab" * 32], {"hash": self.TX_HASH}):
+            with self.subTest(tx_hash=tx_hash):
+                response = self._post(tx_hash=tx_hash)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["error"], "Invalid transaction hash format")
+
+
+class AsyncChainClientTests(TestCase):
+    """
+    Sesiones aiohttp del cliente async: una por endpoint y loop, y las del
+    loop anterior se cierran al cambiar de loop.
+    """
+
+    def setUp(self):
+        with patch("blockchain_api.async_blockchain_service._load_contract_data", return_value=(WALLET, [])):
+            self.client_ = async_blockchain_service.AsyncChainClient(["http://rpc-a", "http://rpc-b"])
+
+    def _cached(self) -> list:
+        return [
+            session
+            for provider in self.client_.providers
+            for _, session in provider._request_session_manager.session_cache.items()
+        ]
+
+    def test_concurrent_first_use_creates_sessions_once(self):
+        async def first_use():
+            with patch.object(AsyncHTTPProvider, "cache_async_session", autospec=True,
+                              side_effect=AsyncHTTPProvider.cache_async_session) as cache_session:
+                await asyncio.gather(*(self.client_.ensure_sessions() for _ in range(10)))
+            sessions = self._cached()
+            await self.client_.close()
+            return cache_session.call_count, sessions
+
+        calls, sessions = asyncio.run(first_use())
+        self.assertEqual(calls, 2)
+        self.assertEqual(len(sessions), 2)
+
+    def test_loop_change_closes_previous_sessions(self):
+        async def use():
+            await self.client_.ensure_sessions()
+            return self._cached()
+
+        previous = asyncio.run(use())
+        current = asyncio.run(use())
+
+        self.assertTrue(all(session.closed for session in previous))
+        self.assertEqual(self._cached(), current)
+        self.assertFalse(any(session.closed for session in current))
+        asyncio.run(self.client_.close())
+
+
+class AsyncVerificationQueueTests(TestCase):
+    """
+    POST /api/event_checkin/ con "async": 202, verificación pendiente y
+    process_verification (reintentos con backoff) hasta verified / failed.
+    """
+
+    TX_HASH = "0x" + "cd" * 32
+
+    def setUp(self):
+        now = timezone.now()
+        self.event = Event.objects.create(
+            name="Evento", location="Santiago", latitude=-33.45, longitude=-70.66,
+            start_date=now, end_date=now + timedelta(hours=5),
+        )
+
+    def _enqueue(self, accepted: bool = True):
+        body = {"event_id": self.event.id, "wallet_address": WALLET, "tx_hash": self.TX_HASH, "async": True}
+        with patch("blockchain_api.views.enqueue_verification", return_value=accepted):
+            return self.client.post(reverse("event_checkin"), body, content_type="application/json")
+
+    def _status(self, verification_id: int) -> dict:
+        return self.client.get(reverse("event_checkin_status", args=[verification_id])).json()
+
+    def _process(self, results: list, timeout: float = 60):
+        """
+        Corre process_verification con un reloj falso: sleep avanza el
+        reloj y se registra cada espera.
+        """
+        clock = {"now": 0.0, "sleeps": []}
+
+        def sleep(seconds):
+            clock["sleeps"].append(seconds)
+            clock["now"] += seconds
+
+        fake_time = SimpleNamespace(monotonic=lambda: clock["now"], sleep=sleep)
+        verification_id = CheckInVerification.objects.get().id
+        with patch("blockchain_api.checkin_queue.verify_checkin_single_pass", side_effect=results), \
+                patch("blockchain_api.checkin_queue.time", fake_time):
+            process_verification(verification_id, timeout=timeout)
+        return verification_id, clock["sleeps"]
+
+    def test_enqueue_returns_202_with_pending_row(self):
+        response = self._enqueue()
+
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body["status"], "pending")
+        verification = CheckInVerification.objects.get(id=body["verification_id"])
+        self.assertEqual((verification.tx_hash, verification.event_id), (self.TX_HASH, self.event.id))
+        self.assertEqual(self._status(verification.id)["status"], "pending")
+        self.assertEqual(self.client.get(body["status_url"]).status_code, 200)
+
+    def test_full_queue_returns_503(self):
+        self.assertEqual(self._enqueue(accepted=False).status_code, 503)
+        self.assertFalse(CheckInVerification.objects.exists())
+
+    def test_pending_then_verified_with_backoff(self):
+        self._enqueue()
+        pending = {"valid": False, "error": "Transaction not found in blockchain", "pending": True}
+
+        verification_id, sleeps = self._process([pending, pending, pending, {"valid": True}])
+
+        self.assertEqual(sleeps, [BACKOFF_INITIAL * 2 ** i for i in range(3)])
+        status = self._status(verification_id)
+        self.assertEqual((status["status"], status["attempts"]), ("verified", 4))
+        self.assertEqual(status["attendance_id"], EventAttendance.objects.get(tx_hash=self.TX_HASH).id)
+
+    def test_invalid_transaction_fails_without_retry(self):
+        self._enqueue()
+
+        verification_id, sleeps = self._process([{"valid": False, "error": "Transaction failed on blockchain"}])
+
+        self.assertEqual(sleeps, [])
+        status = self._status(verification_id)
+        self.assertEqual((status["status"], status["error"]), ("failed", "Transaction failed on blockchain"))
+        self.assertFalse(EventAttendance.objects.exists())
+
+    def test_gives_up_after_timeout(self):
+        self._enqueue()
+        pending = {"valid": False, "error": "Transaction not found in blockchain", "pending": True}
+
+        verification_id, sleeps = self._process([pending] * 10, timeout=BACKOFF_INITIAL * 3.5)
+
+        self.assertEqual(sleeps, [BACKOFF_INITIAL, BACKOFF_INITIAL * 2])
+        self.assertEqual(self._status(verification_id)["status"], "failed")
+
+
+class BulkCheckinTests(TestCase):
+    """
+    POST /api/event_checkin/bulk/ resuelve cada item con un número fijo de
+    consultas y aplica los efectos de las señales que bulk_create omite.
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        self.event = Event.objects.create(
+            name="Evento", location="Santiago", latitude=-33.45, longitude=-70.66,
+            start_date=now, end_date=now + timedelta(hours=5),
+        )
+
+    def _items(self, n, start=0):
+        return [
+            {"event_id": self.event.id, "wallet_address": "0x%040x" % (i + 1), "tx_hash": "0x%064x" % (i + 1)}
+            for i in range(start, start + n)
+        ]
+
+    def _post(self, items):
+        def verify(checkins):
+            return [
+                {"valid": True, "block_number": 1, "event": {
+                    "user": wallet, "eventId": event_id, "location": "Santiago", "timestamp": 1
+                }}
+                for _, wallet, event_id in checkins
+            ]
+
+        with patch("blockchain_api.bulk_checkin.verify_checkins_batch", side_effect=verify):
+            return self.client.post("/api/event_checkin/bulk/", {"checkins": items}, content_type="application/json")
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        self._post(self._items(1))
+
+        with CaptureQueriesContext(connection) as small:
+            self._post(self._items(2, start=10))
+        with CaptureQueriesContext(connection) as large:
+            response = self._post(self._items(50, start=20))
+
+        self.assertEqual(response.json()["created"], 50)
+        self.assertEqual(len(small), len(large))
+
+    def test_updates_derived_tables(self):
+        self._post(self._items(3))
+
+        self.assertEqual(CheckIn.objects.count(), 3)
+        self.assertEqual(HeatmapCell.objects.filter(zoom=4).get().count, 3)
+        self.assertEqual(get_activity_stats(days=1)["total_checkins"], 3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 3)
+        self.assertEqual(list(UserProfile.objects.values_list("checkin_count", flat=True)), [1, 1, 1])
+
+    def test_per_item_errors(self):
+        self._post(self._items(1))
+        items = self._items(2) + [{"event_id": 999, "wallet_address": WALLET, "tx_hash": "0x" + "f" * 64}, {}]
+
+        results = self._post(items).json()["results"]
+
+        self.assertEqual([result["status_code"] for result in results], [400, 201, 404, 400])
+        self.assertEqual(results[0]["error"], "This transaction has already been recorded")
+        self.assertEqual(results[3]["error"], "Missing required parameters")
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_MS=60_000)
+class ProfilingMiddlewareTests(TestCase):
+    """
+    Con PROFILING_ENABLED cada respuesta trae Server-Timing con SQL y RPC.
+    """
+
+    def test_server_timing_counts_queries(self):
+        response = self.client.get("/api/event_checkin/1/")
+
+        self.assertEqual(response.status_code, 404)
+        timing = response["Server-Timing"]
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('desc="0 requests, 0 calls"', timing)
+        self.assertRegex(timing, r"total;dur=\d+\.\d")
+
+    def test_rpc_hook_is_counted(self):
+        from .rpc_pool import notify_request
+
+        def view(request):
+            notify_request("batch", ["eth_blockNumber", "eth_getTransactionReceipt", "eth_getTransactionByHash"], 0.01)
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(view)
+        response = middleware(RequestFactory().get("/"))
+
+        self.assertIn('rpc;dur=10.0;desc="1 requests, 3 calls"', response["Server-Timing"])
+
+
+class MetricsTests(TestCase):
+    """
+    GET /api/metrics: formato Prometheus y suma de snapshots de workers.
+    """
+
+    def test_request_metrics_are_exposed(self):
+        self.client.get("/api/event_checkin/1/")
+        response = self.client.get("/api/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertRegex(body, r'http_requests_total\{view="event_checkin_status",method="GET",status="404"\} \d+')
+        self.assertIn('http_request_db_queries_bucket{view="event_checkin_status",le="1.0"}', body)
+
+    def test_verification_outcomes_by_error_type(self):
+        before = metrics.VERIFICATIONS.values().get(("invalid_hash",), 0)
+
+        verify_checkins_batch([("0x1234", WALLET, 1)])
+
+        self.assertEqual(metrics.VERIFICATIONS.values()[("invalid_hash",)], before + 1)
+
+    def test_snapshots_from_other_workers_are_summed(self):
+        metrics.VERIFICATIONS.inc("valid")
+        own = metrics.VERIFICATIONS.values()[("valid",)]
+
+        with tempfile.TemporaryDirectory() as directory, patch.object(metrics, "METRICS_DIR", directory):
+            metrics.flush()
+            os.rename(os.path.join(directory, f"{os.getpid()}.json"), os.path.join(directory, "1.json"))
+            merged = metrics.collect()
+
+        self.assertEqual(merged["checkin_verifications_total"]["values"][("valid",)], 2 * own)
+
+    @skipIf(metrics.fcntl is None, "Sin flock (Windows)")
+    def test_dead_worker_snapshots_are_archived(self):
+        metrics.VERIFICATIONS.inc("valid")
+        own = metrics.VERIFICATIONS.values()[("valid",)]
+        worker = subprocess.Popen([sys.executable, "-c", ""])
+        worker.wait()
+
+        with tempfile.TemporaryDirectory() as directory, patch.object(metrics, "METRICS_DIR", directory):
+            metrics.flush()
+            for pid in (worker.pid, 999999999):
+                shutil.copy(os.path.join(directory, f"{os.getpid()}.json"), os.path.join(directory, f"{pid}.json"))
+
+            for _ in range(2):
+                merged = metrics.collect()
+                self.assertEqual(merged["checkin_verifications_total"]["values"][("valid",)], 3 * own)
+
+            self.assertEqual(
+                sorted(name for name in os.listdir(directory) if name.endswith(".json")),
+                sorted(["archived.json", f"{os.getpid()}.json"])
+            )
+
+
+class LoginWalletTests(TestCase):
+    """
+    Firmas de login: recuperación en el pool de procesos y caché de verificadas.
+    """
+
+    def setUp(self):
+        self.account = Account.create()
+        self.signature = self.account.sign_message(encode_defunct(text="nonce-1")).signature.hex()
+        auth_service.clear_signature_cache()
+        clear_caches()
+
+    def test_login_verifies_signature(self):
+        data = {"address": self.account.address, "signature": self.signature, "nonce": "nonce-1"}
+        response = self.client.post("/api/login_wallet/", data, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["user"]["created"])
+
+        response = self.client.post(
+            "/api/login_wallet/", {**data, "nonce": "nonce-2"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["error"], "Signature verification failed")
+
+    def test_verified_signatures_are_cached(self):
+        with patch.object(auth_service, "WORKERS", 0), \
+                patch.object(auth_service, "_recover", wraps=auth_service._recover) as recover:
+            for _ in range(3):
+                self.assertEqual(
+                    auth_service.check_signature(self.account.address.lower(), self.signature, "nonce-1"), (True, None)
+                )
+            verified, error = auth_service.check_signature(WALLET, self.signature, "nonce-1")
+
+        self.assertEqual(recover.call_count, 2)
+        self.assertFalse(verified)
+        self.assertEqual(error, "Signature verification failed")
+
+    def test_server_nonce_and_session_token(self):
+        nonce = self.client.get(f"/api/auth/nonce/?address={self.account.address}").json()["nonce"]
+        signature = self.account.sign_message(encode_defunct(text=nonce)).signature.hex()
+
+        response = self.client.post("/api/login_wallet/", {
+            "address": WALLET, "signature": signature, "nonce": nonce
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["error"], "Nonce was issued for another wallet")
+
+        response = self.client.post("/api/login_wallet/", {
+            "address": self.account.address, "signature": signature, "nonce": nonce
+        }, content_type="application/json")
+        token = response.json()["token"]
+
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        with self.assertNumQueries(0):
+            user, _ = WalletTokenAuthentication().authenticate(request)
+        self.assertEqual(user.wallet_address, self.account.address)
+
+        response = self.client.get("/api/health/", HTTP_AUTHORIZATION=f"Bearer {token}x")
+        self.assertEqual(response.status_code, 401)
+
+    def test_nonce_is_single_use(self):
+        nonce = self.client.get(f"/api/auth/nonce/?address={self.account.address}").json()["nonce"]
+        data = {
+            "address": self.account.address,
+            "signature": self.account.sign_message(encode_defunct(text=nonce)).signature.hex(),
+            "nonce": nonce,
+        }
+
+        first = self.client.post("/api/login_wallet/", data, content_type="application/json")
+        self.assertEqual(first.status_code, 200)
+
+        replay = self.client.post("/api/login_wallet/", data, content_type="application/json")
+        self.assertEqual(replay.status_code, 401)
+        self.assertEqual(replay.json()["error"], "Nonce already used")
+
+    def test_used_nonce_survives_response_cache_eviction(self):
+        nonce = token_service.issue_nonce(self.account.address)
+        self.assertTrue(token_service.consume_nonce(nonce))
+
+        # Las otras cachés se llenan y desalojan entradas
+        for alias in ("default", "responses"):
+            for i in range(3 * settings.CACHES[alias]["OPTIONS"]["MAX_ENTRIES"]):
+                caches[alias].set(f"response:{i}", i)
+
+        self.assertEqual(token_service.check_nonce(nonce, self.account.address), "Nonce already used")
+        self.assertFalse(token_service.consume_nonce(nonce))
+
+    def test_startup_fails_with_process_local_nonce_cache(self):
+        token_service.check_nonce_cache()
+        with override_settings(WEB_CONCURRENCY=4):
+            with self.assertRaises(ImproperlyConfigured):
+                token_service.check_nonce_cache()
+
+        shared = {**settings.CACHES, "auth_nonces": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost:6379/0",
+        }}
+        with override_settings(WEB_CONCURRENCY=4, CACHES=shared):
+            token_service.check_nonce_cache()
+
+    def test_nonce_requires_address(self):
+        self.assertEqual(self.client.get("/api/auth/nonce/").status_code, 400)
+
+    def test_wallet_user_has_no_admin_rights(self):
+        from rest_framework.permissions import IsAdminUser
+
+        user = WalletUser(WALLET)
+        self.assertEqual(user.pk, WALLET)
+        self.assertEqual(user.id, WALLET)
+        self.assertTrue(user.is_active)
+        self.assertFalse(user.has_perm("blockchain_api.change_event"))
+        self.assertFalse(IsAdminUser().has_permission(SimpleNamespace(user=user), None))
+
+
+class CounterTests(TestCase):
+    """
+    checkin_count y attendee_count: incrementos F() y reconcile_counters.
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        self.user = UserProfile.objects.create(wallet_address=WALLET)
+        self.events = [
+            Event.objects.create(
+                name=f"Evento {i}", location="Santiago", latitude=-33.45, longitude=-70.66,
+                start_date=now, end_date=now + timedelta(hours=5),
+            )
+            for i in range(2)
+        ]
+
+    def test_counters_follow_checkins(self):
+        attendances = [register_checkin(self.user, event, "0x%064x" % event.id) for event in self.events]
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.checkin_count, 2)
+
+        attendances[0].delete()
+        CheckIn.objects.filter(tx_hash=attendances[0].tx_hash).delete()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.checkin_count, 1)
+        self.assertEqual([Event.objects.get(pk=event.pk).attendee_count for event in self.events], [0, 1])
+
+    def test_checkins_keep_event_caches(self):
+        clear_caches()
+        clear_live_events()
+        etag = self.client.get(reverse("events"))["ETag"]
+        get_live_events()
+
+        register_checkin(self.user, self.events[0], "0x" + "b" * 64)
+
+        self.assertEqual(self.client.get(reverse("events"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(1):
+            get_live_events()
+
+        response = self.client.get(reverse("events_attendees"), {"ids": f"{self.events[0].id},{self.events[1].id},999"})
+        self.assertEqual(response.json(), {str(self.events[0].id): 1, str(self.events[1].id): 0})
+        self.assertEqual(self.client.get(reverse("events_attendees"), {"ids": "x"}).status_code, 400)
+
+    def test_attendee_count_is_read_only(self):
+        now = timezone.now()
+        response = self.client.post(reverse("events"), {
+            "name": "Nuevo", "location": "Santiago", "latitude": -33.45, "longitude": -70.66,
+            "start_date": now.isoformat(), "end_date": (now + timedelta(hours=5)).isoformat(),
+            "attendee_count": 999, "geohash": "zzz",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        event = Event.objects.get(pk=response.json()["event"]["id"])
+        self.assertEqual((event.attendee_count, event.geohash), (0, geo.encode(-33.45, -70.66)))
+
+    def test_reconcile_fixes_drift(self):
+        register_checkin(self.user, self.events[0], "0x" + "a" * 64)
+        UserProfile.objects.update(checkin_count=7)
+        Event.objects.filter(pk=self.events[1].pk).update(attendee_count=3)
+
+        call_command("reconcile_counters", stdout=StringIO())
+
+        self.assertEqual(UserProfile.objects.get().checkin_count, 1)
+        self.assertEqual(
+            list(Event.objects.order_by("pk").values_list("attendee_count", flat=True)), [1, 0]
+        )
+
+
+class ActivityStatsRollupTests(TestCase):
+    """
+    Las estadísticas desde los agregados diarios coinciden con el modo exacto.
+    """
+
+    def setUp(self):
+        users = [UserProfile.objects.create(wallet_address=f"0x{i:040x}") for i in range(30)]
+        for i in range(90):
+            CheckIn.objects.create(
+                user=users[i % 30],
+                location="Santiago" if i % 3 else "Valparaíso",
+                latitude=-33.45,
+                longitude=-70.66,
+                tx_hash=f"0x{i:064x}",
+            )
+
+    def test_rollups_match_exact(self):
+        exact = get_activity_stats(days=7, exact=True)
+        with self.assertNumQueries(3):
+            approximate = get_activity_stats(days=7)
+
+        self.assertTrue(approximate["approximate"])
+        self.assertEqual(approximate["total_checkins"], exact["total_checkins"])
+        self.assertEqual(approximate["unique_users"], exact["unique_users"])
+        self.assertEqual(approximate["top_locations"], exact["top_locations"])
+
+    def test_delete_and_compact(self):
+        CheckIn.objects.filter(location="Valparaíso").delete()
+        self.assertEqual(get_activity_stats(days=7)["total_checkins"], 60)
+        self.assertEqual(get_activity_stats(days=7)["unique_users"], 30)
+
+        compact_rollups()
+        self.assertEqual(get_activity_stats(days=7)["unique_users"], 20)
+
+    def test_sketch_is_sharded_and_matches_compaction(self):
+        def shards():
+            return dict(DailyUserSketch.objects.values_list("shard", "registers"))
+
+        incremental = shards()
+        self.assertGreater(len(incremental), 1)
+        self.assertTrue(all(len(registers) == rollups.SHARD_SIZE for registers in incremental.values()))
+
+        compact_rollups()
+        self.assertEqual({shard: bytes(r) for shard, r in shards().items()},
+                         {shard: bytes(r) for shard, r in incremental.items()})
+
+    def test_counted_user_takes_no_lock(self):
+        user_id = UserProfile.objects.values_list("id", flat=True).first()
+
+        with CaptureQueriesContext(connection) as queries:
+            rollups._add_users(timezone.localdate(), [user_id])
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertTrue(queries.captured_queries[0]["sql"].startswith("SELECT"))
+
+
+class EventsListTests(TestCase):
+    """
+    GET /api/events/: paginación por cursor, filtros por estado y 304 condicional.
+    """
+
+    def setUp(self):
+        clear_caches()
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(25):
+                start = now + timedelta(days=i - 12)
+                Event.objects.create(
+                    name=f"Evento {i}",
+                    location="Santiago",
+                    latitude=-33.45,
+                    longitude=-70.66,
+                    start_date=start,
+                    end_date=start + timedelta(hours=5),
+                )
+        clear_live_events()
+        self.url = reverse("events")
+
+    def test_unpaginated_array_is_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 25)
+
+    def test_cursor_pagination_walks_every_event_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            body = self.client.get(self.url, params).json()
+            seen += [event["id"] for event in body["results"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = list(Event.objects.order_by("-start_date", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_status_filters(self):
+        counts = {status: len(self.client.get(self.url, {"status": status}).json())
+                  for status in ("upcoming", "ongoing", "past")}
+        self.assertEqual(counts, {"upcoming": 12, "ongoing": 1, "past": 12})
+        live = self.client.get(self.url, {"status": "live"}).json()
+        self.assertEqual(live, self.client.get(self.url, {"status": "ongoing"}).json())
+        self.assertEqual(self.client.get(self.url, {"status": "soon"}).status_code, 400)
+
+    def test_status_annotation(self):
+        statuses = list(Event.objects.with_status().order_by("start_date").values_list("status", flat=True))
+        self.assertEqual(statuses, ["past"] * 12 + ["live"] + ["upcoming"] * 12)
+
+    def test_live_events_cached_until_boundary(self):
+        live = Event.objects.live().get()
+        now = timezone.now()
+        self.assertEqual([event.id for event in get_live_events(now)], [live.id])
+
+        # Sólo la consulta de versión mientras nadie empiece ni termine
+        with self.assertNumQueries(1):
+            get_live_events(now + timedelta(hours=1))
+
+        # Pasado el fin del evento en curso se recalcula
+        self.assertEqual(get_live_events(live.end_date + timedelta(seconds=1)), ())
+
+        # Una escritura en Event también
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(
+                name="Nuevo", location="Santiago", latitude=-33.45, longitude=-70.66,
+                start_date=now - timedelta(hours=1), end_date=now + timedelta(hours=2),
+            )
+        self.assertEqual(len(get_live_events(now + timedelta(hours=1))), 2)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.first().save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class NearbyEventsTests(TestCase):
+    """
+    GET /api/events/nearby/: prefiltro por geohash y orden por distancia.
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        # Cada 0.01° de latitud son ~1.1 km al norte de Santiago
+        Event.objects.bulk_create(
+            Event(
+                name=f"Evento {i}", location="Santiago", latitude=-33.45 + i * 0.01, longitude=-70.66,
+                start_date=now + timedelta(days=1 if i % 2 else -1), end_date=now + timedelta(days=1, hours=5),
+            )
+            for i in range(20)
+        )
+        self.url = reverse("events_nearby")
+
+    def test_sorted_by_distance_within_radius(self):
+        body = self.client.get(self.url, {"lat": -33.45, "lng": -70.66, "radius_km": 5}).json()
+
+        self.assertEqual([event["name"] for event in body], [f"Evento {i}" for i in range(5)])
+        self.assertEqual(body[0]["distance_km"], 0)
+        self.assertAlmostEqual(body[4]["distance_km"], 4.448, places=2)
+
+    def test_geohash_kept_in_sync(self):
+        event = Event.objects.get(name="Evento 0")
+        self.assertEqual(event.geohash, geo.encode(-33.45, -70.66))
+
+        event.latitude = 10
+        event.save(update_fields=["latitude"])
+        self.assertEqual(Event.objects.get(pk=event.pk).geohash, geo.encode(10, -70.66))
+
+        Event.objects.filter(pk=event.pk).update(geohash="")
+        call_command("rebuild_geohashes", stdout=StringIO())
+        self.assertEqual(Event.objects.get(pk=event.pk).geohash, geo.encode(10, -70.66))
+
+    def test_limit_and_status(self):
+        params = {"lat": -33.45, "lng": -70.66, "radius_km": 50}
+        self.assertEqual(len(self.client.get(self.url, {**params, "limit": 3}).json()), 3)
+
+        live = self.client.get(self.url, {**params, "status": "live"}).json()
+        self.assertEqual([event["name"] for event in live], [f"Evento {i}" for i in range(0, 20, 2)])
+
+    def test_invalid_parameters(self):
+        for params in ({"lat": -33.45}, {"lat": 100, "lng": 0}, {"lat": 0, "lng": 0, "radius_km": 500},
+                       {"lat": 0, "lng": 0, "status": "soon"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Caché de respuestas: HIT tras el primer request, invalidación por escritura.
+    """
+
+    def setUp(self):
+        clear_caches()
+        self.user = UserProfile.objects.create(wallet_address=WALLET)
+        self.url = reverse("heatmap_data")
+
+    def _checkin(self):
+        # La versión se incrementa al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            CheckIn.objects.create(user=self.user, location="Santiago", latitude=-33.45, longitude=-70.66, tx_hash="0x1")
+
+    def test_hit_until_write(self):
+        self._checkin()
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+
+        self._checkin()
+        third = self.client.get(self.url)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.json()[0]["count"], 2)
+
+    def test_version_bumped_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                register_checkin(self.user, Event.objects.create(
+                    name="Evento", location="Santiago", latitude=-33.45, longitude=-70.66,
+                    start_date=timezone.now(), end_date=timezone.now() + timedelta(hours=2),
+                ), "0x" + "a" * 64)
+
+        # Nada toca TableVersion dentro de la transacción del check-in
+        self.assertFalse(any("blockchain_api_tableversion" in query["sql"] for query in queries.captured_queries))
+        self.assertEqual(get_versions("checkin")["checkin"][0], 0)
+
+        for callback in callbacks:
+            callback()
+        versions = get_versions("checkin", "attendance", "event")
+        self.assertEqual({name: version for name, (version, _) in versions.items()},
+                         {"checkin": 1, "attendance": 1, "event": 1})
+
+    def test_nearby_bboxes_share_entry(self):
+        self._checkin()
+        first = self.client.get(self.url, {"bbox": "-71.001,-34.002,-69.998,-32.999", "zoom": 10})
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        # Mismo bbox al ajustarlo a la grilla de 0.01°, parámetros en otro orden
+        second = self.client.get(f"{self.url}?zoom=10&bbox=-71.004,-34.005,-69.995,-32.995")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+
+    def test_large_responses_not_stored(self):
+        self._checkin()
+        with patch("blockchain_api.response_cache.MAX_BYTES", 10):
+            self.client.get(self.url)
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "MISS")
+
+    def test_stale_while_recomputing(self):
+        self._checkin()
+        first = self.client.get(self.url)
+        self._checkin()
+
+        # Otro request tiene el lock de la nueva versión: se sirve la anterior
+        with patch("django.core.cache.backends.locmem.LocMemCache.add", return_value=False):
+            stale = self.client.get(self.url)
+        self.assertEqual(stale["X-Cache"], "STALE")
+        self.assertEqual(stale.content, first.content)
+
+
+class HeatmapCellsTests(TestCase):
+    """
+    GET /api/heatmap/?bbox=...&zoom=...: celdas visibles, con tope por respuesta.
+    """
+
+    def setUp(self):
+        clear_caches()
+        user = UserProfile.objects.create(wallet_address=WALLET)
+        for i in range(4):
+            CheckIn.objects.create(user=user, location="Santiago", latitude=-33 - i, longitude=-70 - i,
+                                   tx_hash=f"0x{i:064x}")
+
+    def test_cells_in_bbox(self):
+        response = self.client.get(reverse("heatmap_data"), {"bbox": "-72,-35,-69,-32", "zoom": 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_too_many_cells(self):
+        with patch("blockchain_api.heatmap.MAX_CELLS", 3):
+            response = self.client.get(reverse("heatmap_data"), {"zoom": 16})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("narrow the bbox", response.json()["error"])
+
+
+class MapStreamTests(TestCase):
+    """
+    GET /api/mapa/: forma del JSON emitido por partes, con y sin clusters.
+    """
+
+    def setUp(self):
+        clear_caches()
+        user = UserProfile.objects.create(wallet_address=WALLET)
+        now = timezone.now()
+        Event.objects.create(name="Evento", location="Santiago", latitude=-33.45, longitude=-70.66,
+                             start_date=now, end_date=now + timedelta(hours=2))
+        points = [(-33.45, -70.66), (-33.4501, -70.6601), (-33.02, -71.55)]
+        for i, (latitude, longitude) in enumerate(points):
+            CheckIn.objects.create(user=user, location="Santiago", latitude=latitude, longitude=longitude,
+                                   tx_hash=f"0x{i:064x}")
+
+    def _get(self, params: dict) -> dict:
+        response = self.client.get("/api/mapa/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_points(self):
+        data = self._get({})
+        self.assertEqual(set(data), {"status", "eventos", "checkins", "total_events", "total_checkins"})
+        self.assertEqual(data["total_events"], 1)
+        self.assertEqual(data["total_checkins"], 3)
+        self.assertEqual(data["checkins"][0], {"latitude": -33.45, "longitude": -70.66, "count": 1, "location": "Santiago"})
+
+    def test_clusters_from_heatmap(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self._get({"bbox": "-72,-34,-70,-33", "zoom": 10})
+        self.assertFalse(any("blockchain_api_checkin" in query["sql"] for query in queries.captured_queries))
+
+        self.assertEqual(
+            set(data), {"status", "zoom", "eventos", "checkins", "total_events", "total_clusters", "total_checkins"}
+        )
+        self.assertEqual(data["zoom"], 10)
+        self.assertEqual(data["total_clusters"], 2)
+        self.assertEqual(data["total_checkins"], 3)
+        for cluster in data["checkins"]:
+            self.assertEqual(set(cluster), {"latitude", "longitude", "count", "location"})
+        santiago = max(data["checkins"], key=lambda cluster: cluster["count"])
+        self.assertEqual(santiago["count"], 2)
+        self.assertAlmostEqual(santiago["latitude"], -33.45005)
+
+
+class AdminSearchTests(TestCase):
+    """
+    Búsqueda de los changelists: prefijos de wallet sin distinguir
+    mayúsculas, ubicación por prefijo y aviso para términos no hex.
+    """
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "admin"))
+        user = UserProfile.objects.create(wallet_address=WALLET)
+        CheckIn.objects.create(user=user, location="Bellavista", tx_hash="0x" + "c" * 64)
+
+    def _count(self, model: str, term: str) -> int:
+        response = self.client.get(f"/admin/blockchain_api/{model}/", {"q": term})
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"].result_count
+
+    def test_checksummed_wallet_prefix(self):
+        self.assertEqual(self._count("userprofile", WALLET[:12].lower()), 1)
+        self.assertEqual(self._count("checkin", WALLET[:12].upper().replace("0X", "0x")), 1)
+
+    def test_location_prefix(self):
+        self.assertEqual(self._count("checkin", "bella"), 1)
+        self.assertEqual(self._count("checkin", "vista"), 0)
+
+    def test_non_hex_term_without_text_fields_warns(self):
+        response = self.client.get("/admin/blockchain_api/walletuser/", {"q": "santiago"})
+        self.assertEqual(response.context["cl"].result_count, 0)
+        self.assertIn("0x...", " ".join(str(message) for message in response.context["messages"]))
+
+
+class QueryPlanTests(TestCase):
+    """
+    Planes de ejecución de las consultas de cada endpoint sobre un dataset
+    sembrado. Falla si alguna consulta a una tabla grande hace un recorrido
+    completo sin índice:
+        • SQLite: EXPLAIN QUERY PLAN con "SCAN <tabla>" sin "USING INDEX"
+        • PostgreSQL: EXPLAIN con enable_seqscan=off y "Seq Scan on <tabla>"
+    """
+
+    CHECKINS = 5000
+    EVENTS = 300
+    USERS = 200
+
+    ENDPOINTS = (
+        "/api/heatmap/",
+        "/api/heatmap/?bbox=-71,-34,-70,-33&zoom=10",
+        "/api/stats/",
+        "/api/stats/?exact=1",
+        "/api/events/",
+        "/api/events/?limit=20",
+        "/api/events/?status=upcoming",
+        "/api/events/?status=live",
+        "/api/events/?status=past",
+        "/api/events/nearby/?lat=-33.5&lng=-70.5&radius_km=5",
+        "/api/events/nearby/?lat=-33.5&lng=-70.5&radius_km=20&status=upcoming",
+        "/api/mapa/?bbox=-71,-34,-70,-33&zoom=10",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        now = timezone.now()
+        users = UserProfile.objects.bulk_create(
+            UserProfile(wallet_address=f"0x{i:040x}", username=f"user{i}") for i in range(cls.USERS)
+        )
+        events = Event.objects.bulk_create(
+            Event(
+                name=f"Evento {i}",
+                location=f"Lugar {i % 40}",
+                latitude=rng.uniform(-34, -33),
+                longitude=rng.uniform(-71, -70),
+                start_date=now + timedelta(days=i - cls.EVENTS // 2),
+                end_date=now + timedelta(days=i - cls.EVENTS // 2, hours=5),
+            )
+            for i in range(cls.EVENTS)
+        )
+        CheckIn.objects.bulk_create(
+            CheckIn(
+                user=rng.choice(users),
+                location=f"Lugar {i % 40}",
+                latitude=rng.uniform(-56, -17),
+                longitude=rng.uniform(-76, -66),
+                tx_hash=f"0x{i:064x}",
+            )
+            for i in range(cls.CHECKINS)
+        )
+        for day in range(60):
+            CheckIn.objects.filter(id__gt=day * cls.CHECKINS // 60, id__lte=(day + 1) * cls.CHECKINS // 60) \
+                .update(timestamp=now - timedelta(days=day))
+        EventAttendance.objects.bulk_create(
+            EventAttendance(user=users[i % cls.USERS], event=events[i % cls.EVENTS], tx_hash=f"0x{i:064x}")
+            for i in range(cls.USERS)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        clear_caches()
+        clear_live_events()
+        self.watched = {
+            model._meta.db_table for model in (CheckIn, Event, EventAttendance, HeatmapCell)
+        }
+
+    def _full_scans(self, sql: str) -> list:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+                plan = [row[0] for row in cursor.fetchall()]
+                scans = [re.search(r"Seq Scan on (\w+)", line) for line in plan]
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+                scans = [re.fullmatch(r"SCAN (\w+)(?: AS \w+)?", line) for line in plan]
+        return [match.group(1) for match in scans if match and match.group(1) in self.watched]
+
+    def _assert_indexed(self, label: str, queries: list):
+        for query in queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            scans = self._full_scans(sql)
+            self.assertFalse(scans, f"{label}: recorrido completo de {scans}\n{sql}")
+
+    def test_endpoints_use_indexes(self):
+        for url in self.ENDPOINTS:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+            self._assert_indexed(url, context.captured_queries)
+
+    def test_checkin_duplicate_checks_use_indexes(self):
+        attendance = EventAttendance.objects.select_related("user", "event").first()
+        with CaptureQueriesContext(connection) as context:
+            EventAttendance.objects.filter(tx_hash=attendance.tx_hash).exists()
+            EventAttendance.objects.filter(user=attendance.user, event=attendance.event).exists()
+            CheckIn.objects.filter(tx_hash=attendance.tx_hash).exists()
+        self._assert_indexed("duplicados", context.captured_queries)
+
+    def test_admin_changelists_use_indexes(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "admin"))
+        urls = (
+            "/admin/blockchain_api/userprofile/",
+            "/admin/blockchain_api/userprofile/?q=0x00000000000000000000000000000000000000AB",
+            "/admin/blockchain_api/checkin/",
+            "/admin/blockchain_api/checkin/?q=0x00000000000000000000000000000000000000000000000000000000000000ab",
+            "/admin/blockchain_api/checkin/?q=0x00000000000000000000000000000000000000a",
+            "/admin/blockchain_api/checkin/?q=0x00000000000000000000000000000000000000ab",
+            "/admin/blockchain_api/checkin/?q=bella",
+            "/admin/blockchain_api/checkin/?q=lugar+1",
+            "/admin/blockchain_api/userprofile/?q=bob",
+            "/admin/blockchain_api/userprofile/?q=User1",
+            "/admin/blockchain_api/eventattendance/?q=0x0000",
+            "/admin/blockchain_api/checkinverification/",
+        )
+        watched = self.watched
+        for url in urls:
+            # En el resto de los changelists userprofile entra por JOIN con
+            # las 200 filas sembradas, donde el planner prefiere recorrerla
+            self.watched = watched | {UserProfile._meta.db_table} if "/userprofile/" in url else watched
+            with self.subTest(url=url), CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+            self._assert_indexed(url, context.captured_queries)
+        self.watched = watched
+
+        response = self.client.get("/admin/blockchain_api/checkin/?q=0x" + "%064x" % 171)
+        self.assertEqual(response.context["cl"].result_count, 1)
+        response = self.client.get("/admin/blockchain_api/userprofile/?q=0x00000000000000000000000000000000000000AB")
+        self.assertEqual(response.context["cl"].result_count, 1)
+        # user1, user10-19, user100-199
+        response = self.client.get("/admin/blockchain_api/userprofile/?q=User1")
+        self.assertEqual(response.context["cl"].result_count, 111)
@@ -4,16 +4,21 @@ Rutas de la API para blockchain_api app.
 """
 
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # USER ENDPOINTS
     path('checkins/<str:address>/', views.get_user_checkins_view, name='get_user_checkins'),
+    path('auth/nonce/', views.auth_nonce, name='auth_nonce'),
     path('login_wallet/', views.login_wallet, name='login_wallet'),
     
     # EVENT ENDPOINTS
     path('events/', views.events_view, name='events'),
+    path('events/nearby/', views.events_nearby, name='events_nearby'),
+    path('events/attendees/', views.events_attendees, name='events_attendees'),
     path('event_checkin/', views.event_checkin, name='event_checkin'),
+    path('event_checkin/bulk/', views.event_checkin_bulk, name='event_checkin_bulk'),
+    path('event_checkin/<int:verification_id>/', views.event_checkin_status, name='event_checkin_status'),
     
     # ANALYTICS ENDPOINTS
     path('heatmap/', views.heatmap_data, name='heatmap_data'),
@@ -23,4 +28,12 @@ urlpatterns = [
     # INFO & HEALTH ENDPOINTS
     path('blockchain/info/', views.blockchain_info, name='blockchain_info'),
     path('health/', views.health_check, name='health_check'),
+    path('metrics', views.metrics_view, name='metrics'),  # sin slash: ruta por defecto de Prometheus
+
+    # ASYNC (ASGI) ENDPOINTS: servir con core/asgi.py (uvicorn, daphne); bajo WSGI
+    # cada request corre en un event loop nuevo (ver async_views.py)
+    path('async/checkins/<str:address>/', async_views.get_user_checkins_view, name='async_get_user_checkins'),
+    path('async/event_checkin/', async_views.event_checkin, name='async_event_checkin'),
+    path('async/blockchain/info/', async_views.blockchain_info, name='async_blockchain_info'),
+    path('async/health/', async_views.health_check, name='async_health_check'),
 ]
\ No newline at end of file
@@ -3,22 +3,53 @@ views.py
 API endpoints para la aplicación Tinder de Fiestas.
 """
 
+import math
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from web3 import Web3
-from eth_account.messages import encode_defunct
 
 from .blockchain_service import (
-    get_user_checkins,
+    get_user_checkins_page,
     verify_event_checkin_tx,
     get_contract_info,
+    get_cache_stats,
     is_blockchain_connected,
     get_last_checkin
 )
 from .analytics_service import get_heatmap_data, get_activity_stats
-from .models import UserProfile, CheckIn, Event, EventAttendance
-from .serializers import EventSerializer
+from .bulk_checkin import MAX_ITEMS as BULK_CHECKIN_MAX_ITEMS, process_bulk_checkins
+from .checkin_queue import enqueue_verification
+from .checkin_service import register_checkin
+from .event_cache import enrich_checkins
+from .events_service import (
+    STATUSES as EVENT_STATUSES,
+    normalize_status as normalize_event_status,
+    DEFAULT_PAGE_SIZE as EVENTS_PAGE_SIZE,
+    MAX_PAGE_SIZE as EVENTS_MAX_PAGE_SIZE,
+    NEARBY_DEFAULT_RADIUS_KM,
+    NEARBY_MAX_RADIUS_KM,
+    get_events,
+    get_events_validators,
+    get_nearby_events
+)
+from .heatmap import get_heatmap_cells
+from .map_stream import stream_map
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics
+from .models import UserProfile, Event, EventAttendance, CheckInVerification
+from .response_cache import cached_view, get_response_cache_stats
+from .serializers import EventSerializer, CheckInVerificationSerializer
+from .services.auth_service import check_signature
+from .services.token_service import NONCE_TTL, TOKEN_TTL, check_nonce, consume_nonce, issue_nonce, issue_token
+from .validators import validate_coordinates
 
 
 # ============================================
@@ -34,7 +65,8 @@ def blockchain_info(request):
     info = get_contract_info()
     return Response({
         "status": "success",
-        "blockchain": info
+        "blockchain": info,
+        "cache": get_cache_stats()
     })
 
 
@@ -45,29 +77,32 @@ def blockchain_info(request):
 @api_view(["GET"])
 def get_user_checkins_view(request, address):
     """
-    GET /api/checkins/<address>/
-    Obtiene todos los check-ins de un usuario desde blockchain.
+    GET /api/checkins/<address>/?offset=0&limit=50
+    Obtiene los check-ins de un usuario (índice local o blockchain).
+    Sin limit devuelve todos.
     """
 
     if not Web3.is_address(address):
         return Response({"error": "Invalid wallet address format"}, status=400)
 
     try:
-        checkins = get_user_checkins(address)
+        offset = int(request.GET.get("offset", 0))
+        limit = request.GET.get("limit")
+        limit = int(limit) if limit is not None else None
+        if offset < 0 or (limit is not None and limit <= 0):
+            raise ValueError()
+    except ValueError:
+        return Response({"error": "Invalid offset or limit parameter"}, status=400)
 
-        for checkin in checkins:
-            try:
-                event = Event.objects.get(id=checkin["eventId"])
-                checkin["event_name"] = event.name
-                checkin["event_description"] = event.description
-                checkin["event_location"] = event.location
-            except Event.DoesNotExist:
-                checkin["event_name"] = f"Event #{checkin['eventId']}"
+    try:
+        checkins, total = get_user_checkins_page(address, offset=offset, limit=limit)
+        enrich_checkins(checkins)
 
         return Response({
             "status": "success",
             "wallet_address": address,
-            "total_checkins": len(checkins),
+            "total_checkins": total,
+            "offset": offset,
             "checkins": checkins
         })
 
@@ -75,11 +110,29 @@ def get_user_checkins_view(request, address):
         return Response({"error": f"Error fetching check-ins: {str(e)}"}, status=500)
 
 
+@api_view(["GET"])
+def auth_nonce(request):
+    """
+    GET /api/auth/nonce/?address=0x...
+    Nonce firmado por el servidor para el mensaje de login.
+    """
+    address = request.GET.get("address")
+    if not address:
+        return Response({"error": "Missing required parameters"}, status=400)
+    if not Web3.is_address(address):
+        return Response({"error": "Invalid wallet address format"}, status=400)
+
+    response = Response({"nonce": issue_nonce(address), "expires_in": NONCE_TTL})
+    response["Cache-Control"] = "no-store"
+    return response
+
+
 @api_view(["POST"])
 def login_wallet(request):
     """
     POST /api/login_wallet/
-    Autentica mediante firma de MetaMask.
+    Autentica mediante firma de MetaMask y devuelve un token de sesión
+    (Authorization: Bearer <token> en los requests siguientes).
     """
 
     try:
@@ -93,27 +146,30 @@ def login_wallet(request):
         if not Web3.is_address(address):
             return Response({"error": "Invalid wallet address format"}, status=400)
 
-        message = encode_defunct(text=nonce)
-        w3 = Web3()
+        nonce_error = check_nonce(nonce, address)
+        if nonce_error:
+            return Response({"error": nonce_error}, status=401)
 
-        try:
-            recovered = w3.eth.account.recover_message(message, signature=signature)
-        except Exception as e:
-            return Response({"error": f"Invalid signature: {str(e)}"}, status=401)
+        verified, error = check_signature(address, signature, nonce)
+        if not verified:
+            return Response({"error": error}, status=401)
 
-        if recovered.lower() != address.lower():
-            return Response({"error": "Signature verification failed"}, status=401)
+        if not consume_nonce(nonce):
+            return Response({"error": "Nonce already used"}, status=401)
 
         user, created = UserProfile.objects.get_or_create(wallet_address=address)
 
         return Response({
             "status": "success",
             "message": "Wallet authenticated successfully",
+            "token": issue_token(address),
+            "token_type": "Bearer",
+            "expires_in": TOKEN_TTL,
             "user": {
                 "wallet_address": user.wallet_address,
                 "username": user.username,
                 "created": created,
-                "total_checkins": user.checkins.count()
+                "total_checkins": user.checkin_count
             }
         })
 
@@ -125,16 +181,65 @@ def login_wallet(request):
 # EVENT ENDPOINTS
 # ============================================
 
+def _events_validators(request) -> tuple:
+    """
+    (etag, last_modified) de GET /api/events/, calculados una vez por request.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None, None
+
+    if not hasattr(request, "_events_validators"):
+        try:
+            status_filter = normalize_event_status(request.GET.get("status"))
+            variant = (sorted(request.GET.lists()), request.META.get("HTTP_ACCEPT", ""))
+            request._events_validators = get_events_validators(repr(variant), status_filter)
+        except ValueError:
+            request._events_validators = (None, None)
+
+    return request._events_validators
+
+
+@condition(
+    etag_func=lambda request: _events_validators(request)[0],
+    last_modified_func=lambda request: _events_validators(request)[1],
+)
+@cached_view("event", vary=lambda request: _events_validators(request)[0])
 @api_view(["GET", "POST"])
 def events_view(request):
     """
     GET → Lista todos los eventos (solo array)
     POST → Crea evento
+
+    Query params (GET):
+        status: upcoming | live | past ("ongoing" = live)
+        limit, cursor: Paginación por cursor; la respuesta pasa a ser
+                       {"results": [...], "next_cursor": str | null}
+
+    Las respuestas llevan ETag y Last-Modified derivados de la versión de
+    la tabla Event: un cliente con la versión vigente recibe 304 sin
+    consultar ni serializar los eventos.
     """
 
     if request.method == "GET":
-        eventos = Event.objects.all().order_by("-start_date")
+        try:
+            status_filter = normalize_event_status(request.GET.get("status"))
+        except ValueError:
+            return Response({"error": f"Invalid status. Use one of: {', '.join(EVENT_STATUSES)}"}, status=400)
+
+        paginated = "limit" in request.GET or "cursor" in request.GET
+        try:
+            limit = None
+            if paginated:
+                limit = min(int(request.GET.get("limit", EVENTS_PAGE_SIZE)), EVENTS_MAX_PAGE_SIZE)
+                if limit <= 0:
+                    raise ValueError()
+            eventos, next_cursor = get_events(status_filter, request.GET.get("cursor"), limit)
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor parameter"}, status=400)
+
         serializer = EventSerializer(eventos, many=True)
+        if paginated:
+            return Response({"results": serializer.data, "next_cursor": next_cursor})
         return Response(serializer.data)  # SOLO EL ARRAY ✔
 
     elif request.method == "POST":
@@ -154,11 +259,82 @@ def events_view(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["GET"])
+def events_nearby(request):
+    """
+    GET /api/events/nearby/?lat=&lng=&radius_km=&limit=&status=
+
+    Eventos a menos de radius_km (por defecto 10, máximo 100) del punto,
+    del más cercano al más lejano, cada uno con distance_km.
+    """
+    if "lat" not in request.GET or "lng" not in request.GET:
+        return Response({"error": "Missing required parameters: lat, lng"}, status=400)
+
+    is_valid, error = validate_coordinates(request.GET["lat"], request.GET["lng"])
+    if not is_valid:
+        return Response({"error": error}, status=400)
+
+    try:
+        status_filter = normalize_event_status(request.GET.get("status"))
+    except ValueError:
+        return Response({"error": f"Invalid status. Use one of: {', '.join(EVENT_STATUSES)}"}, status=400)
+
+    try:
+        radius_km = float(request.GET.get("radius_km", NEARBY_DEFAULT_RADIUS_KM))
+        limit = min(int(request.GET.get("limit", EVENTS_PAGE_SIZE)), EVENTS_MAX_PAGE_SIZE)
+        if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM or limit <= 0:
+            raise ValueError()
+    except ValueError:
+        return Response({
+            "error": f"Invalid radius_km or limit parameter (radius_km: 0-{NEARBY_MAX_RADIUS_KM})"
+        }, status=400)
+
+    nearby = get_nearby_events(
+        float(request.GET["lat"]), float(request.GET["lng"]), radius_km, limit, status_filter
+    )
+    results = EventSerializer([event for event, _ in nearby], many=True).data
+    for data, (_, distance_km) in zip(results, nearby):
+        data["distance_km"] = round(distance_km, 3)
+    return Response(results)
+
+
+@api_view(["GET"])
+def events_attendees(request):
+    """
+    GET /api/events/attendees/?ids=1,2,3
+
+    Asistentes por evento ({"<id>": attendee_count}), sin caché: cambia con
+    cada check-in, por eso no viaja en las respuestas cacheadas de eventos.
+    Los ids inexistentes se omiten.
+    """
+    try:
+        ids = {int(value) for value in request.GET.get("ids", "").split(",") if value.strip()}
+        if not ids or len(ids) > EVENTS_MAX_PAGE_SIZE:
+            raise ValueError()
+    except ValueError:
+        return Response({"error": f"Invalid ids parameter (1-{EVENTS_MAX_PAGE_SIZE} event ids)"}, status=400)
+
+    counts = Event.objects.filter(id__in=ids).values_list("id", "attendee_count")
+    response = Response({str(event_id): count for event_id, count in counts})
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def _is_async_request(request) -> bool:
+    value = request.data.get("async", request.GET.get("async"))
+    if value is None:
+        return getattr(settings, "CHECKIN_ASYNC_DEFAULT", False)
+    return str(value).lower() in ("1", "true", "yes")
+
+
 @api_view(["POST"])
 def event_checkin(request):
     """
     POST /api/event_checkin/
     Registra asistencia verificando TX en blockchain.
+
+    Con "async": true (o ?async=1) responde 202 con un verification_id y
+    la verificación continúa en segundo plano.
     """
 
     event_id = request.data.get("event_id")
@@ -171,7 +347,7 @@ def event_checkin(request):
     if not Web3.is_address(wallet_address):
         return Response({"error": "Invalid wallet address format"}, status=400)
 
-    if not tx_hash.startswith("0x") or len(tx_hash) != 66:
+    if not isinstance(tx_hash, str) or not tx_hash.startswith("0x") or len(tx_hash) != 66:
         return Response({"error": "Invalid transaction hash format"}, status=400)
 
     try:
@@ -194,6 +370,9 @@ def event_checkin(request):
     if EventAttendance.objects.filter(user=user, event=event).exists():
         return Response({"error": "User has already checked in to this event"}, status=400)
 
+    if _is_async_request(request):
+        return _enqueue_event_checkin(user, event, tx_hash)
+
     try:
         blockchain_data = verify_event_checkin_tx(
             tx_hash=tx_hash,
@@ -203,19 +382,14 @@ def event_checkin(request):
     except Exception as e:
         return Response({"error": f"Blockchain verification failed: {str(e)}"}, status=400)
 
-    attendance = EventAttendance.objects.create(
-        user=user,
-        event=event,
-        tx_hash=tx_hash
-    )
+    try:
+        attendance = register_checkin(user, event, tx_hash)
+    except IntegrityError:
+        # Un request concurrente registró la misma TX o asistencia
+        return Response({"error": "User has already checked in to this event"}, status=400)
 
-    CheckIn.objects.create(
-        user=user,
-        location=event.location,
-        latitude=event.latitude,
-        longitude=event.longitude,
-        tx_hash=tx_hash
-    )
+    # checkin_count se incrementó con F() en la base
+    user.refresh_from_db(fields=["checkin_count"])
 
     return Response({
         "status": "success",
@@ -226,32 +400,173 @@ def event_checkin(request):
         "user": {
             "wallet_address": user.wallet_address,
             "new_user": created_user,
-            "total_checkins": user.checkins.count()
+            "total_checkins": user.checkin_count
         }
     }, status=201)
 
 
+def _enqueue_event_checkin(user, event, tx_hash):
+    """
+    Persiste la verificación pendiente y la entrega a la cola asíncrona.
+    """
+    pending = CheckInVerification.objects.filter(
+        status=CheckInVerification.STATUS_PENDING
+    )
+    if pending.filter(tx_hash=tx_hash).exists() or pending.filter(user=user, event=event).exists():
+        return Response({"error": "A verification for this check-in is already in progress"}, status=400)
+
+    verification = CheckInVerification.objects.create(user=user, event=event, tx_hash=tx_hash)
+
+    if not enqueue_verification(verification.id):
+        verification.delete()
+        return Response({"error": "Verification queue is full, try again later"}, status=503)
+
+    return Response({
+        "status": "pending",
+        "message": f"Check-in for {event.name} queued for blockchain verification",
+        "verification_id": verification.id,
+        "status_url": reverse("event_checkin_status", args=[verification.id])
+    }, status=202)
+
+
+@api_view(["POST"])
+def event_checkin_bulk(request):
+    """
+    POST /api/event_checkin/bulk/
+    Registra varios check-ins verificando sus TX en batches RPC.
+
+    Body:
+    {
+        "checkins": [{"event_id": 1, "wallet_address": "0x...", "tx_hash": "0x..."}, ...]
+    }
+
+    Responde un resultado por item, en el mismo orden (ver bulk_checkin.py).
+    """
+
+    items = request.data.get("checkins")
+
+    if not isinstance(items, list) or not items:
+        return Response({"error": "checkins must be a non-empty list"}, status=400)
+
+    if len(items) > BULK_CHECKIN_MAX_ITEMS:
+        return Response({"error": f"Too many check-ins (max {BULK_CHECKIN_MAX_ITEMS})"}, status=400)
+
+    results = process_bulk_checkins(items)
+    created = sum(1 for result in results if result["status"] == "success")
+
+    return Response({
+        "status": "success" if created == len(results) else "partial" if created else "failed",
+        "total": len(results),
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    })
+
+
+@api_view(["GET"])
+def event_checkin_status(request, verification_id):
+    """
+    GET /api/event_checkin/<id>/
+    Estado de una verificación asíncrona de check-in.
+    """
+
+    try:
+        verification = CheckInVerification.objects.select_related("user", "attendance").get(id=verification_id)
+    except CheckInVerification.DoesNotExist:
+        return Response({"error": "Verification not found"}, status=404)
+
+    return Response(CheckInVerificationSerializer(verification).data)
+
+
 # ============================================
 # ANALYTICS ENDPOINTS
 # ============================================
 
+BBOX_GRID = getattr(settings, "RESPONSE_CACHE_BBOX_GRID", 0.01)
+
+
+def _snap(value: float, rounding, limit: float) -> float:
+    # + 0.0: -0.0 y 0.0 dan la misma clave
+    snapped = round(rounding(value / BBOX_GRID) * BBOX_GRID, 6) + 0.0
+    return max(-limit, min(limit, snapped))
+
+
+def _parse_bbox(value: str) -> tuple:
+    """
+    Parsea "min_lng,min_lat,max_lng,max_lat" y lo ajusta hacia afuera a la
+    grilla BBOX_GRID: el mapa recibe un margen mínimo de más y los
+    viewports casi iguales comparten respuesta cacheada.
+    """
+    min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(","))
+    valid, error = validate_coordinates(min_lat, min_lng)
+    if valid:
+        valid, error = validate_coordinates(max_lat, max_lng)
+    if not valid or min_lat > max_lat:
+        raise ValueError(error or "min_lat must be lower than max_lat")
+    return (
+        _snap(min_lng, math.floor, 180), _snap(min_lat, math.floor, 90),
+        _snap(max_lng, math.ceil, 180), _snap(max_lat, math.ceil, 90),
+    )
+
+
+def _bbox_cache_key(request) -> str:
+    """
+    Clave de caché con el bbox ya ajustado a la grilla (ver _parse_bbox).
+    """
+    params = request.GET.copy()
+    if "bbox" in params:
+        try:
+            params["bbox"] = ",".join(str(part) for part in _parse_bbox(params["bbox"]))
+        except ValueError:
+            return request.get_full_path()
+    return f"{request.path}?{urlencode(sorted(params.lists()), doseq=True)}"
+
+
+@cached_view("checkin", key=_bbox_cache_key)
 @api_view(["GET"])
 def heatmap_data(request):
     """
     GET /api/heatmap/
+    GET /api/heatmap/?bbox=min_lng,min_lat,max_lng,max_lat&zoom=10
     Devuelve SOLO EL ARRAY ✔
+
+    Con bbox/zoom responde desde la grilla precalculada, sólo con las celdas visibles
+    (400 si son más de HEATMAP_MAX_CELLS).
     """
     try:
+        if "bbox" in request.GET or "zoom" in request.GET:
+            try:
+                bbox = _parse_bbox(request.GET.get("bbox", "-180,-90,180,90"))
+                zoom = int(request.GET.get("zoom", 0))
+                if zoom < 0:
+                    raise ValueError()
+            except ValueError:
+                return Response({"error": "Invalid bbox or zoom parameter"}, status=400)
+
+            try:
+                return Response(get_heatmap_cells(bbox, zoom))
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
         data = get_heatmap_data()
         return Response(data)  # SOLO EL ARRAY ✔
     except Exception as e:
         return Response({"error": f"Error fetching heatmap data: {str(e)}"}, status=500)
 
 
+@cached_view(
+    "checkin",
+    vary=lambda request: str(timezone.localdate()),
+    bypass=lambda request: request.GET.get("exact", "").lower() in ("1", "true"),
+)
 @api_view(["GET"])
 def activity_stats(request):
     """
     GET /api/stats/
+
+    Query params:
+        days: Ventana en días (default 7)
+        exact: 1 para contar sobre los check-ins en vez de los agregados diarios
     """
 
     try:
@@ -260,7 +575,8 @@ def activity_stats(request):
         if days <= 0:
             return Response({"error": "Days must be positive"}, status=400)
 
-        stats = get_activity_stats(days=days)
+        exact = request.GET.get("exact", "").lower() in ("1", "true")
+        stats = get_activity_stats(days=days, exact=exact)
 
         return Response({
             "status": "success",
@@ -274,42 +590,42 @@ def activity_stats(request):
         return Response({"error": f"Error fetching stats: {str(e)}"}, status=500)
 
 
+@cached_view("event", "checkin", key=_bbox_cache_key)
 @api_view(["GET"])
 def mapa_completo(request):
     """
     GET /api/mapa/
+    GET /api/mapa/?bbox=min_lng,min_lat,max_lng,max_lat&zoom=10
     Combina eventos + check-ins
-    """
 
+    El JSON se envía por partes (ver map_stream.py). Con bbox sólo se
+    incluye lo visible; con zoom los check-ins se agrupan en clusters
+    con peso en "count".
+    """
     try:
-        eventos = Event.objects.all()
-        eventos_data = EventSerializer(eventos, many=True).data
+        bbox = _parse_bbox(request.GET["bbox"]) if "bbox" in request.GET else None
+        zoom = int(request.GET["zoom"]) if "zoom" in request.GET else None
+        if zoom is not None and zoom < 0:
+            raise ValueError()
+    except ValueError:
+        return Response({"error": "Invalid bbox or zoom parameter"}, status=400)
 
-        checkins = CheckIn.objects.filter(
-            latitude__isnull=False,
-            longitude__isnull=False
-        )
+    return StreamingHttpResponse(stream_map(bbox, zoom), content_type="application/json")
 
-        checkins_data = [
-            {
-                "latitude": c.latitude,
-                "longitude": c.longitude,
-                "count": 1,
-                "location": c.location
-            }
-            for c in checkins
-        ]
 
-        return Response({
-            "status": "success",
-            "total_events": len(eventos_data),
-            "total_checkins": len(checkins_data),
-            "eventos": eventos_data,
-            "checkins": checkins_data
-        })
+# ============================================
+# MÉTRICAS
+# ============================================
 
-    except Exception as e:
-        return Response({"error": f"Error fetching map data: {str(e)}"}, status=500)
+@require_GET
+def metrics_view(request):
+    """
+    GET /api/metrics
+
+    Métricas de todos los workers en formato de texto de Prometheus.
+    Vista Django simple: el scraper no negocia JSON con DRF.
+    """
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
 
 
 # ============================================
@@ -338,5 +654,6 @@ def health_check(request):
         "status": overall_status,
         "blockchain": blockchain_status,
         "database": db_status,
-        "contract_info": get_contract_info()
+        "contract_info": get_contract_info(),
+        "response_cache": get_response_cache_stats()
     })
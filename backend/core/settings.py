@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blockchain_api.profiling.MetricsMiddleware",
+    "blockchain_api.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,12 +85,62 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE=postgresql usa las variables POSTGRES_* (ver docs/docker-compose.yml).
+# Por defecto SQLite, ajustado para una instalación de un solo nodo.
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("POSTGRES_DB", "tinderfiestas"),
+            'USER': os.getenv("POSTGRES_USER", "admin"),
+            'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+            'HOST': os.getenv("POSTGRES_HOST", "localhost"),
+            'PORT': os.getenv("POSTGRES_PORT", "5432"),
+            # Conexiones persistentes entre requests (segundos)
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 60)),
+            'CONN_HEALTH_CHECKS': True,
+            # iterator() usa cursores del lado del servidor; desactivar detrás
+            # de PgBouncer en modo transaction
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv("DB_DISABLE_SERVER_SIDE_CURSORS", "false").lower() in ("1", "true", "yes"),
+            'OPTIONS': {},
+        }
     }
-}
+
+    # Pool de conexiones de psycopg 3 (reemplaza a CONN_MAX_AGE)
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 0))
+    if DB_POOL_MAX_SIZE:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {},
+        }
+    }
+
+    if os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes"):
+        DATABASES['default']['OPTIONS'] = {
+            # Espera hasta 20 s un lock en vez de fallar con "database is locked"
+            'timeout': 20,
+            # Las escrituras toman el lock al empezar la transacción: sin deadlocks de upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA busy_timeout=20000;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA cache_size=-65536;"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        }
 
 
 # Password validation
@@ -127,4 +184,129 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+
+
+# Verificación asíncrona de check-ins (POST /api/event_checkin/ con "async": true)
+CHECKIN_ASYNC_DEFAULT = os.getenv("CHECKIN_ASYNC_DEFAULT", "false").lower() in ("1", "true", "yes")
+CHECKIN_ASYNC_WORKERS = int(os.getenv("CHECKIN_ASYNC_WORKERS", 4))
+CHECKIN_ASYNC_MAX_PENDING = int(os.getenv("CHECKIN_ASYNC_MAX_PENDING", 200))
+CHECKIN_ASYNC_TIMEOUT = float(os.getenv("CHECKIN_ASYNC_TIMEOUT", 120))
+CHECKIN_ASYNC_BACKOFF_INITIAL = 1.0
+CHECKIN_ASYNC_BACKOFF_MAX = 15.0
+
+# Perfilado por request: header Server-Timing, log de requests lentos y
+# cProfile muestreado (ver blockchain_api/profiling.py)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SLOW_MS = float(os.getenv("PROFILING_SLOW_MS", 500))
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "profiles"))
+
+# Métricas Prometheus en GET /api/metrics (ver blockchain_api/metrics.py).
+# Con varios workers, definir METRICS_DIR (directorio compartido) en el entorno
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Login con MetaMask: nonces y tokens de sesión firmados con HMAC
+# (ver blockchain_api/services/token_service.py)
+AUTH_NONCE_TTL = int(os.getenv("AUTH_NONCE_TTL", 300))
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", 3600))
+AUTH_REQUIRE_SERVER_NONCE = os.getenv("AUTH_REQUIRE_SERVER_NONCE", "false").lower() in ("1", "true", "yes")
+# Firmas de login (ver blockchain_api/services/auth_service.py, se leen del entorno):
+#   AUTH_SIGNATURE_WORKERS   procesos del pool de verificación POR WORKER del
+#                            servidor; 0 (default) verifica en el thread del request
+#   AUTH_SIGNATURE_TIMEOUT, AUTH_SIGNATURE_CACHE_TTL, AUTH_SIGNATURE_CACHE_SIZE
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "blockchain_api.authentication.WalletTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+}
+
+# Check-ins por request en POST /api/event_checkin/bulk/
+BULK_CHECKIN_MAX_ITEMS = int(os.getenv("BULK_CHECKIN_MAX_ITEMS", 100))
+
+# Indexador local de logs EventCheckedIn (python manage.py index_checkins)
+CHECKIN_INDEXER_BATCH_SIZE = int(os.getenv("CHECKIN_INDEXER_BATCH_SIZE", 2000))
+CHECKIN_INDEXER_REORG_DEPTH = int(os.getenv("CHECKIN_INDEXER_REORG_DEPTH", 12))
+# Segundos sin actualizar el cursor antes de volver a leer del contrato
+CHECKIN_INDEXER_MAX_LAG = int(os.getenv("CHECKIN_INDEXER_MAX_LAG", 300))
+
+# Caché en memoria de metadatos de eventos (event_cache.py): máximo de
+# eventos y segundos de vida (los otros workers no ven la invalidación)
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", 5000))
+EVENT_CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", 60))
+
+# Tramos en que se guarda el sketch diario de usuarios (rollups.py): un check-in
+# sólo bloquea su tramo. Divisor de 4096; al cambiarlo correr compact_rollups
+ROLLUP_SKETCH_SHARDS = int(os.getenv("ROLLUP_SKETCH_SHARDS", 16))
+
+# Niveles de zoom precalculados de la grilla de calor (celdas de 360 / 2^zoom grados)
+HEATMAP_ZOOM_LEVELS = (4, 7, 10, 13, 16)
+# Celdas por respuesta de GET /api/heatmap/?bbox=...&zoom=...; con más se responde 400
+HEATMAP_MAX_CELLS = int(os.getenv("HEATMAP_MAX_CELLS", 5000))
+
+# Workers del servidor (gunicorn lee la misma variable). Con más de uno, las
+# marcas de nonces usados deben vivir en una caché compartida (REDIS_URL):
+# el arranque falla si no (token_service.check_nonce_cache)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+# Caché: memoria local del proceso por defecto; con REDIS_URL se comparte entre workers
+# (RedisCache de Django, requiere el paquete redis de requirements.txt).
+# "auth_nonces" guarda sólo las marcas de nonces usados (token_service.py), aparte
+# de las respuestas cacheadas para que éstas no las desalojen. Redis desaloja por
+# instancia: AUTH_NONCE_REDIS_URL debe apuntar a una sin maxmemory o con
+# maxmemory-policy noeviction (por defecto, la misma de REDIS_URL)
+REDIS_URL = os.getenv("REDIS_URL")
+AUTH_NONCE_REDIS_URL = os.getenv("AUTH_NONCE_REDIS_URL", REDIS_URL)
+# Marcas en memoria: un login cada una, viven AUTH_NONCE_TTL segundos
+AUTH_NONCE_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_NONCE_CACHE_MAX_ENTRIES", 100_000))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 200))
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+        "auth_nonces": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": AUTH_NONCE_REDIS_URL,
+            "KEY_PREFIX": "auth_nonces",
+        },
+        "responses": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "responses",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tinder-fiestas",
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        },
+        "auth_nonces": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tinder-fiestas-auth-nonces",
+            "OPTIONS": {"MAX_ENTRIES": AUTH_NONCE_CACHE_MAX_ENTRIES},
+        },
+        "responses": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tinder-fiestas-responses",
+            "OPTIONS": {"MAX_ENTRIES": RESPONSE_CACHE_MAX_ENTRIES},
+        },
+    }
+AUTH_NONCE_CACHE_ALIAS = "auth_nonces"
+
+# Caché de respuestas de heatmap, stats, events y mapa (response_cache.py), en
+# su propio alias. Cada respuesta ocupa dos entradas (vigente y stale): en
+# memoria el peor caso es MAX_ENTRIES x MAX_BYTES (~50 MB por proceso)
+RESPONSE_CACHE_ALIAS = os.getenv("RESPONSE_CACHE_ALIAS", "responses")
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 600))
+RESPONSE_CACHE_STALE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_STALE_TIMEOUT", 3600))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 256 * 1024))
+# Grilla en grados a la que se ajustan los bbox de heatmap y mapa (hacia afuera):
+# viewports casi iguales comparten la misma entrada
+RESPONSE_CACHE_BBOX_GRID = float(os.getenv("RESPONSE_CACHE_BBOX_GRID", 0.01))
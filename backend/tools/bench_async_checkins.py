@@ -0,0 +1,163 @@
+"""
+bench_async_checkins.py
+Benchmark de verificación concurrente: servicio síncrono vs AsyncWeb3.
+
+Lanza un nodo simulado (en otro proceso) con latencia por round trip y
+verifica N check-ins distintos con C requests en vuelo:
+    • sync:  verify_event_checkin_tx en un ThreadPoolExecutor de C threads
+             (lo que haría un servidor WSGI con C threads)
+    • async: async_blockchain_service.verify_event_checkin_tx con
+             asyncio.gather limitado a C corrutinas en un solo thread
+
+Para cada modo reporta verificaciones/s, latencia p50/p99 y el máximo de
+verificaciones en vuelo. La caché de cadena se vacía antes de cada ronda.
+
+Uso:
+    python tools/bench_async_checkins.py --checkins 500 --latency 0.05
+    python tools/bench_async_checkins.py --concurrency 10,50,200
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import FakeChain, serve_in_process  # noqa: E402
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class InFlight:
+    """
+    Cuenta verificaciones en vuelo y guarda el máximo observado.
+    """
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+# ============================================
+# MODOS
+# ============================================
+
+def run_sync(service, jobs: list, concurrency: int) -> tuple:
+    in_flight, latencies = InFlight(), []
+
+    def verify(job):
+        tx_hash, event_id = job
+        start = time.perf_counter()
+        with in_flight:
+            service.verify_event_checkin_tx(tx_hash, WALLET, event_id)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(verify, jobs))
+    return time.perf_counter() - start, latencies, in_flight.peak
+
+
+async def _run_async(service, jobs: list, concurrency: int) -> tuple:
+    in_flight, latencies = InFlight(), []
+    semaphore = asyncio.Semaphore(concurrency)
+    await service.get_async_client()
+
+    async def verify(job):
+        tx_hash, event_id = job
+        async with semaphore:
+            start = time.perf_counter()
+            with in_flight:
+                await service.verify_event_checkin_tx(tx_hash, WALLET, event_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(verify(job) for job in jobs))
+    elapsed = time.perf_counter() - start
+    await service.close_async_client()
+    return elapsed, latencies, in_flight.peak
+
+
+def run_async(service, jobs: list, concurrency: int) -> tuple:
+    return asyncio.run(_run_async(service, jobs, concurrency))
+
+
+def report(label: str, n: int, elapsed: float, latencies: list, peak: int):
+    print(
+        f"  {label:<6} {n / elapsed:8.1f} verif/s   p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   en vuelo máx {peak}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkins", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia simulada por round trip (s)")
+    parser.add_argument("--concurrency", default="10,50,200", help="Requests en vuelo (lista separada por comas)")
+    args = parser.parse_args()
+
+    checkins = [(WALLET, (i % 10) + 1, "Santiago") for i in range(args.checkins)]
+    chain = FakeChain()
+    jobs = [(chain.add_checkin(*checkin), checkin[1]) for checkin in checkins]
+
+    port = free_port()
+    ready = multiprocessing.Event()
+    node = multiprocessing.Process(
+        target=serve_in_process, args=(port, checkins, ready), kwargs={"latency": args.latency}, daemon=True
+    )
+    node.start()
+    ready.wait(10)
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    os.environ["RPC_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["RPC_POOL_SIZE"] = str(max(levels))
+    os.environ["ASYNC_RPC_POOL_SIZE"] = str(max(levels))
+
+    from blockchain_api import async_blockchain_service, blockchain_service
+
+    print(f"🧪 {args.checkins} verificaciones, latencia simulada {args.latency * 1000:.1f} ms")
+    try:
+        for concurrency in levels:
+            print(f"\n▶ {concurrency} en vuelo")
+            for label, run, service in (
+                ("sync", run_sync, blockchain_service),
+                ("async", run_async, async_blockchain_service),
+            ):
+                blockchain_service.chain_cache.clear()
+                report(label, len(jobs), *run(service, jobs, concurrency))
+    finally:
+        node.terminate()
+        node.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_auth.py
+Benchmark de autenticación por request: token de sesión HMAC contra
+verificar una firma de MetaMask en cada request.
+
+Modos:
+    • firma (inline): recuperación ECDSA en el thread del request
+    • firma (pool):   recuperación en el pool de procesos de auth_service
+    • token:          WalletTokenAuthentication sobre un header Bearer
+
+Las firmas usan nonces distintos, así que la caché de firmas verificadas
+no interviene. Reporta requests autenticados/s y µs por request con N
+threads concurrentes (como un servidor WSGI con N threads).
+
+Uso:
+    python tools/bench_auth.py --requests 2000 --threads 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+    django.setup()
+
+
+def run(label: str, jobs: list, threads: int, authenticate):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        ok = sum(executor.map(authenticate, jobs))
+    elapsed = time.perf_counter() - start
+
+    n = len(jobs)
+    print(f"  {label:<15} {n / elapsed:10.1f} req/s   {elapsed * 1e6 / n:9.1f} µs/req   válidos {ok}/{n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--signatures", type=int, default=200, help="Requests de los modos con firma")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool de firmas")
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test import RequestFactory
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    from blockchain_api.authentication import WalletTokenAuthentication
+    from blockchain_api.services import auth_service
+    from blockchain_api.services.token_service import issue_token
+
+    account = Account.create()
+    signed = [
+        (f"bench-{i}", account.sign_message(encode_defunct(text=f"bench-{i}")).signature.hex())
+        for i in range(args.signatures)
+    ]
+
+    def verify_signature(job):
+        nonce, signature = job
+        return auth_service.check_signature(account.address, signature, nonce)[0]
+
+    factory = RequestFactory()
+    header = f"Bearer {issue_token(account.address)}"
+    requests = [factory.get("/api/events/", HTTP_AUTHORIZATION=header) for _ in range(args.requests)]
+    authenticator = WalletTokenAuthentication()
+
+    def verify_token(request):
+        user, _ = authenticator.authenticate(request)
+        return user.wallet_address == account.address
+
+    print(f"🧪 {args.threads} threads, {os.cpu_count()} CPUs, pool de firmas de {args.workers} procesos")
+
+    auth_service.CACHE_TTL = 0
+    auth_service.WORKERS = 0
+    run("firma (inline)", signed, args.threads, verify_signature)
+
+    auth_service.WORKERS = args.workers
+    auth_service.recover_signer(*signed[0])  # arranque del pool fuera de la medición
+    run("firma (pool)", signed, args.threads, verify_signature)
+
+    run("token", requests, args.threads, verify_token)
+
+
+if __name__ == "__main__":
+    main()
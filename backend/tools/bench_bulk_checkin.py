@@ -0,0 +1,130 @@
+"""
+bench_bulk_checkin.py
+Benchmark de POST /api/event_checkin/bulk/ contra N POST /api/event_checkin/.
+
+Usa un SQLite temporal (perfil ajustado de core/settings.py) y un nodo
+simulado con latencia por round trip. Cada modo registra N check-ins
+nuevos y reporta check-ins/s, round trips RPC y consultas SQL por check-in.
+Requiere las migraciones generadas (python manage.py makemigrations).
+
+Uso:
+    python tools/bench_bulk_checkin.py --checkins 500 --latency 0.005
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import FakeNode  # noqa: E402
+
+
+def setup(latency: float) -> FakeNode:
+    node = FakeNode(latency=latency).start()
+    os.environ["RPC_URL"] = node.url
+    os.environ["DATABASE_ENGINE"] = "sqlite"
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_bulk_"), "bench.sqlite3")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+        cwd=BASE_DIR, env=os.environ, check=True
+    )
+
+    import django
+    django.setup()
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    return node
+
+
+def make_items(node: FakeNode, mode: str, n: int) -> list:
+    from django.utils import timezone
+    from web3 import Web3
+    from blockchain_api.models import Event
+
+    now = timezone.now()
+    events = [
+        Event.objects.create(
+            name=f"bench-{mode}-{i}", location=f"Lugar {i}", latitude=-33.45 + i * 0.01,
+            longitude=-70.66, start_date=now, end_date=now
+        )
+        for i in range(10)
+    ]
+
+    items = []
+    for i in range(n):
+        wallet = Web3.to_checksum_address(f"0x{mode.encode().hex():0>8}{i:032x}")
+        event = events[i % len(events)]
+        tx_hash = node.chain.add_checkin(wallet, event_id=event.id, location=event.location)
+        items.append({"event_id": event.id, "wallet_address": wallet, "tx_hash": tx_hash})
+    return items
+
+
+def run(label: str, node: FakeNode, items: list, submit) -> None:
+    from django.db import connection
+    from blockchain_api.blockchain_service import chain_cache
+
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    chain_cache.clear()
+    node.reset_counters()
+    start = time.perf_counter()
+    with connection.execute_wrapper(count):
+        created = submit(items)
+    elapsed = time.perf_counter() - start
+
+    n = len(items)
+    print(
+        f"  {label:<10} {n / elapsed:8.1f} check-ins/s   creados {created}/{n}   "
+        f"round trips/check-in {node.round_trips / n:5.2f}   consultas/check-in {len(queries) / n:6.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkins", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="Latencia simulada por round trip (s)")
+    args = parser.parse_args()
+
+    node = setup(args.latency)
+
+    from django.test import Client
+    from blockchain_api.bulk_checkin import MAX_ITEMS
+
+    client = Client()
+
+    def one_by_one(items):
+        return sum(
+            client.post("/api/event_checkin/", item, content_type="application/json").status_code == 201
+            for item in items
+        )
+
+    def bulk(items):
+        created = 0
+        for start in range(0, len(items), MAX_ITEMS):
+            response = client.post(
+                "/api/event_checkin/bulk/", {"checkins": items[start:start + MAX_ITEMS]},
+                content_type="application/json"
+            )
+            created += response.json()["created"]
+        return created
+
+    print(f"🧪 {args.checkins} check-ins, latencia simulada {args.latency * 1000:.1f} ms, lotes de {MAX_ITEMS}")
+    run("individual", node, make_items(node, "one", args.checkins), one_by_one)
+    run("bulk", node, make_items(node, "bulk", args.checkins), bulk)
+
+    node.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+bench_database.py
+Benchmark de los perfiles de base de datos de core/settings.py.
+
+Para cada perfil lanza N procesos que registran check-ins en paralelo
+(register_checkin, como el endpoint) mientras otro proceso consulta la
+analítica, y reporta:
+    • throughput de escritura y latencia p50/p99 por check-in
+    • errores (por ejemplo "database is locked")
+    • latencia p50/p99 de stats exactas, stats por agregados y heatmap
+
+Perfiles:
+    sqlite-default  SQLite sin ajustes (journal rollback, sin busy timeout)
+    sqlite          SQLite ajustado (WAL, busy_timeout, mmap, IMMEDIATE)
+    postgresql      Variables POSTGRES_*; se omite si no hay servidor
+
+Los perfiles SQLite usan un archivo temporal. En PostgreSQL sólo se borran
+las filas creadas por el benchmark. Requiere las migraciones generadas
+(python manage.py makemigrations).
+
+Uso:
+    python tools/bench_database.py --workers 4 --writes 200
+    python tools/bench_database.py --profiles sqlite,postgresql
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+PROFILES = {
+    "sqlite-default": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNING": "false"},
+    "sqlite": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNING": "true"},
+    "postgresql": {"DATABASE_ENGINE": "postgresql"},
+}
+
+
+def setup_django(env: dict):
+    os.environ.update(env)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+    django.setup()
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+# ============================================
+# PROCESOS
+# ============================================
+
+def seed(env: dict, run_id: str, events: int) -> list:
+    setup_django(env)
+    from django.utils import timezone
+    from blockchain_api.models import Event
+
+    now = timezone.now()
+    created = Event.objects.bulk_create(
+        Event(
+            name=f"bench-{run_id}-{i}",
+            location=f"Lugar {i % 20}",
+            latitude=-33.45 + i * 0.001,
+            longitude=-70.66 + i * 0.001,
+            start_date=now,
+            end_date=now,
+        )
+        for i in range(events)
+    )
+    return [event.id for event in created]
+
+
+def writer(env: dict, run_id: str, worker: int, event_ids: list, writes: int, ready, go, results):
+    setup_django(env)
+    from blockchain_api.checkin_service import register_checkin
+    from blockchain_api.models import Event, UserProfile
+
+    events = list(Event.objects.filter(id__in=event_ids))
+    latencies, errors = [], 0
+
+    # Todos los workers empiezan a escribir a la vez, ya conectados
+    ready.put(worker)
+    go.wait()
+    started = time.time()
+
+    for i in range(writes):
+        start = time.perf_counter()
+        try:
+            user = UserProfile.objects.create(wallet_address=f"bench-{run_id}-{worker}-{i}")
+            register_checkin(user, events[i % len(events)], f"0x{run_id}{worker:04x}{i:08x}")
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    results.put({
+        "kind": "writer", "latencies": latencies, "errors": errors,
+        "started": started, "finished": time.time()
+    })
+
+
+def reader(env: dict, go, stop, results):
+    setup_django(env)
+    from django.db import connection
+    from blockchain_api.analytics_service import get_activity_stats, get_heatmap_data
+
+    queries = {
+        "stats exactas": lambda: get_activity_stats(days=7, exact=True),
+        "stats agregados": lambda: get_activity_stats(days=7),
+        "heatmap": get_heatmap_data,
+    }
+    latencies = {name: [] for name in queries}
+    errors = 0
+    go.wait()
+
+    while not stop.is_set():
+        for name, query in queries.items():
+            start = time.perf_counter()
+            try:
+                query()
+            except Exception:
+                errors += 1
+                connection.close()
+            latencies[name].append(time.perf_counter() - start)
+
+    results.put({"kind": "reader", "latencies": latencies, "errors": errors})
+
+
+def cleanup(env: dict, run_id: str):
+    setup_django(env)
+    from blockchain_api.models import CheckIn, Event, UserProfile
+
+    CheckIn.objects.filter(user__wallet_address__startswith=f"bench-{run_id}-").delete()
+    UserProfile.objects.filter(wallet_address__startswith=f"bench-{run_id}-").delete()
+    Event.objects.filter(name__startswith=f"bench-{run_id}-").delete()
+
+
+# ============================================
+# PERFILES
+# ============================================
+
+def run_in_process(target, *args):
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_call, args=(target, args, results))
+    process.start()
+    value = results.get()
+    process.join()
+    return value
+
+
+def _call(target, args, results):
+    results.put(target(*args))
+
+
+def run_profile(name: str, args) -> dict:
+    env = dict(PROFILES[name])
+    run_id = uuid.uuid4().hex[:8]
+    tmpdir = None
+
+    if env["DATABASE_ENGINE"] == "sqlite":
+        tmpdir = tempfile.mkdtemp(prefix="bench_db_")
+        env["SQLITE_PATH"] = os.path.join(tmpdir, "bench.sqlite3")
+
+    migrate = subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+        cwd=BASE_DIR, env={**os.environ, **env}, capture_output=True, text=True
+    )
+    if migrate.returncode != 0:
+        print(f"⚠️ Perfil {name} omitido: {migrate.stderr.strip().splitlines()[-1]}")
+        return None
+
+    event_ids = run_in_process(seed, env, run_id, args.events)
+
+    results, ready = multiprocessing.Queue(), multiprocessing.Queue()
+    go, stop = multiprocessing.Event(), multiprocessing.Event()
+    analytics = multiprocessing.Process(target=reader, args=(env, go, stop, results))
+    writers = [
+        multiprocessing.Process(
+            target=writer, args=(env, run_id, worker, event_ids, args.writes, ready, go, results)
+        )
+        for worker in range(args.workers)
+    ]
+
+    for process in writers + [analytics]:
+        process.start()
+    for _ in writers:
+        ready.get()
+    go.set()
+
+    outputs = [results.get() for _ in writers]
+    elapsed = max(output["finished"] for output in outputs) - min(output["started"] for output in outputs)
+    stop.set()
+    outputs.append(results.get())
+
+    for process in writers + [analytics]:
+        process.join()
+
+    if tmpdir is None:
+        run_in_process(cleanup, env, run_id)
+
+    write_latencies = [value for output in outputs if output["kind"] == "writer" for value in output["latencies"]]
+    reader_output = next(output for output in outputs if output["kind"] == "reader")
+
+    return {
+        "writes_per_s": len(write_latencies) / elapsed,
+        "write_p50_ms": statistics.median(write_latencies) * 1000,
+        "write_p99_ms": percentile(write_latencies, 0.99) * 1000,
+        "write_errors": sum(output["errors"] for output in outputs if output["kind"] == "writer"),
+        "read_errors": reader_output["errors"],
+        "reads": {
+            query: (statistics.median(values) * 1000 if values else 0.0, percentile(values, 0.99) * 1000)
+            for query, values in reader_output["latencies"].items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="sqlite-default,sqlite,postgresql")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=200, help="Check-ins por worker")
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn")
+
+    for name in args.profiles.split(","):
+        result = run_profile(name.strip(), args)
+        if result is None:
+            continue
+
+        print(f"\n▶ {name}  ({args.workers} workers × {args.writes} check-ins)")
+        print(f"  escrituras: {result['writes_per_s']:8.1f} check-ins/s   p50 {result['write_p50_ms']:7.2f} ms   "
+              f"p99 {result['write_p99_ms']:7.2f} ms   errores {result['write_errors']}")
+        for query, (p50, p99) in result["reads"].items():
+            print(f"  {query:<16} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+        print(f"  errores de lectura: {result['read_errors']}")
+
+
+if __name__ == "__main__":
+    main()
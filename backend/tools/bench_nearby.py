@@ -0,0 +1,156 @@
+"""
+bench_nearby.py
+Benchmark de GET /api/events/nearby/ sobre eventos sintéticos: prefiltro
+por geohash + haversine en NumPy contra recorrer toda la tabla.
+
+Modos:
+    • completo (python): todos los eventos, haversine con math fila por fila
+    • completo (numpy):  todas las coordenadas, haversine vectorizado
+    • geohash (numpy):   events_service.get_nearby_events
+
+La mitad de los eventos se concentra alrededor de Santiago y el resto se
+reparte por Chile. Corre sobre un SQLite temporal (perfil ajustado de
+core/settings.py) y verifica que los tres modos devuelvan los mismos
+eventos. Reporta ms por consulta (p50/p95) por radio.
+
+Uso:
+    python tools/bench_nearby.py --events 100000 --queries 200
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+SANTIAGO = (-33.45, -70.66)
+CHILE = ((-55.0, -18.0), (-75.0, -67.0))
+RADII_KM = (2, 10, 50)
+
+
+def setup():
+    tmpdir = tempfile.mkdtemp(prefix="bench_nearby_")
+    os.environ.update({
+        "DATABASE_ENGINE": "sqlite",
+        "SQLITE_PATH": os.path.join(tmpdir, "bench.sqlite3"),
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+    })
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+        cwd=BASE_DIR, env=os.environ, check=True
+    )
+
+    import django
+    django.setup()
+
+
+def seed(n: int, rng: random.Random):
+    from datetime import timedelta
+    from django.db import connection
+    from django.utils import timezone
+    from blockchain_api.models import Event
+
+    now = timezone.now()
+    chunk = 10_000
+    for start in range(0, n, chunk):
+        events = []
+        for i in range(start, min(start + chunk, n)):
+            if i % 2:
+                latitude, longitude = rng.gauss(SANTIAGO[0], 0.3), rng.gauss(SANTIAGO[1], 0.3)
+            else:
+                latitude, longitude = rng.uniform(*CHILE[0]), rng.uniform(*CHILE[1])
+            events.append(Event(
+                name=f"Evento {i}", location="Chile", latitude=latitude, longitude=longitude,
+                start_date=now + timedelta(days=i % 60 - 30), end_date=now + timedelta(days=i % 60 - 30, hours=6),
+            ))
+        Event.objects.bulk_create(events)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def full_scan_python(latitude: float, longitude: float, radius_km: float, limit: int) -> list:
+    from blockchain_api.geo import EARTH_RADIUS_KM
+    from blockchain_api.models import Event
+
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    found = []
+    for event in Event.objects.all():
+        lat2, lng2 = math.radians(event.latitude), math.radians(event.longitude)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+        if distance <= radius_km:
+            found.append((distance, event))
+    found.sort(key=lambda item: item[0])
+    return [event.id for _, event in found[:limit]]
+
+
+def full_scan_numpy(latitude: float, longitude: float, radius_km: float, limit: int) -> list:
+    import numpy as np
+    from blockchain_api.geo import haversine_km
+    from blockchain_api.models import Event
+
+    rows = np.array(list(Event.objects.values_list("id", "latitude", "longitude")), dtype=np.float64)
+    distances = haversine_km(latitude, longitude, rows[:, 1], rows[:, 2])
+    inside = np.flatnonzero(distances <= radius_km)
+    inside = inside[np.argsort(distances[inside], kind="stable")][:limit]
+    return rows[inside, 0].astype(np.int64).tolist()
+
+
+def geohash_numpy(latitude: float, longitude: float, radius_km: float, limit: int) -> list:
+    from blockchain_api.events_service import get_nearby_events
+    return [event.id for event, _ in get_nearby_events(latitude, longitude, radius_km, limit)]
+
+
+def run(label: str, fn, points: list, radius_km: float, limit: int) -> list:
+    timings, results = [], []
+    for latitude, longitude in points:
+        start = time.perf_counter()
+        results.append(fn(latitude, longitude, radius_km, limit))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"  {label:<18} p50 {statistics.median(timings):9.2f} ms   p95 {p95:9.2f} ms   n={len(points)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--naive-queries", type=int, default=10, help="Consultas de los modos sin índice")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    rng = random.Random(7)
+    print(f"🧪 Sembrando {args.events:,} eventos...")
+    seed(args.events, rng)
+
+    points = [
+        (rng.gauss(SANTIAGO[0], 0.2), rng.gauss(SANTIAGO[1], 0.2)) if i % 2
+        else (rng.uniform(*CHILE[0]), rng.uniform(*CHILE[1]))
+        for i in range(args.queries)
+    ]
+    naive_points = points[:args.naive_queries]
+
+    for radius_km in RADII_KM:
+        print(f"\n▶ radio {radius_km} km, limit {args.limit}")
+        python_ids = run("completo (python)", full_scan_python, naive_points, radius_km, args.limit)
+        numpy_ids = run("completo (numpy)", full_scan_numpy, naive_points, radius_km, args.limit)
+        geohash_ids = run("geohash (numpy)", geohash_numpy, points, radius_km, args.limit)
+
+        same = [set(a) == set(b) == set(c) for a, b, c in zip(python_ids, numpy_ids, geohash_ids)]
+        print(f"  {'✅' if all(same) else '❌'} mismos eventos en {sum(same)}/{len(same)} consultas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+bench_rpc_pool.py
+Prueba del pool de endpoints RPC contra varios nodos simulados, cada uno en
+su propio proceso.
+
+Escenarios:
+    • failover: un endpoint caído y uno sano → ningún request falla
+    • salud:    un endpoint lento y uno rápido → el tráfico va al rápido
+    • hedging:  endpoints con picos de latencia → p99 con y sin hedging
+
+Uso:
+    python tools/bench_rpc_pool.py --requests 300
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import serve_in_process  # noqa: E402
+
+from blockchain_api.rpc_pool import PooledHTTPProvider, RPCPool  # noqa: E402
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+CHECKINS = [(WALLET, 1, "Santiago")]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_nodes(configs: list) -> tuple:
+    processes, urls = [], []
+    for options in configs:
+        port = free_port()
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=serve_in_process, args=(port, CHECKINS, ready), kwargs=options, daemon=True
+        )
+        process.start()
+        ready.wait(10)
+        processes.append(process)
+        urls.append(f"http://127.0.0.1:{port}")
+    return processes, urls
+
+
+def stop_nodes(processes: list):
+    for process in processes:
+        process.terminate()
+        process.join()
+
+
+def run_requests(pool: RPCPool, n: int) -> dict:
+    provider = PooledHTTPProvider(pool)
+    latencies, failures = [], 0
+
+    for _ in range(n):
+        start = time.perf_counter()
+        try:
+            provider.make_request("eth_blockNumber", [])
+        except Exception:
+            failures += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "failures": failures,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def report(title: str, pool: RPCPool, result: dict):
+    print(f"\n▶ {title}")
+    print(f"  fallos: {result['failures']}  p50: {result['p50_ms']:.2f} ms  p99: {result['p99_ms']:.2f} ms  "
+          f"hedged: {pool.hedged_requests}")
+    for endpoint in pool.stats()["endpoints"]:
+        print(f"  • {endpoint['url']}  requests={endpoint['requests']} errores={endpoint['errors']} "
+              f"latencia={endpoint['latency_ms']} ms expulsado={endpoint['ejected']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    # Failover: el primer endpoint no escucha
+    processes, urls = start_nodes([{}])
+    pool = RPCPool([f"http://127.0.0.1:{free_port()}"] + urls, hedge_after=0, timeout=1)
+    report("failover (endpoint caído + sano)", pool, run_requests(pool, args.requests))
+    stop_nodes(processes)
+
+    # Salud: enrutar al endpoint más rápido
+    processes, urls = start_nodes([{"latency": 0.02}, {"latency": 0.001}])
+    pool = RPCPool(urls, hedge_after=0)
+    report("salud (lento 20 ms + rápido 1 ms)", pool, run_requests(pool, args.requests))
+    stop_nodes(processes)
+
+    # Hedging: dos endpoints con picos independientes de 200 ms en el 5% de los requests
+    spiky = {"latency": 0.001, "spike_rate": 0.05, "spike_latency": 0.2}
+    for hedge_after in (0, 0.02):
+        processes, urls = start_nodes([spiky, spiky])
+        pool = RPCPool(urls, hedge_after=hedge_after)
+        label = f"hedging {'activado (20 ms)' if hedge_after else 'desactivado'}"
+        report(label, pool, run_requests(pool, args.requests))
+        stop_nodes(processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+bench_startup.py
+Benchmark de arranque de blockchain_service.
+
+Mide, en procesos nuevos:
+    • tiempo de import del módulo (no debe abrir conexiones)
+    • latencia del primer request (crea el cliente) y de los siguientes
+
+Con --max-import-ms termina con código 1 si el import supera el límite,
+para detectar regresiones (por ejemplo, volver a conectar al importar).
+
+Uso:
+    python tools/bench_startup.py --runs 5 --max-import-ms 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import FakeNode  # noqa: E402
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+# Se importan antes las dependencias pesadas para medir sólo el módulo
+CHILD_SCRIPT = """
+import json, sys, time
+import web3, eth_abi, dotenv
+t0 = time.perf_counter()
+from blockchain_api import blockchain_service as service
+t1 = time.perf_counter()
+service.verify_transaction(sys.argv[1], sys.argv[2], 1)
+t2 = time.perf_counter()
+service.verify_transaction(sys.argv[1], sys.argv[2], 1)
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_ms": (t2 - t1) * 1000, "warm_ms": (t3 - t2) * 1000}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    node = FakeNode().start()
+    tx_hash = node.chain.add_checkin(WALLET, event_id=1, location="Santiago")
+    env = dict(os.environ, RPC_URL=node.url)
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, tx_hash, WALLET],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    node.stop()
+
+    for key, label in (("import_ms", "import"), ("first_ms", "primer request"), ("warm_ms", "request en caliente")):
+        values = [sample[key] for sample in samples]
+        print(f"{label:<20} mediana {statistics.median(values):8.2f} ms   máx {max(values):8.2f} ms")
+
+    import_ms = statistics.median(sample["import_ms"] for sample in samples)
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"❌ Import de {import_ms:.2f} ms supera el límite de {args.max_import_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
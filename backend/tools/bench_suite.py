@@ -0,0 +1,618 @@
+"""
+bench_suite.py
+Suite de micro-benchmarks de blockchain_api sobre una cadena simulada.
+
+Cubre:
+    • blockchain_service: verificación de check-ins y check-ins por usuario
+    • analytics_service / heatmap / events_service (incluye eventos cercanos)
+    • serializers
+    • cada URL de blockchain_api/urls.py (una URL sin caso es un error)
+    • changelists del admin, con y sin búsqueda
+
+Cada dataset (1k, 100k, 1m check-ins) corre en un proceso con su propio
+SQLite temporal (perfil ajustado de core/settings.py). El nodo es un
+FakeNode sin latencia en el mismo proceso: responde receipts, logs
+EventCheckedIn y getUserCheckIns con la ABI de ProofOfPresence.
+
+Antes de cada iteración se vacían las cachés (respuestas, metadatos de
+eventos y cadena), salvo en los casos marcados "caché". Por caso se
+guardan p50/p95/media en ms y consultas SQL y round trips RPC por llamada.
+
+Resultados en JSON (--output). Con --compare, un caso cuyo p50 empeora más
+de --threshold (y más de 2 ms) respecto de la base cuenta como regresión y
+el proceso termina con código 1.
+Requiere las migraciones generadas (python manage.py makemigrations).
+
+Uso:
+    python tools/bench_suite.py --sizes 1k --output bench.json
+    python tools/bench_suite.py --sizes 1k,100k --compare bench.json
+    python tools/bench_suite.py --only url/ --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import FakeNode  # noqa: E402
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SANTIAGO = (-33.45, -70.66)
+BBOX = "-71.2,-34.0,-70.1,-32.9"
+HEAVY_CHECKINS = 200
+BULK_ITEMS = 50
+NOISE_FLOOR_MS = 2.0
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def wallet(i: int) -> str:
+    from web3 import Web3
+    return Web3.to_checksum_address(f"0x{i:040x}")
+
+
+# ============================================
+# DATASET
+# ============================================
+
+def seed(size: int) -> dict:
+    """
+    Eventos, usuarios, check-ins (repartidos en 30 días), asistencias y
+    verificaciones; luego reconstruye grilla de calor, agregados diarios y
+    contadores.
+    """
+    from django.utils import timezone
+    from blockchain_api.counters import reconcile_counters
+    from blockchain_api.heatmap import rebuild_heatmap
+    from blockchain_api.models import CheckIn, CheckInVerification, Event, EventAttendance, UserProfile
+    from blockchain_api.rollups import compact_rollups
+
+    chunk = 10_000
+    now = timezone.now()
+    n_events, n_users = max(10, size // 1000), max(50, size // 20)
+
+    Event.objects.bulk_create(
+        Event(
+            name=f"Evento {i}", description="Fiesta", location=f"Lugar {i % 200}",
+            latitude=SANTIAGO[0] + (i % 100 - 50) * 0.01, longitude=SANTIAGO[1] + (i // 100 % 100 - 50) * 0.01,
+            start_date=now + timedelta(days=i % 60 - 30), end_date=now + timedelta(days=i % 60 - 30, hours=6),
+        )
+        for i in range(n_events)
+    )
+    events = list(Event.objects.order_by("id"))
+
+    for start in range(0, n_users, chunk):
+        UserProfile.objects.bulk_create(
+            UserProfile(wallet_address=wallet(i + 1)) for i in range(start, min(start + chunk, n_users))
+        )
+    user_ids = list(UserProfile.objects.order_by("id").values_list("id", flat=True))
+
+    # timestamp es auto_now_add: se desactiva para repartir los check-ins en el tiempo
+    timestamp = CheckIn._meta.get_field("timestamp")
+    timestamp.auto_now_add = False
+    try:
+        for start in range(0, size, chunk):
+            CheckIn.objects.bulk_create(
+                CheckIn(
+                    user_id=user_ids[i % n_users],
+                    location=events[i % n_events].location,
+                    latitude=events[i % n_events].latitude + (i % 7) * 0.001,
+                    longitude=events[i % n_events].longitude - (i % 11) * 0.001,
+                    tx_hash=f"0x{i:064x}",
+                    timestamp=now - timedelta(seconds=(i * 2_591_999) % 2_592_000),
+                )
+                for i in range(start, min(start + chunk, size))
+            )
+    finally:
+        timestamp.auto_now_add = True
+
+    attendances = size // 10
+    for start in range(0, attendances, chunk):
+        EventAttendance.objects.bulk_create(
+            EventAttendance(
+                user_id=user_ids[i % n_users], event=events[i // n_users % n_events], tx_hash=f"0xa{i:063x}"
+            )
+            for i in range(start, min(start + chunk, attendances))
+        )
+
+    CheckInVerification.objects.bulk_create(
+        CheckInVerification(user_id=user_ids[i], event=events[i % n_events], tx_hash=f"0xb{i:063x}")
+        for i in range(min(200, n_users))
+    )
+
+    rebuild_heatmap()
+    compact_rollups(days=31)
+    reconcile_counters()
+    return {"events": n_events, "users": n_users, "checkins": size, "attendances": attendances}
+
+
+class Chain:
+    """
+    Transacciones en la cadena simulada para verificar y registrar.
+    """
+
+    def __init__(self, node: FakeNode, event_ids: list):
+        self.node = node
+        self.event_ids = event_ids
+        self._next = 0
+        self.heavy = wallet(10 ** 12)
+        for i in range(HEAVY_CHECKINS):
+            node.chain.add_checkin(self.heavy, event_ids[i % len(event_ids)], f"Lugar {i}")
+        self.verify = [self._fresh() for _ in range(100)]
+
+    def _fresh(self) -> dict:
+        self._next += 1
+        address = wallet(10 ** 13 + self._next)
+        event_id = self.event_ids[self._next % len(self.event_ids)]
+        tx_hash = self.node.chain.add_checkin(address, event_id, "Lugar")
+        return {"event_id": event_id, "wallet_address": address, "tx_hash": tx_hash}
+
+    def fresh(self, n: int = None):
+        """
+        Check-in nuevo (sin registrar) para los endpoints de escritura.
+        """
+        return self._fresh() if n is None else [self._fresh() for _ in range(n)]
+
+
+# ============================================
+# MEDICIÓN
+# ============================================
+
+class QueryCounter:
+    """
+    Cuenta consultas SQL en todas las conexiones (también las de los
+    threads que usa el ORM asíncrono).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db import connection
+        from django.db.backends.signals import connection_created
+
+        connection.execute_wrappers.append(self)
+        connection_created.connect(self._attach, weak=False)
+
+    def _attach(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def reset_caches():
+    from django.core.cache import caches
+    from blockchain_api.blockchain_service import chain_cache
+    from blockchain_api.event_cache import invalidate_event
+
+    for cache in caches.all():
+        cache.clear()
+    chain_cache.clear()
+    invalidate_event()
+
+
+def measure(fn, node: FakeNode, queries: QueryCounter, iterations: int, budget: float, cold: bool) -> dict:
+    """
+    Una iteración de calentamiento y luego hasta `iterations` (o `budget` segundos).
+    """
+    timings, sql, round_trips = [], 0, 0
+    elapsed = 0.0
+
+    for i in range(iterations + 1):
+        if cold:
+            reset_caches()
+        queries_before, trips_before = queries.count, node.round_trips
+
+        start = time.perf_counter()
+        fn()
+        took = time.perf_counter() - start
+
+        if i == 0:
+            continue
+        timings.append(took * 1000)
+        sql += queries.count - queries_before
+        round_trips += node.round_trips - trips_before
+        elapsed += took
+        if elapsed > budget:
+            break
+
+    n = len(timings)
+    return {
+        "iterations": n,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": round(sql / n, 2),
+        "rpc_round_trips": round(round_trips / n, 2),
+    }
+
+
+# ============================================
+# CASOS
+# ============================================
+
+def service_cases(chain: Chain) -> list:
+    from blockchain_api import analytics_service, blockchain_service, events_service
+    from blockchain_api.heatmap import get_heatmap_cells
+    from blockchain_api.models import Event
+
+    tx = chain.verify[0]
+    bbox = tuple(float(value) for value in BBOX.split(","))
+
+    return [
+        ("service/blockchain.verify_event_checkin_tx", True,
+         lambda: blockchain_service.verify_event_checkin_tx(tx["tx_hash"], tx["wallet_address"], tx["event_id"])),
+        ("service/blockchain.verify_event_checkin_tx (caché)", False,
+         lambda: blockchain_service.verify_event_checkin_tx(tx["tx_hash"], tx["wallet_address"], tx["event_id"])),
+        ("service/blockchain.verify_checkins_batch (100)", True,
+         lambda: blockchain_service.verify_checkins_batch(
+             [(item["tx_hash"], item["wallet_address"], item["event_id"]) for item in chain.verify]
+         )),
+        ("service/blockchain.get_user_checkins_page", True,
+         lambda: blockchain_service.get_user_checkins_page(chain.heavy, limit=50)),
+        ("service/analytics.get_heatmap_data", True, analytics_service.get_heatmap_data),
+        ("service/heatmap.get_heatmap_cells", True, lambda: get_heatmap_cells(bbox, 10)),
+        ("service/analytics.get_activity_stats", True, lambda: analytics_service.get_activity_stats(days=7)),
+        ("service/analytics.get_activity_stats (exacto)", True,
+         lambda: analytics_service.get_activity_stats(days=7, exact=True)),
+        ("service/events.get_events (página)", True, lambda: events_service.get_events(limit=20)),
+        ("service/events.get_events (upcoming)", True, lambda: events_service.get_events(status="upcoming", limit=20)),
+        ("service/events.get_live_events", True, events_service.get_live_events),
+        ("service/events.live (sin caché)", True, lambda: list(Event.objects.live())),
+        ("service/events.get_nearby_events", True, lambda: events_service.get_nearby_events(*SANTIAGO, radius_km=50)),
+    ]
+
+
+def serializer_cases() -> list:
+    from blockchain_api.models import CheckInVerification, Event
+    from blockchain_api.serializers import CheckInVerificationSerializer, EventSerializer
+
+    events = list(Event.objects.all()[:1000])
+    verifications = list(CheckInVerification.objects.select_related("user", "attendance")[:200])
+
+    return [
+        (f"serializer/EventSerializer ({len(events)})", False,
+         lambda: EventSerializer(events, many=True).data),
+        (f"serializer/CheckInVerificationSerializer ({len(verifications)})", False,
+         lambda: CheckInVerificationSerializer(verifications, many=True).data),
+    ]
+
+
+def admin_cases() -> list:
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    client = Client()
+    client.force_login(get_user_model().objects.create_superuser("bench", password="bench"))
+
+    def changelist(name, query=""):
+        path = f"/admin/blockchain_api/{name}/{query}"
+        return f"admin/{name}" + (f" ({query})" if query else ""), True, expect_ok(path, lambda: client.get(path))
+
+    return [
+        changelist("userprofile"),
+        changelist("userprofile", f"?q={wallet(7)}"),
+        changelist("checkin"),
+        changelist("checkin", f"?q=0x{7:064x}"),
+        changelist("checkin", f"?q=0x{7:064x}"[:-1]),
+        changelist("checkin", "?q=0x0000000000"),
+        changelist("checkin", f"?q={wallet(7)}"),
+        changelist("event"),
+        changelist("eventattendance"),
+        changelist("checkinverification"),
+    ]
+
+
+class AsyncRunner:
+    """
+    Event loop persistente para las vistas asíncronas: las sesiones
+    aiohttp del cliente AsyncWeb3 pertenecen a un solo loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        from blockchain_api.async_blockchain_service import close_async_client
+        self.run(close_async_client())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def url_cases(chain: Chain, runner: AsyncRunner) -> dict:
+    """
+    Casos por nombre de URL de blockchain_api/urls.py.
+    """
+    from django.test import AsyncClient, Client
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    from blockchain_api.models import CheckInVerification
+
+    client, async_client = Client(), AsyncClient()
+    account = Account.create()
+    signature = account.sign_message(encode_defunct(text="bench-nonce")).signature.hex()
+    verification_id = CheckInVerification.objects.values_list("id", flat=True).first()
+
+    def get(path):
+        response = client.get(path)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def post(path, data):
+        return client.post(path, data, content_type="application/json")
+
+    def async_get(path):
+        return runner.run(async_client.get(path))
+
+    def async_post(path, data):
+        return runner.run(async_client.post(path, data, content_type="application/json"))
+
+    return {
+        "get_user_checkins": [("", lambda: get(f"/api/checkins/{chain.heavy}/?limit=50"))],
+        "auth_nonce": [("", lambda: get(f"/api/auth/nonce/?address={account.address}"))],
+        "login_wallet": [("", lambda: post("/api/login_wallet/", {
+            "address": account.address, "signature": signature, "nonce": "bench-nonce"
+        }))],
+        "events": [
+            ("todos", lambda: get("/api/events/")),
+            ("página", lambda: get("/api/events/?limit=20")),
+            ("upcoming", lambda: get("/api/events/?status=upcoming&limit=20")),
+            ("live", lambda: get("/api/events/?status=live")),
+        ],
+        "events_nearby": [
+            ("50 km", lambda: get(f"/api/events/nearby/?lat={SANTIAGO[0]}&lng={SANTIAGO[1]}&radius_km=50")),
+            ("live", lambda: get(f"/api/events/nearby/?lat={SANTIAGO[0]}&lng={SANTIAGO[1]}&status=live")),
+        ],
+        "event_checkin": [("", lambda: post("/api/event_checkin/", chain.fresh()))],
+        "event_checkin_bulk": [
+            (f"{BULK_ITEMS} items", lambda: post("/api/event_checkin/bulk/", {"checkins": chain.fresh(BULK_ITEMS)}))
+        ],
+        "event_checkin_status": [("", lambda: get(f"/api/event_checkin/{verification_id}/"))],
+        "heatmap_data": [
+            ("todo", lambda: get("/api/heatmap/")),
+            ("bbox", lambda: get(f"/api/heatmap/?bbox={BBOX}&zoom=10")),
+        ],
+        "activity_stats": [
+            ("", lambda: get("/api/stats/")),
+            ("exacto", lambda: get("/api/stats/?exact=1")),
+        ],
+        "mapa_completo": [
+            ("todo", lambda: get("/api/mapa/")),
+            ("bbox", lambda: get(f"/api/mapa/?bbox={BBOX}&zoom=10")),
+        ],
+        "blockchain_info": [("", lambda: get("/api/blockchain/info/"))],
+        "health_check": [("", lambda: get("/api/health/"))],
+        "metrics": [("", lambda: get("/api/metrics"))],
+        "async_get_user_checkins": [("", lambda: async_get(f"/api/async/checkins/{chain.heavy}/?limit=50"))],
+        "async_event_checkin": [("", lambda: async_post("/api/async/event_checkin/", chain.fresh()))],
+        "async_blockchain_info": [("", lambda: async_get("/api/async/blockchain/info/"))],
+        "async_health_check": [("", lambda: async_get("/api/async/health/"))],
+    }
+
+
+def check_url_coverage(cases: dict):
+    from blockchain_api.urls import urlpatterns
+
+    missing = [pattern.name for pattern in urlpatterns if pattern.name not in cases]
+    if missing:
+        raise RuntimeError(f"URLs sin caso de benchmark: {', '.join(missing)}")
+
+
+def expect_ok(name: str, fn):
+    def call():
+        response = fn()
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name} respondió {response.status_code}: {response.content[:200]!r}")
+    return call
+
+
+# ============================================
+# DATASET EN SU PROCESO
+# ============================================
+
+def run_dataset(label: str, size: int, options: dict) -> dict:
+    node = FakeNode().start()
+    os.environ["RPC_URL"] = node.url
+
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    from blockchain_api.models import Event
+
+    setup_test_environment()
+    settings.DEBUG = False
+
+    print(f"\n▶ {label}: sembrando {size:,} check-ins...", flush=True)
+    start = time.perf_counter()
+    dataset = seed(size)
+    dataset["seed_s"] = round(time.perf_counter() - start, 1)
+    print(f"  listo en {dataset['seed_s']} s", flush=True)
+
+    chain = Chain(node, list(Event.objects.values_list("id", flat=True)[:50]))
+    queries = QueryCounter()
+    queries.install()
+    runner = AsyncRunner()
+
+    cases = service_cases(chain) + serializer_cases() + admin_cases()
+    urls = url_cases(chain, runner)
+    check_url_coverage(urls)
+    for name, variants in urls.items():
+        for variant, fn in variants:
+            case = f"url/{name}" + (f" ({variant})" if variant else "")
+            cases.append((case, True, expect_ok(case, fn)))
+
+    results = {}
+    for case, cold, fn in cases:
+        if options["only"] and not any(case.startswith(prefix) for prefix in options["only"]):
+            continue
+        result = measure(fn, node, queries, options["iterations"], options["budget"], cold)
+        results[case] = result
+        print(
+            f"  {case:<58} p50 {result['p50_ms']:9.2f} ms   p95 {result['p95_ms']:9.2f} ms   "
+            f"sql {result['queries']:6.1f}   rpc {result['rpc_round_trips']:5.1f}   n={result['iterations']}",
+            flush=True
+        )
+
+    from blockchain_api.services.auth_service import shutdown_pool
+
+    runner.close()
+    shutdown_pool()
+    node.stop()
+    return {**dataset, "cases": results}
+
+
+def _run_in_process(label: str, size: int, options: dict, results):
+    try:
+        results.put(run_dataset(label, size, options))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        raise
+
+
+def run_size(label: str, size: int, options: dict) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="bench_suite_")
+    env = {
+        "DATABASE_ENGINE": "sqlite",
+        "SQLITE_PATH": os.path.join(tmpdir, "bench.sqlite3"),
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+    }
+    os.environ.update(env)
+    os.environ.pop("REDIS_URL", None)
+
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+        cwd=BASE_DIR, env=os.environ, check=True
+    )
+
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_in_process, args=(label, size, options, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+# ============================================
+# COMPARACIÓN
+# ============================================
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns:
+        Lista de (dataset, caso, p50 base, p50 actual) que empeoraron
+    """
+    regressions = []
+    print(f"\n▶ Comparación con la base ({baseline['meta'].get('git_commit', '?')})")
+
+    for label, dataset in current["datasets"].items():
+        base_cases = baseline["datasets"].get(label, {}).get("cases", {})
+        for case, result in dataset.get("cases", {}).items():
+            if case not in base_cases:
+                continue
+            before, after = base_cases[case]["p50_ms"], result["p50_ms"]
+            ratio = after / before if before else 1.0
+
+            if ratio > 1 + threshold and after - before > NOISE_FLOOR_MS:
+                regressions.append((label, case, before, after))
+                mark = "⚠️ "
+            elif ratio < 1 - threshold and before - after > NOISE_FLOOR_MS:
+                mark = "✅"
+            else:
+                continue
+            print(f"  {mark} {label:<5} {case:<58} {before:9.2f} → {after:9.2f} ms ({ratio:5.2f}×)")
+
+    if not regressions:
+        print("  sin regresiones")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k", help="Datasets: 1k, 100k, 1m (separados por comas)")
+    parser.add_argument("--iterations", type=int, default=20, help="Iteraciones medidas por caso")
+    parser.add_argument("--budget", type=float, default=3.0, help="Segundos máximos medidos por caso")
+    parser.add_argument("--only", default="", help="Prefijos de casos a correr (por ejemplo url/,service/)")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    parser.add_argument("--compare", help="Resultados JSON base para detectar regresiones")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Empeoramiento tolerado del p50 (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn")
+    options = {
+        "iterations": args.iterations,
+        "budget": args.budget,
+        "only": [prefix for prefix in args.only.split(",") if prefix],
+    }
+
+    import django
+    current = {
+        "meta": {
+            "created_at": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+        },
+        "datasets": {},
+    }
+
+    failed = False
+    for label in args.sizes.split(","):
+        label = label.strip().lower()
+        result = run_size(label, SIZES[label], options)
+        if "error" in result:
+            print(f"⚠️ Dataset {label} falló: {result['error']}")
+            failed = True
+            continue
+        current["datasets"][label] = result
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados en {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failed = bool(compare(current, baseline, args.threshold)) or failed
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
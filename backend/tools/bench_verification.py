@@ -0,0 +1,95 @@
+"""
+bench_verification.py
+Benchmark de verificación de check-ins contra un nodo local simulado.
+
+Compara el flujo anterior (llamadas RPC secuenciales) con el motor de una
+sola pasada de blockchain_service, midiendo round trips HTTP, llamadas
+JSON-RPC y tiempo por verificación.
+
+Uso:
+    python tools/bench_verification.py --iterations 200 --latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fake_node import FakeNode  # noqa: E402
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def legacy_verify(service, tx_hash: str, wallet_address: str, event_id: int) -> dict:
+    """
+    Reproduce la secuencia de llamadas RPC del flujo anterior:
+    receipt, tx, process_receipt, block, receipt, process_receipt.
+    """
+    w3, contract = service.w3, service.contract
+
+    receipt = w3.eth.get_transaction_receipt(tx_hash)
+    tx = w3.eth.get_transaction(tx_hash)
+    if tx["from"].lower() != wallet_address.lower():
+        raise ValueError("sender mismatch")
+    logs = contract.events.EventCheckedIn().process_receipt(receipt)
+    if not any(log["args"]["eventId"] == event_id for log in logs):
+        raise ValueError("event mismatch")
+    w3.eth.get_block(receipt.blockNumber)
+
+    receipt = w3.eth.get_transaction_receipt(tx_hash)
+    logs = contract.events.EventCheckedIn().process_receipt(receipt)
+    return dict(logs[0]["args"])
+
+
+def run(label: str, node: FakeNode, tx_hashes: list, verify) -> dict:
+    node.reset_counters()
+    start = time.perf_counter()
+    for tx_hash in tx_hashes:
+        verify(tx_hash)
+    elapsed = time.perf_counter() - start
+
+    n = len(tx_hashes)
+    result = {
+        "label": label,
+        "verifications": n,
+        "round_trips_per_verification": node.round_trips / n,
+        "rpc_calls_per_verification": node.calls / n,
+        "ms_per_verification": elapsed * 1000 / n,
+    }
+    print(
+        f"{label:<12} round trips/verif: {result['round_trips_per_verification']:.2f}  "
+        f"llamadas RPC/verif: {result['rpc_calls_per_verification']:.2f}  "
+        f"ms/verif: {result['ms_per_verification']:.3f}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.002, help="Latencia simulada por round trip (s)")
+    args = parser.parse_args()
+
+    node = FakeNode(latency=args.latency).start()
+    os.environ["RPC_URL"] = node.url
+
+    from blockchain_api import blockchain_service as service
+
+    tx_hashes = [
+        node.chain.add_checkin(WALLET, event_id=(i % 10) + 1, location="Santiago")
+        for i in range(args.iterations)
+    ]
+    event_ids = {tx: (i % 10) + 1 for i, tx in enumerate(tx_hashes)}
+
+    print(f"🧪 {args.iterations} verificaciones, latencia simulada {args.latency * 1000:.1f} ms")
+    run("secuencial", node, tx_hashes, lambda tx: legacy_verify(service, tx, WALLET, event_ids[tx]))
+    run("una pasada", node, tx_hashes, lambda tx: service.verify_event_checkin_tx(tx, WALLET, event_ids[tx]))
+
+    node.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+fake_node.py
+Nodo JSON-RPC local que simula la red para benchmarks.
+
+Genera transacciones checkInEvent del contrato ProofOfPresence con sus
+receipts y logs EventCheckedIn, responde las funciones view del contrato
+(getUserCheckIns, userCheckIns) vía eth_call, y cuenta cuántos round trips
+HTTP y cuántas llamadas JSON-RPC recibe.
+
+Uso:
+    node = FakeNode(latency=0.002)
+    node.start()
+    tx_hash = node.chain.add_checkin(wallet, event_id=1, location="Santiago")
+    ...
+    node.stop()
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_abi import decode as abi_decode, encode as abi_encode
+from web3 import Web3
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTRACT_JSON_PATH = os.path.join(BASE_DIR, "../blockchain/deployed/ProofOfPresence.json")
+
+EVENT_CHECKED_IN_TOPIC = Web3.to_hex(Web3.keccak(text="EventCheckedIn(address,uint256,string,uint256)"))
+GET_USER_CHECKINS_SELECTOR = Web3.to_hex(Web3.keccak(text="getUserCheckIns(address)")[:4])
+USER_CHECKINS_SELECTOR = Web3.to_hex(Web3.keccak(text="userCheckIns(address,uint256)")[:4])
+CHECKIN_TYPES = ["address", "string", "uint256", "uint256"]
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _pad_topic(value) -> str:
+    if isinstance(value, str):
+        return "0x" + value[2:].lower().rjust(64, "0")
+    return "0x" + format(value, "x").rjust(64, "0")
+
+
+class FakeChain:
+    """
+    Estado de la cadena simulada: bloques, transacciones y receipts.
+    Cada check-in se mina en su propio bloque.
+    """
+
+    def __init__(self, contract_address: str = None, start_timestamp: int = 1_700_000_000):
+        if contract_address is None:
+            with open(CONTRACT_JSON_PATH, "r") as f:
+                contract_address = json.load(f)["address"]
+
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.start_timestamp = start_timestamp
+        self.blocks = [self._make_block(0, [])]
+        self.transactions = {}
+        self.receipts = {}
+        # Estado del contrato: (user, location, timestamp, eventId) por usuario
+        self.user_checkins = {}
+        self.lock = threading.Lock()
+
+    def _make_block(self, number: int, tx_hashes: list) -> dict:
+        return {
+            "number": _hex(number),
+            "hash": Web3.to_hex(Web3.keccak(text=f"block-{number}")),
+            "parentHash": Web3.to_hex(Web3.keccak(text=f"block-{number - 1}")),
+            "timestamp": _hex(self.start_timestamp + number * 12),
+            "transactions": tx_hashes,
+        }
+
+    @property
+    def head(self) -> int:
+        return len(self.blocks) - 1
+
+    def add_checkin(self, sender: str, event_id: int, location: str, status: int = 1) -> str:
+        """
+        Mina una transacción checkInEvent y devuelve su hash.
+        """
+        sender = Web3.to_checksum_address(sender)
+
+        with self.lock:
+            number = len(self.blocks)
+            tx_hash = Web3.to_hex(Web3.keccak(text=f"tx-{number}-{sender}-{event_id}"))
+            block = self._make_block(number, [tx_hash])
+            timestamp = int(block["timestamp"], 16)
+
+            logs = []
+            if status == 1:
+                logs.append({
+                    "address": self.contract_address.lower(),
+                    "topics": [
+                        EVENT_CHECKED_IN_TOPIC,
+                        _pad_topic(sender),
+                        _pad_topic(event_id),
+                    ],
+                    "data": Web3.to_hex(abi_encode(["string", "uint256"], [location, timestamp])),
+                    "blockNumber": _hex(number),
+                    "blockHash": block["hash"],
+                    "transactionHash": tx_hash,
+                    "transactionIndex": "0x0",
+                    "logIndex": "0x0",
+                    "removed": False,
+                })
+
+            self.transactions[tx_hash] = {
+                "hash": tx_hash,
+                "from": sender.lower(),
+                "to": self.contract_address.lower(),
+                "blockNumber": _hex(number),
+                "blockHash": block["hash"],
+                "transactionIndex": "0x0",
+                "nonce": _hex(number),
+                "value": "0x0",
+                "gas": _hex(200_000),
+                "gasPrice": _hex(1_000_000_000),
+                "input": "0x",
+            }
+            self.receipts[tx_hash] = {
+                "transactionHash": tx_hash,
+                "transactionIndex": "0x0",
+                "blockNumber": _hex(number),
+                "blockHash": block["hash"],
+                "from": sender.lower(),
+                "to": self.contract_address.lower(),
+                "status": _hex(status),
+                "gasUsed": _hex(91_234),
+                "cumulativeGasUsed": _hex(91_234),
+                "contractAddress": None,
+                "logs": logs,
+                "logsBloom": "0x" + "0" * 512,
+            }
+            self.blocks.append(block)
+            if status == 1:
+                self.user_checkins.setdefault(sender.lower(), []).append((sender, location, timestamp, event_id))
+
+        return tx_hash
+
+    def handle(self, method: str, params: list):
+        """
+        Resuelve una llamada JSON-RPC. Devuelve el campo "result".
+        """
+        if method == "web3_clientVersion":
+            return "FakeNode/v0.1"
+        if method == "eth_chainId":
+            return _hex(31337)
+        if method == "net_version":
+            return "31337"
+        if method == "eth_blockNumber":
+            return _hex(self.head)
+        if method == "eth_getTransactionReceipt":
+            return self.receipts.get(params[0])
+        if method == "eth_getTransactionByHash":
+            return self.transactions.get(params[0])
+        if method == "eth_getBlockByNumber":
+            tag = params[0]
+            number = self.head if tag in ("latest", "safe", "finalized") else int(tag, 16)
+            if number > self.head:
+                return None
+            return dict(self.blocks[number])
+
+        if method == "eth_getLogs":
+            return self.get_logs(params[0])
+        if method == "eth_call":
+            return self.call(params[0])
+
+        raise NotImplementedError(method)
+
+    def call(self, transaction: dict) -> str:
+        """
+        Funciones view del contrato: getUserCheckIns y userCheckIns.
+        """
+        data = transaction.get("data") or transaction.get("input") or "0x"
+        selector, arguments = data[:10], bytes.fromhex(data[10:])
+
+        if selector == GET_USER_CHECKINS_SELECTOR:
+            (user,) = abi_decode(["address"], arguments)
+            checkins = self.user_checkins.get(user.lower(), [])
+            return Web3.to_hex(abi_encode([f"({','.join(CHECKIN_TYPES)})[]"], [checkins]))
+
+        if selector == USER_CHECKINS_SELECTOR:
+            user, index = abi_decode(["address", "uint256"], arguments)
+            return Web3.to_hex(abi_encode(CHECKIN_TYPES, self.user_checkins[user.lower()][index]))
+
+        raise NotImplementedError(f"eth_call {selector}")
+
+    def get_logs(self, log_filter: dict) -> list:
+        from_block = int(log_filter.get("fromBlock", "0x0"), 16)
+        to_block = log_filter.get("toBlock", "latest")
+        to_block = self.head if to_block == "latest" else int(to_block, 16)
+
+        logs = []
+        for number in range(from_block, min(to_block, self.head) + 1):
+            for tx_hash in self.blocks[number]["transactions"]:
+                logs.extend(self.receipts[tx_hash]["logs"])
+        return logs
+
+
+class _Server(ThreadingHTTPServer):
+    # El backlog por defecto (5) descarta conexiones con cientos de clientes
+    request_queue_size = 1024
+
+
+class FakeNode:
+    """
+    Servidor HTTP JSON-RPC sobre FakeChain.
+
+    Args:
+        latency: Segundos de espera por cada request HTTP (simula red)
+        fail_rate: Fracción de requests que responden HTTP 503
+        spike_rate: Fracción de requests con latencia extra
+        spike_latency: Latencia extra de esos requests (s)
+    """
+
+    def __init__(self, chain: FakeChain = None, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 fail_rate: float = 0.0, spike_rate: float = 0.0, spike_latency: float = 0.0):
+        self.chain = chain or FakeChain()
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.round_trips = 0
+        self.calls = 0
+        self.calls_by_method = {}
+        self._counter_lock = threading.Lock()
+        self._server = _Server((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.round_trips = 0
+            self.calls = 0
+            self.calls_by_method = {}
+
+    def _record(self, methods: list):
+        with self._counter_lock:
+            self.round_trips += 1
+            self.calls += len(methods)
+            for method in methods:
+                self.calls_by_method[method] = self.calls_by_method.get(method, 0) + 1
+
+    def _dispatch(self, request: dict) -> dict:
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            response["result"] = self.chain.handle(request["method"], request.get("params") or [])
+        except NotImplementedError as e:
+            response["error"] = {"code": -32601, "message": f"Method not found: {e}"}
+        except Exception as e:
+            response["error"] = {"code": -32000, "message": str(e)}
+        return response
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+
+                if node.latency:
+                    time.sleep(node.latency)
+                if node.spike_rate and random.random() < node.spike_rate:
+                    time.sleep(node.spike_latency)
+                if node.fail_rate and random.random() < node.fail_rate:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if isinstance(payload, list):
+                    node._record([r["method"] for r in payload])
+                    body = [node._dispatch(r) for r in payload]
+                else:
+                    node._record([payload["method"]])
+                    body = node._dispatch(payload)
+
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def serve_in_process(port: int, checkins: list, ready=None, **options):
+    """
+    Ejecuta un FakeNode en el proceso actual (destino de multiprocessing).
+    Todos los nodos con los mismos `checkins` exponen la misma cadena.
+
+    Args:
+        checkins: Lista de (sender, event_id, location)
+        ready: multiprocessing.Event que se activa al escuchar
+    """
+    node = FakeNode(port=port, **options)
+    for sender, event_id, location in checkins:
+        node.chain.add_checkin(sender, event_id, location)
+    if ready is not None:
+        ready.set()
+    node._server.serve_forever()